@@ -1,15 +1,29 @@
 """
 FastAPI backend for Fetal Health Classification
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
-import pandas as pd
-import joblib
+import asyncio
 import os
+import time
+import warnings
 from pathlib import Path
 
+from backend.app.services.batcher import MicroBatcher
+from backend.app.services.dataset_service import DatasetSummaryCache
+from backend.app.services.executor import (
+    ExecutorOverloaded, InferenceExecutor, StaleModelVersion, worker_inference
+)
+from backend.app.services.model_registry import ModelRegistry
+from backend.app.services.model_service import run_inference
+from backend.app.services.prediction_cache import PredictionCache
+
+# Scalers are fitted on a DataFrame but requests are scored as NumPy arrays
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
 app = FastAPI(
     title="Fetal Health Classification API",
     description="API for predicting fetal health using ensemble models",
@@ -30,14 +44,74 @@ BASE_DIR = Path("/app")
 MODELS_DIR = BASE_DIR / "models"
 DATASETS_DIR = BASE_DIR / "data" / "raw"
 
-# Global variables for model and scaler
-model = None
-scaler = None
-feature_names = None
+# Maximum number of rows accepted by /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Inference executor: "thread" (default) or "process" for GIL-heavy models
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "4"))
+# Concurrent inference calls and extra requests allowed to wait before a 503
+INFERENCE_MAX_CONCURRENCY = int(os.getenv("INFERENCE_MAX_CONCURRENCY", str(INFERENCE_WORKERS)))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+
+# Optional micro-batching of concurrent /predict requests
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "false").lower() in ("1", "true", "yes")
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+
+# Hot reload: seconds between checks of the model artifact (0 disables watching)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
+# Memory-map the model artifact ("r") so worker processes share its arrays; "none" disables
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r")
+if MODEL_MMAP_MODE.lower() in ("", "none"):
+    MODEL_MMAP_MODE = None
+# Rows up to which the compiled tree engine serves instead of sklearn (0 disables it)
+COMPILED_ENGINE_MAX_ROWS = int(os.getenv("COMPILED_ENGINE_MAX_ROWS", "64"))
+# Optional token required by the admin endpoints (X-Admin-Token header)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Prediction cache (LRU + TTL); size 0 disables it. PREDICTION_CACHE_DECIMALS
+# rounds features before hashing so near-identical inputs share an entry
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+PREDICTION_CACHE_DECIMALS = os.getenv("PREDICTION_CACHE_DECIMALS")
+PREDICTION_CACHE_DECIMALS = int(PREDICTION_CACHE_DECIMALS) if PREDICTION_CACHE_DECIMALS else None
+
+# Class labels returned by the API
+LABELS = {1: "Normal", 2: "Suspect", 3: "Pathological"}
+
+# Input field names that differ from the training column names
+FIELD_TO_COLUMN = {"baseline_value": "baseline value"}
+
+dataset_summary_cache = DatasetSummaryCache()
+
+prediction_cache = PredictionCache(
+    max_size=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL,
+    decimals=PREDICTION_CACHE_DECIMALS
+)
+
+inference_executor = InferenceExecutor(
+    kind=INFERENCE_EXECUTOR,
+    max_workers=INFERENCE_WORKERS,
+    max_concurrency=INFERENCE_MAX_CONCURRENCY,
+    max_queue=INFERENCE_MAX_QUEUE,
+    mmap_mode=MODEL_MMAP_MODE,
+    compiled_max_rows=COMPILED_ENGINE_MAX_ROWS
+)
 
 
 class FetalHealthFeatures(BaseModel):
-    """Input features for fetal health prediction"""
+    """
+    Input features for fetal health prediction
+    
+    All 21 features are always required. A model trained on a selected subset
+    only reads its own features (listed as used_fields in /model/info) and
+    ignores the rest.
+    """
+    # Allow population by field name with spaces (from dataset)
+    model_config = ConfigDict(populate_by_name=True)
+    
     baseline_value: float
     accelerations: float
     fetal_movement: float
@@ -59,10 +133,6 @@ class FetalHealthFeatures(BaseModel):
     histogram_median: float
     histogram_variance: float
     histogram_tendency: float
-    
-    class Config:
-        # Allow population by field name with spaces (from dataset)
-        allow_population_by_field_name = True
 
 
 class PredictionResponse(BaseModel):
@@ -72,46 +142,124 @@ class PredictionResponse(BaseModel):
     confidence: Optional[float] = None
 
 
+class BatchPredictionRequest(BaseModel):
+    """Batch of input features for fetal health prediction"""
+    instances: List[FetalHealthFeatures]
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch predictions (same order as the input)"""
+    predictions: List[PredictionResponse]
+    batch_size: int
+    latency_ms: float
+    cache_hits: int = 0
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     model_loaded: bool
 
 
+# The registry holds the served model/scaler/feature_names as one immutable bundle
+model_registry = ModelRegistry(
+    MODELS_DIR / "fetal_health_model.pkl",
+    field_names=list(FetalHealthFeatures.model_fields),
+    field_to_column=FIELD_TO_COLUMN,
+    mmap_mode=MODEL_MMAP_MODE,
+    compiled_max_rows=COMPILED_ENGINE_MAX_ROWS
+)
+
+
+def _start_workers(bundle):
+    """
+    Start the inference workers for a bundle before the registry publishes it
+    
+    Process workers load the bundle's exact artifact version, so the new model
+    is ready before any request is scaled with its scaler.
+    """
+    if inference_executor.kind == "process":
+        inference_executor.start(bundle.path, bundle.version)
+    elif not inference_executor.started:
+        inference_executor.start()
+    else:
+        return
+    print(f"✓ Inference executor: {INFERENCE_EXECUTOR} ({INFERENCE_WORKERS} workers)")
+
+
+def _on_model_swap(bundle):
+    """Retire the inference workers of models that are no longer served"""
+    if inference_executor.kind == "process":
+        inference_executor.retire(model_registry.current.version)
+
+
 @app.on_event("startup")
 async def load_model():
-    """Load the trained model on startup"""
-    global model, scaler, feature_names
-    model_path = MODELS_DIR / "fetal_health_model.pkl"
-    
-    if model_path.exists():
-        try:
-            # Load the model dictionary
-            model_dict = joblib.load(model_path)
-            
-            # Extract components from dictionary
-            if isinstance(model_dict, dict):
-                model = model_dict.get('model')
-                scaler = model_dict.get('scaler')
-                feature_names = model_dict.get('feature_names')
-                print(f"✓ Model loaded successfully from {model_path}")
-                print(f"  - Model type: {type(model).__name__}")
-                print(f"  - Model name: {model_dict.get('model_name', 'Unknown')}")
-                print(f"  - Features: {len(feature_names) if feature_names else 'Unknown'}")
-            else:
-                # If it's not a dict, assume it's the model directly (backward compatibility)
-                model = model_dict
-                print(f"✓ Model loaded successfully from {model_path} (legacy format)")
-        except Exception as e:
-            print(f"✗ Error loading model: {e}")
-            model = None
-            scaler = None
-            feature_names = None
+    """Load the trained model on startup and start watching for new artifacts"""
+    if model_registry.model_path.exists():
+        model_registry.load(prepare=_start_workers)
     else:
-        print(f"✗ Model not found at {model_path}. Please train the model first.")
-        model = None
-        scaler = None
-        feature_names = None
+        print(f"✗ Model not found at {model_registry.model_path}. Please train the model first.")
+    
+    model_registry.start_watching(
+        MODEL_WATCH_INTERVAL, prepare=_start_workers, on_swap=_on_model_swap
+    )
+
+
+@app.on_event("startup")
+async def start_batcher():
+    """Start the micro-batching coalescer if enabled"""
+    if MICRO_BATCHING:
+        micro_batcher.start()
+        print(f"✓ Micro-batching enabled (max {MICRO_BATCH_MAX_SIZE} rows / {MICRO_BATCH_MAX_WAIT_MS} ms)")
+
+
+@app.on_event("shutdown")
+async def stop_executor():
+    """Stop the model watcher, the micro-batcher and the inference worker pool on shutdown"""
+    await model_registry.stop_watching()
+    await micro_batcher.stop()
+    inference_executor.shutdown()
+
+
+def _current_bundle():
+    """Return the served model bundle or raise 503 if no model is loaded"""
+    bundle = model_registry.current
+    if bundle is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Please train the model first."
+        )
+    return bundle
+
+
+async def _infer(X, bundle):
+    """
+    Run inference on a scaled matrix in the inference executor
+    
+    Raises a 503 when the bounded backlog is full instead of blocking the loop.
+    """
+    try:
+        if inference_executor.kind == "process":
+            return await inference_executor.submit(worker_inference, X, version=bundle.version)
+        return await inference_executor.submit(
+            run_inference, bundle.model, X, bundle.inference_path
+        )
+    except StaleModelVersion:
+        # The model was replaced after this request read it: score it with the
+        # bundle's own copy so the prediction still matches its scaler
+        return await asyncio.to_thread(run_inference, bundle.model, X, bundle.inference_path)
+    except ExecutorOverloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server overloaded, please retry later: {str(e)}",
+            headers={"Retry-After": "1"}
+        )
+
+
+micro_batcher = MicroBatcher(
+    _infer, max_batch_size=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_MAX_WAIT_MS
+)
 
 
 @app.get("/", response_model=dict)
@@ -123,6 +271,9 @@ async def root():
         "endpoints": {
             "health": "/health",
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
+            "model_info": "/model/info",
+            "metrics": "/metrics",
             "dataset_info": "/dataset/info"
         }
     }
@@ -133,7 +284,51 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "model_loaded": model is not None
+        "model_loaded": model_registry.current is not None
+    }
+
+
+@app.get("/model/info")
+async def model_info():
+    """Describe the model currently being served"""
+    return _current_bundle().info()
+
+
+@app.post("/admin/reload-model")
+async def reload_model(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Load the model artifact again without restarting the server
+    
+    The new model is loaded and warmed up in the background and swapped in
+    atomically; if loading fails the current model keeps serving.
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    if not model_registry.model_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model not found at {model_registry.model_path}"
+        )
+    
+    bundle = await model_registry.reload(prepare=_start_workers)
+    if bundle is None:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error loading model: {model_registry.last_error}"
+        )
+    
+    _on_model_swap(bundle)
+    return {"status": "reloaded", **bundle.info()}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Inference executor, prediction cache and micro-batching metrics"""
+    return {
+        "executor": inference_executor.stats(),
+        "cache": prediction_cache.stats(),
+        "batching": micro_batcher.stats()
     }
 
 
@@ -145,41 +340,24 @@ async def predict(features: FetalHealthFeatures):
     - **features**: Dictionary containing all required features
     - Returns prediction (1: Normal, 2: Suspect, 3: Pathological)
     """
-    if model is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Model not loaded. Please train the model first."
-        )
+    # Read the bundle once so a concurrent model swap cannot mix artifacts
+    bundle = _current_bundle()
     
     try:
-        # Convert input to DataFrame
-        features_dict = features.dict()
-        
-        # Create DataFrame - pandas will use the dict keys as column names
-        input_data = pd.DataFrame([features_dict])
-        
-        # Rename 'baseline_value' to 'baseline value' (with space) to match training data
-        input_data = input_data.rename(columns={'baseline_value': 'baseline value'})
-        
-        # Ensure column order matches training if feature_names available
-        if feature_names is not None:
-            # Reorder columns to match training data
-            input_data = input_data[feature_names]
-        
-        # Apply scaling if scaler is available
-        if scaler is not None:
-            input_data_scaled = scaler.transform(input_data)
-        else:
-            input_data_scaled = input_data
+        # Build the NumPy row directly from the request (no DataFrame)
+        raw_row = bundle.feature_transform.raw_row(features)
         
-        # Make prediction
-        prediction = model.predict(input_data_scaled)[0]
+        # Identical inputs for the same model version are served from the cache
+        cache_key = None
+        if prediction_cache.enabled:
+            cache_key = prediction_cache.keys(raw_row, bundle.version)[0]
+            cached = prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        # Get prediction label
-        labels = {1: "Normal", 2: "Suspect", 3: "Pathological"}
-        prediction_label = labels.get(int(prediction), "Unknown")
+        input_data_scaled = bundle.feature_transform.scale(raw_row)
         
-        # Get confidence if model supports predict_proba
+        # Make prediction (probabilities are computed once and the class is derived from them)
         '''
         high confidence doesn't always mean correct prediction!!!
         A poorly trained model might be confidently wrong, showing 95% confidence
@@ -188,17 +366,29 @@ async def predict(features: FetalHealthFeatures):
         It's most useful for identifying ambiguous cases—if confidence is low 
         (say, 0.4), it might warrant human review or additional testing.
         '''
-        confidence = None
-        if hasattr(model, "predict_proba"):
-            probabilities = model.predict_proba(input_data_scaled)[0]
-            confidence = float(max(probabilities))
+        if micro_batcher.running:
+            # Coalesce with concurrent requests into one vectorized call
+            prediction, confidence = await micro_batcher.submit(input_data_scaled, bundle)
+        else:
+            predictions, confidences = await _infer(input_data_scaled, bundle)
+            prediction = predictions[0]
+            confidence = confidences[0] if confidences is not None else None
+        confidence = float(confidence) if confidence is not None else None
         
-        return {
+        # Get prediction label
+        prediction_label = LABELS.get(int(prediction), "Unknown")
+        
+        result = {
             "prediction": int(prediction),
             "prediction_label": prediction_label,
             "confidence": confidence
         }
+        if cache_key is not None:
+            prediction_cache.put(cache_key, result)
+        return result
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -206,9 +396,90 @@ async def predict(features: FetalHealthFeatures):
         )
 
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Make predictions for a batch of CTG records in a single vectorized pass
+    
+    - **instances**: List of feature dictionaries (max `MAX_BATCH_SIZE` items)
+    - Returns one prediction per instance, in input order, plus the batch latency
+    """
+    bundle = _current_bundle()
+    
+    batch_size = len(request.instances)
+    if batch_size == 0:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one instance")
+    if batch_size > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {batch_size} exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+    
+    try:
+        start = time.perf_counter()
+        X = bundle.feature_transform.raw_matrix(request.instances)
+        
+        # Look up each row individually; only the misses are scored
+        results = [None] * batch_size
+        keys = None
+        if prediction_cache.enabled:
+            keys = prediction_cache.keys(X, bundle.version)
+            for i, key in enumerate(keys):
+                results[i] = prediction_cache.get(key)
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing:
+            X_scaled = bundle.feature_transform.scale(X[missing])
+            predictions, confidences = await _infer(X_scaled, bundle)
+            for j, i in enumerate(missing):
+                prediction = int(predictions[j])
+                results[i] = {
+                    "prediction": prediction,
+                    "prediction_label": LABELS.get(prediction, "Unknown"),
+                    "confidence": float(confidences[j]) if confidences is not None else None
+                }
+                if keys is not None:
+                    prediction_cache.put(keys[i], results[i])
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        return {
+            "predictions": results,
+            "batch_size": batch_size,
+            "latency_ms": latency_ms,
+            "cache_hits": batch_size - len(missing)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error making batch prediction: {str(e)}"
+        )
+
+
+def _etag_matches(etag, if_none_match):
+    """
+    Whether an If-None-Match header matches an ETag
+    
+    The header is a comma-separated list of entity tags (or "*"); tags are
+    compared exactly after dropping the weak W/ prefix, as If-None-Match uses
+    weak comparison.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
 @app.get("/dataset/info")
-async def dataset_info():
-    """Get information about the dataset"""
+def dataset_info(request: Request):
+    """
+    Get information about the dataset
+    
+    The summary is computed once and cached until the CSV changes (mtime/size).
+    Responses carry an ETag; repeat polls with If-None-Match get 304 Not Modified.
+    Declared as a plain function so FastAPI runs the CSV read in its threadpool
+    instead of on the event loop.
+    """
     dataset_path = DATASETS_DIR / "fetal_health.csv"
     
     if not dataset_path.exists():
@@ -218,21 +489,19 @@ async def dataset_info():
         )
     
     try:
-        df = pd.read_csv(dataset_path)
-        
-        return {
-            "total_samples": len(df),
-            "features": len(df.columns) - 1,  # Excluding target column
-            "columns": df.columns.tolist(),
-            "target_distribution": df['fetal_health'].value_counts().to_dict() if 'fetal_health' in df.columns else None,
-            "missing_values": df.isnull().sum().to_dict()
-        }
+        summary, etag = dataset_summary_cache.get(dataset_path)
     
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error reading dataset: {str(e)}"
         )
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    
+    return JSONResponse(content=summary, headers=headers)
 
 
 if __name__ == "__main__":
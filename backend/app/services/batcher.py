@@ -0,0 +1,140 @@
+"""
+Micro-batching request coalescer for single-row predictions
+"""
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-row requests into one vectorized inference call
+    
+    Rows are gathered for up to `max_wait_ms` milliseconds or `max_batch_size`
+    rows, whichever comes first, scored with one call to `score_fn` and the
+    results are fanned back out to the waiting coroutines.
+    
+    `score_fn` is an async callable taking a (n_samples, n_features) matrix and
+    a context (the model bundle the rows were prepared for) and returning
+    (predictions, confidences), like the /predict inference path. Rows with
+    different contexts are never mixed in the same call.
+    """
+    
+    def __init__(self, score_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        self._inflight = set()
+        self._reset_metrics()
+    
+    def _reset_metrics(self):
+        self._batches = 0
+        self._rows = 0
+        self._max_batch = 0
+        self._batch_sizes = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+    
+    def start(self):
+        """Start the collector task (must run inside the event loop)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect())
+    
+    async def stop(self):
+        """Stop collecting and wait for batches already being scored"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+    
+    @property
+    def running(self):
+        return self._task is not None
+    
+    async def submit(self, row, context=None):
+        """Queue one scaled (1, n_features) row and wait for (prediction, confidence)"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, context, future, time.perf_counter()))
+        return await future
+    
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Score in the background so the next batch can start collecting
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+    
+    async def _dispatch(self, batch):
+        dispatched_at = time.perf_counter()
+        waits = [dispatched_at - enqueued_at for _, _, _, enqueued_at in batch]
+        self._record(len(batch), waits)
+        
+        # Normally a single group; only differs around a model swap
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+        
+        for group in groups.values():
+            await self._score_group(group)
+    
+    async def _score_group(self, group):
+        try:
+            X = np.vstack([row for row, _, _, _ in group])
+            predictions, confidences = await self.score_fn(X, group[0][1])
+        except Exception as e:
+            for _, _, future, _ in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for i, (_, _, future, _) in enumerate(group):
+            if not future.done():
+                confidence = confidences[i] if confidences is not None else None
+                future.set_result((predictions[i], confidence))
+    
+    def _record(self, size, waits):
+        self._batches += 1
+        self._rows += size
+        self._max_batch = max(self._max_batch, size)
+        self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+        self._wait_total += sum(waits)
+        self._wait_max = max(self._wait_max, max(waits))
+    
+    def stats(self):
+        """Batch size and queue wait metrics"""
+        return {
+            "enabled": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self._batches,
+            "rows": self._rows,
+            "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+            "max_observed_batch_size": self._max_batch,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "mean_queue_wait_ms": self._wait_total / self._rows * 1000 if self._rows else 0.0,
+            "max_queue_wait_ms": self._wait_max * 1000,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
@@ -0,0 +1,52 @@
+"""
+Cached dataset summary for the /dataset/info endpoint
+"""
+import hashlib
+import threading
+
+import pandas as pd
+
+
+class DatasetSummaryCache:
+    """
+    Compute the dataset summary once and reuse it while the file is unchanged
+    
+    The cache is keyed on the file's mtime and size; the same key is exposed as
+    an ETag so clients can poll with If-None-Match and get 304 Not Modified.
+    """
+    
+    def __init__(self, target_column='fetal_health'):
+        self.target_column = target_column
+        self._lock = threading.Lock()
+        self._key = None
+        self._summary = None
+        self._etag = None
+    
+    @staticmethod
+    def _file_key(path):
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+    
+    def _summarize(self, path):
+        df = pd.read_csv(path)
+        target = self.target_column
+        target_distribution = None
+        if target in df.columns:
+            target_distribution = {k: int(v) for k, v in df[target].value_counts().items()}
+        return {
+            "total_samples": len(df),
+            "features": len(df.columns) - 1,  # Excluding target column
+            "columns": df.columns.tolist(),
+            "target_distribution": target_distribution,
+            "missing_values": {k: int(v) for k, v in df.isnull().sum().items()}
+        }
+    
+    def get(self, path):
+        """Return (summary, etag), recomputing only when the file has changed"""
+        key = self._file_key(path)
+        with self._lock:
+            if key != self._key:
+                self._summary = self._summarize(path)
+                self._etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest() + '"'
+                self._key = key
+            return self._summary, self._etag
@@ -0,0 +1,166 @@
+"""
+Bounded executor that keeps CPU-bound model inference off the asyncio event loop
+"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from backend.app.services.model_service import (
+    ArtifactChanged, load_versioned_artifact, resolve_inference_path, run_inference,
+    serving_model
+)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Model state inside process-pool workers (loaded once by the initializer)
+_worker_model = None
+_worker_inference_path = None
+_worker_version = None
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when the inference backlog is full and the request must be rejected"""
+
+
+class StaleModelVersion(Exception):
+    """Raised when the workers for a model version have already been retired"""
+
+
+def _init_worker(model_path, version, mmap_mode=None, compiled_max_rows=0):
+    """Process-pool initializer: load the model artifact once per worker"""
+    global _worker_model, _worker_inference_path, _worker_version
+    model_dict, _worker_version = load_versioned_artifact(model_path, version, mmap_mode=mmap_mode)
+    _worker_model = serving_model(model_dict, compiled_max_rows)
+    _worker_inference_path = model_dict.get('inference_path') or resolve_inference_path(_worker_model)
+
+
+def _worker_ready():
+    return _worker_version
+
+
+def worker_inference(X, version):
+    """Run inference on an already scaled matrix inside a process-pool worker"""
+    if version != _worker_version:
+        raise ArtifactChanged(f"Worker serves model version {_worker_version}, not {version}")
+    return run_inference(_worker_model, X, _worker_inference_path)
+
+
+class InferenceExecutor:
+    """
+    Thread (default) or process pool with a concurrency limit and a bounded backlog
+    
+    At most `max_concurrency` calls run at once; up to `max_queue` more wait
+    for a slot. Anything beyond that raises ExecutorOverloaded so the API can
+    answer 503 instead of piling work onto the event loop.
+    
+    In process mode every model version gets its own pool, whose workers load
+    that exact artifact. Calls name the version their input was scaled for,
+    so a request always reaches the model that matches its bundle's scaler
+    while a new model is being swapped in.
+    """
+    
+    def __init__(self, kind="thread", max_workers=4, max_concurrency=None, max_queue=64,
+                 mmap_mode=None, compiled_max_rows=0):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}'. Use one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.max_queue = max_queue
+        self.mmap_mode = mmap_mode
+        self.compiled_max_rows = compiled_max_rows
+        self._pools = {}
+        self._semaphore = None
+        self._pending = 0
+        self._rejected = 0
+    
+    @property
+    def started(self):
+        return bool(self._pools)
+    
+    def start(self, model_path=None, version=None):
+        """
+        Create a worker pool
+        
+        Thread mode has a single pool shared by every model. In process mode
+        the workers load the artifact at model_path, which must be `version`,
+        and start returns once all of them are ready; the pools of other
+        versions keep serving until retire(). Calling it again for the same
+        version replaces that pool, letting submitted calls finish on the old one.
+        """
+        key = version if self.kind == "process" else None
+        if self.kind == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_path, version, self.mmap_mode, self.compiled_max_rows)
+            )
+            try:
+                for future in [pool.submit(_worker_ready) for _ in range(self.max_workers)]:
+                    future.result()
+            except Exception as e:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError(f"Inference workers failed to load model version {version}: {e}") from e
+        else:
+            pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="inference"
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        old_pool = self._pools.get(key)
+        self._pools[key] = pool
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+    
+    def retire(self, keep_version):
+        """Shut down the process pools of every model version except keep_version"""
+        for version in [v for v in self._pools if v != keep_version]:
+            self._pools.pop(version).shutdown(wait=False)
+    
+    async def submit(self, fn, *args, version=None):
+        """
+        Run fn(*args) in the pool, waiting in the bounded backlog if needed
+        
+        In process mode the call goes to the pool for `version` (which is also
+        passed on to fn) and raises StaleModelVersion if it was retired.
+        """
+        if not self._pools:
+            raise RuntimeError("Inference executor is not started")
+        if self.kind == "process":
+            args = (*args, version)
+        if self._pending >= self.max_concurrency + self.max_queue:
+            self._rejected += 1
+            raise ExecutorOverloaded(
+                f"Inference backlog full ({self._pending} requests in flight)"
+            )
+        
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                pool = self._pools.get(version if self.kind == "process" else None)
+                if pool is None:
+                    raise StaleModelVersion(f"Workers for model version {version} were retired")
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, functools.partial(fn, *args))
+        finally:
+            self._pending -= 1
+    
+    def stats(self):
+        """Current executor configuration and load"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "model_versions": [v for v in self._pools if v is not None],
+            "in_flight": self._pending,
+            "rejected": self._rejected
+        }
+    
+    def shutdown(self):
+        """Stop every worker pool"""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = {}
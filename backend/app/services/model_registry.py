@@ -0,0 +1,190 @@
+"""
+Model registry: load, warm up and atomically swap the served model artifact
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from backend.app.services.model_service import (
+    FeatureTransform, SmallBatchRouter, artifact_version, load_versioned_artifact,
+    resolve_inference_path, run_inference, serving_model
+)
+
+
+class ModelBundle:
+    """
+    Everything needed to serve one model artifact
+    
+    A bundle is built completely before it is published and never mutated
+    afterwards, so a handler that reads `registry.current` once sees a
+    consistent model/scaler/feature_names triple for the whole request.
+    """
+    
+    def __init__(self, model, scaler, feature_names, inference_path, feature_transform,
+                 model_name, version, path):
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = feature_names
+        self.inference_path = inference_path
+        self.feature_transform = feature_transform
+        self.model_name = model_name
+        self.version = version
+        self.path = path
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+    
+    def info(self):
+        """Public description of the served model"""
+        routed = isinstance(self.model, SmallBatchRouter)
+        base_model = self.model.model if routed else self.model
+        return {
+            "model_name": self.model_name,
+            "model_type": type(base_model).__name__,
+            "version": self.version,
+            "features": self.feature_transform.n_features,
+            "used_fields": self.feature_transform.field_order,
+            "inference_path": self.inference_path,
+            "engine": "compiled" if routed else "sklearn",
+            "loaded_at": self.loaded_at
+        }
+
+
+class ModelRegistry:
+    """
+    Holds the current ModelBundle and replaces it without restarting uvicorn
+    
+    New artifacts are loaded and warmed up with a dummy batch before the single
+    reference swap that publishes them; if loading fails the previous model
+    keeps serving. The artifact can be watched for changes or reloaded on demand.
+    
+    An optional `prepare(bundle)` callback runs after the bundle is built and
+    before it is published (e.g. to start inference workers for it); if it
+    raises, the load fails like any other loading error.
+    """
+    
+    def __init__(self, model_path, field_names, field_to_column=None, warmup_rows=8,
+                 mmap_mode=None, compiled_max_rows=0):
+        self.model_path = model_path
+        self.mmap_mode = mmap_mode
+        self.compiled_max_rows = compiled_max_rows
+        self.field_names = list(field_names)
+        self.field_to_column = field_to_column or {}
+        self.warmup_rows = warmup_rows
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._watch_task = None
+        self.last_error = None
+    
+    @property
+    def current(self):
+        return self._bundle
+    
+    def _build(self, path):
+        model_dict, version = load_versioned_artifact(path, mmap_mode=self.mmap_mode)
+        model = serving_model(model_dict, self.compiled_max_rows)
+        scaler = model_dict.get('scaler')
+        feature_names = model_dict.get('feature_names')
+        # Older artifacts do not record the inference path
+        inference_path = model_dict.get('inference_path') or resolve_inference_path(model)
+        
+        # Precompile the request -> NumPy row mapping and scaler statistics
+        feature_transform = FeatureTransform(
+            self.field_names, feature_names, scaler, self.field_to_column
+        )
+        
+        bundle = ModelBundle(
+            model=model,
+            scaler=scaler,
+            feature_names=feature_names,
+            inference_path=inference_path,
+            feature_transform=feature_transform,
+            model_name=model_dict.get('model_name', 'Unknown'),
+            version=version,
+            path=path
+        )
+        
+        # Warm up with dummy batches (all features at the training mean), both
+        # through the small-input path and the full model
+        for n_rows in (1, max(self.warmup_rows, self.compiled_max_rows + 1)):
+            run_inference(model, np.zeros((n_rows, feature_transform.n_features)), inference_path)
+        return bundle
+    
+    def load(self, prepare=None):
+        """
+        Load the artifact at model_path and publish it
+        
+        Returns the new bundle, or None if loading or `prepare` failed (the
+        previous model, if any, stays in place).
+        """
+        with self._lock:
+            try:
+                bundle = self._build(self.model_path)
+                if prepare is not None:
+                    prepare(bundle)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"✗ Error loading model: {e}")
+                return None
+            
+            self._bundle = bundle
+            self.last_error = None
+        
+        print(f"✓ Model loaded successfully from {self.model_path}")
+        print(f"  - Model type: {bundle.info()['model_type']}")
+        print(f"  - Engine: {bundle.info()['engine']}")
+        print(f"  - Model name: {bundle.model_name}")
+        print(f"  - Features: {bundle.feature_transform.n_features}")
+        print(f"  - Inference path: {bundle.inference_path}")
+        print(f"  - Version: {bundle.version}")
+        print(f"  - Memory-mapped: {'yes' if self.mmap_mode else 'no'}")
+        return bundle
+    
+    async def reload(self, prepare=None):
+        """Load the artifact in a background thread and swap it in"""
+        return await asyncio.to_thread(self.load, prepare)
+    
+    def start_watching(self, interval, prepare=None, on_swap=None):
+        """Poll the artifact every `interval` seconds and reload it when it changes"""
+        if interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(interval, prepare, on_swap))
+    
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+    
+    async def _watch(self, interval, prepare, on_swap):
+        pending = None
+        failed = None
+        while True:
+            await asyncio.sleep(interval)
+            if not self.model_path.exists():
+                continue
+            
+            version = artifact_version(self.model_path)
+            current = self._bundle.version if self._bundle is not None else None
+            if version in (current, failed):
+                pending = None
+                continue
+            
+            # Wait until the file is stable for one interval (training may still be writing)
+            if version != pending:
+                pending = version
+                continue
+            
+            pending = None
+            started = time.perf_counter()
+            bundle = await self.reload(prepare)
+            if bundle is None:
+                failed = version
+                continue
+            
+            print(f"✓ Model hot-reloaded in {time.perf_counter() - started:.2f}s")
+            if on_swap is not None:
+                on_swap(bundle)
@@ -1 +1,189 @@
-# carga de modelos
\ No newline at end of file
+"""
+Inference layer for the fetal health model
+"""
+import hashlib
+
+import joblib
+import numpy as np
+
+# Inference paths recorded in the model artifact
+PROBA_PATH = "predict_proba"
+PREDICT_PATH = "predict"
+
+
+def load_artifact(path, mmap_mode=None):
+    """
+    Load a model artifact as a dictionary
+    
+    With mmap_mode='r' the large NumPy arrays of an uncompressed joblib artifact
+    (tree node arrays, scaler statistics) are memory-mapped read-only instead of
+    copied, so every worker process shares the same pages through the OS page
+    cache. Legacy artifacts that store the model directly are wrapped.
+    """
+    model_dict = joblib.load(path, mmap_mode=mmap_mode)
+    if not isinstance(model_dict, dict):
+        model_dict = {'model': model_dict}
+    return model_dict
+
+
+class ArtifactChanged(Exception):
+    """Raised when the artifact on disk is not (or stopped being) the expected version"""
+
+
+def artifact_version(path):
+    """Short version id derived from the artifact's mtime and size"""
+    stat = path.stat()
+    return hashlib.sha1(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()[:12]
+
+
+def load_versioned_artifact(path, version=None, mmap_mode=None):
+    """
+    Load a model artifact and return (model_dict, version)
+    
+    The version is read before and after loading, so a file replaced while it
+    was being read raises ArtifactChanged instead of pairing the model with
+    the version id of another file. If `version` is given the file must be
+    that version.
+    """
+    found = artifact_version(path)
+    if version is not None and found != version:
+        raise ArtifactChanged(f"Expected model version {version} at {path}, found {found}")
+    model_dict = load_artifact(path, mmap_mode=mmap_mode)
+    if artifact_version(path) != found:
+        raise ArtifactChanged(f"{path} changed while it was being loaded")
+    return model_dict, found
+
+
+class SmallBatchRouter:
+    """
+    Serve small inputs from the compiled tree engine and large ones from sklearn
+    
+    The compiled engine (src.tree_engine) avoids sklearn's per-call overhead,
+    which dominates for a handful of rows; for big batches sklearn's Cython
+    traversal is faster, so rows above `max_rows` go to the original model.
+    """
+    
+    def __init__(self, model, compiled, max_rows):
+        self.model = model
+        self.compiled = compiled
+        self.max_rows = max_rows
+        self.classes_ = model.classes_
+    
+    def _pick(self, X):
+        return self.compiled if len(X) <= self.max_rows else self.model
+    
+    def predict_proba(self, X):
+        return self._pick(X).predict_proba(X)
+    
+    def predict(self, X):
+        return self._pick(X).predict(X)
+
+
+def serving_model(model_dict, compiled_max_rows=0):
+    """
+    Return the estimator to serve from an artifact
+    
+    If the artifact carries a compiled tree engine and compiled_max_rows > 0,
+    the model is wrapped in a SmallBatchRouter; otherwise the sklearn model is
+    returned as is.
+    """
+    model = model_dict.get('model')
+    compiled = model_dict.get('compiled_model')
+    if compiled is not None and compiled_max_rows > 0:
+        return SmallBatchRouter(model, compiled, compiled_max_rows)
+    return model
+
+
+def resolve_inference_path(model):
+    """Decide once which inference path a model supports"""
+    if hasattr(model, "predict_proba") and hasattr(model, "classes_"):
+        return PROBA_PATH
+    return PREDICT_PATH
+
+
+def run_inference(model, X, inference_path):
+    """
+    Score a (scaled) matrix with a single pass over the model
+    
+    For models with predict_proba the probabilities are computed once and the
+    class is derived from their argmax through model.classes_; other models
+    fall back to predict.
+    
+    Returns a tuple (predictions, confidences); confidences is None on the
+    predict path.
+    """
+    if inference_path == PROBA_PATH:
+        probabilities = model.predict_proba(X)
+        best = probabilities.argmax(axis=1)
+        predictions = np.asarray(model.classes_)[best]
+        confidences = probabilities[np.arange(len(best)), best]
+        return predictions, confidences
+    
+    return np.asarray(model.predict(X)), None
+
+
+class FeatureTransform:
+    """
+    DataFrame-free input transform, precompiled once when the model is loaded
+    
+    Holds the pydantic field names in training column order plus the
+    StandardScaler statistics, so a request becomes a contiguous float64 row
+    scaled with a single (x - mean_) / scale_ array operation. Only the
+    artifact's feature_names are read, so a model trained on a selected subset
+    ignores the other request fields.
+    """
+    
+    def __init__(self, field_names, feature_names=None, scaler=None, field_to_column=None):
+        field_to_column = field_to_column or {}
+        column_to_field = {field_to_column.get(name, name): name for name in field_names}
+        
+        if feature_names is None:
+            self.field_order = list(field_names)
+        else:
+            missing = [col for col in feature_names if col not in column_to_field]
+            if missing:
+                raise ValueError(f"Model features not available in the request schema: {missing}")
+            self.field_order = [column_to_field[col] for col in feature_names]
+        
+        self.n_features = len(self.field_order)
+        self.scaler = scaler
+        self.scaler_mean = None
+        self.scaler_scale = None
+        
+        # StandardScaler is applied as a precomputed array op; any other
+        # scaler keeps using its own transform
+        if scaler is not None and hasattr(scaler, "scale_") and hasattr(scaler, "with_mean"):
+            mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(self.n_features)
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(self.n_features)
+            self.scaler_mean = np.ascontiguousarray(mean, dtype=np.float64)
+            self.scaler_scale = np.ascontiguousarray(scale, dtype=np.float64)
+    
+    def scale(self, X):
+        """Apply the scaler to an unscaled (n_samples, n_features) matrix"""
+        if self.scaler_mean is not None:
+            return (X - self.scaler_mean) / self.scaler_scale
+        if self.scaler is not None:
+            return self.scaler.transform(X)
+        return X
+    
+    def raw_row(self, features):
+        """Turn one pydantic model into an unscaled (1, n_features) matrix"""
+        return np.fromiter(
+            (getattr(features, name) for name in self.field_order),
+            dtype=np.float64, count=self.n_features
+        ).reshape(1, -1)
+    
+    def raw_matrix(self, instances):
+        """Turn a list of pydantic models into an unscaled (n_samples, n_features) matrix"""
+        return np.array(
+            [[getattr(item, name) for name in self.field_order] for item in instances],
+            dtype=np.float64
+        ).reshape(len(instances), self.n_features)
+    
+    def row(self, features):
+        """Turn one pydantic model into a scaled (1, n_features) matrix"""
+        return self.scale(self.raw_row(features))
+    
+    def matrix(self, instances):
+        """Turn a list of pydantic models into a scaled (n_samples, n_features) matrix"""
+        return self.scale(self.raw_matrix(instances))
@@ -0,0 +1,88 @@
+"""
+LRU + TTL cache of predictions keyed on the input feature vector
+"""
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Cache (prediction, confidence) pairs for repeated feature vectors
+    
+    The key hashes the model version together with the ordered feature vector,
+    optionally rounded to `decimals` so near-identical submissions share an
+    entry. Because the version is part of the key, a model reload invalidates
+    every previous entry; those simply age out of the LRU. Entries also expire
+    after `ttl_seconds`. Only used from the event loop, so no locking.
+    """
+    
+    def __init__(self, max_size=10000, ttl_seconds=300.0, decimals=None):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.decimals = decimals
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+    
+    @property
+    def enabled(self):
+        return self.max_size > 0
+    
+    def keys(self, X, version):
+        """One cache key per row of an unscaled (n_samples, n_features) matrix"""
+        if self.decimals is not None:
+            # + 0.0 folds -0.0 into 0.0 so both hash the same
+            X = np.round(X, self.decimals) + 0.0
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        prefix = str(version).encode()
+        return [hashlib.blake2b(prefix + row.tobytes(), digest_size=16).digest() for row in X]
+    
+    def get(self, key):
+        """Return the cached (prediction, confidence) or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._expirations += 1
+            self._misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+    
+    def put(self, key, value):
+        """Store a (prediction, confidence) pair, evicting the least recently used"""
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and occupancy"""
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "decimals": self.decimals,
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations
+        }
@@ -7,14 +7,25 @@ This script performs comprehensive EDA including:
 - Class imbalance evaluation
 - Feature correlations
 Note: Visualization code removed for containerized execution
+
+With --stream the dataset is read in chunks and the same report is built
+from mergeable accumulators (eda_stats.StreamingEDA), so it can run over
+exports that don't fit in memory.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import warnings
 
 from configure import RAW_DATA, DATA_DIR
-from src.load_data import load_data
+from eda_stats import FrameEDA, StreamingEDA, as_eda_stats
+from src.correlation import (
+    HIGH_CORRELATION, blockwise_high_correlation_pairs, high_correlation_pairs, target_correlations
+)
+from src.load_data import SCHEMA, load_data
+
+DEFAULT_CHUNKSIZE = 100_000
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -30,29 +41,42 @@ def print_section_header(title):
 def analyze_dataset_overview(df):
     """Analyze basic dataset information"""
     print_section_header("1. OVERVIEW OF THE DATASET")
+    stats = as_eda_stats(df)
     
     # Display first rows
     print("First 5 rows:")
-    print(df.head())
+    print(stats.head())
     
     # Basic information
     print("\n" + "-" * 80)
     print("Dataset Information:")
-    df.info()
+    if isinstance(stats, FrameEDA):
+        stats.df.info()
+    else:
+        # Streaming mode has no frame in memory: same per-column counts and dtypes
+        print(pd.DataFrame({'Non-Null Count': stats.non_null_counts(), 'Dtype': stats.dtypes}))
+    print("\nNote: integer-valued columns are loaded as float32 (src.load_data.SCHEMA, lossless); "
+          "fractional rates and the target stay float64")
     
     # Dimensions
     print("\n" + "-" * 80)
-    print(f"Dataset Shape: {df.shape[0]} rows and {df.shape[1]} columns")
+    print(f"Dataset Shape: {stats.n_rows} rows and {len(stats.columns)} columns")
     
     return df
 
 
+def _dtype_summary(stats):
+    """Column count per dtype, e.g. '13 float32, 9 float64'"""
+    counts = pd.Series(stats.dtypes).astype(str).value_counts().sort_index()
+    return ", ".join(f"{count} {dtype}" for dtype, count in counts.items())
+
+
 def analyze_missing_values(df):
     """Check for missing values"""
     print_section_header("2. MISSING VALUES ANALYSIS")
     
     # Print missing values count
-    missing_count = df.isnull().sum()
+    missing_count = as_eda_stats(df).missing_counts()
     print("\nMissing values per column:")
     if missing_count.any():
         print(missing_count[missing_count > 0])
@@ -63,12 +87,13 @@ def analyze_missing_values(df):
 def analyze_duplicates(df):
     """Check for duplicate rows"""
     print_section_header("3. DUPLICATE ROWS ANALYSIS")
+    stats = as_eda_stats(df)
     
-    duplicates_count = df.duplicated().sum()
+    duplicates_count = stats.duplicate_count()
     print(f"Number of duplicate rows: {duplicates_count}")
     
     if duplicates_count > 0:
-        print(f"Percentage of duplicates: {(duplicates_count / len(df)) * 100:.2f}%")
+        print(f"Percentage of duplicates: {(duplicates_count / stats.n_rows) * 100:.2f}%")
         print("\nNote: These duplicates are likely valid data (different cardiotocograms")
         print("      with the same values), so we will keep them in the dataset.")
     else:
@@ -80,7 +105,7 @@ def analyze_descriptive_stats(df):
     print_section_header("4. DESCRIPTIVE STATISTICS")
     
     print("Statistical summary (transposed):")
-    print(df.describe().T)
+    print(as_eda_stats(df).describe().T)
 
 
 def plot_feature_distributions(df):
@@ -88,18 +113,19 @@ def plot_feature_distributions(df):
     print_section_header("5. FEATURE DISTRIBUTIONS")
     
     print("Feature distribution statistics:")
-    print(df.describe().T[['mean', 'std', 'min', '25%', '50%', '75%', 'max']])
+    print(as_eda_stats(df).describe().T[['mean', 'std', 'min', '25%', '50%', '75%', 'max']])
 
 
 def analyze_target_variable(df):
     """Analyze target variable distribution and class balance"""
     print_section_header("6. TARGET VARIABLE ANALYSIS (fetal_health)")
+    stats = as_eda_stats(df)
     
     # Calculate class counts and percentages
-    class_counts = df['fetal_health'].value_counts().sort_index()
-    class_percentages = df['fetal_health'].value_counts(normalize=True).sort_index() * 100
+    class_counts = stats.class_counts('fetal_health')
+    class_percentages = class_counts / class_counts.sum() * 100
     
-    print(f"\nTotal observations: {len(df)}")
+    print(f"\nTotal observations: {stats.n_rows}")
     print("\nClass distribution:")
     for idx, (count, pct) in enumerate(zip(class_counts, class_percentages), 1):
         class_name = {1: 'Normal', 2: 'Sospechoso', 3: 'Patológico'}.get(idx, f'Class {idx}')
@@ -110,8 +136,8 @@ def evaluate_class_balance(df):
     """Evaluate class imbalance and provide recommendations"""
     print_section_header("7. CLASS BALANCE EVALUATION")
     
-    class_counts = df['fetal_health'].value_counts().sort_index()
-    class_percentages = df['fetal_health'].value_counts(normalize=True).sort_index() * 100
+    class_counts = as_eda_stats(df).class_counts('fetal_health')
+    class_percentages = class_counts / class_counts.sum() * 100
     
     # Calculate imbalance metrics
     max_class = class_counts.max()
@@ -143,81 +169,135 @@ def evaluate_class_balance(df):
     print("-" * 60)
 
 
-def analyze_correlations(df):
-    """Analyze feature correlations"""
+def analyze_correlations(df, threshold=HIGH_CORRELATION, block_size=None, dtype=np.float64):
+    """
+    Analyze feature correlations
+    
+    Args:
+        df: DataFrame or EDA statistics source
+        threshold: |correlation| above which a pair is reported
+        block_size: For wide in-memory frames, compute the pairs block by block
+            (complete rows only) instead of building the full matrix
+        dtype: np.float32 halves the memory of the block-wise computation
+    Returns:
+        DataFrame of highly correlated pairs (feature_1, feature_2, correlation)
+    """
     print_section_header("8. CORRELATION ANALYSIS")
+    stats = as_eda_stats(df)
     
     print("Calculating correlation matrix...")
     
-    # Calculate correlation matrix
-    corrmat = df.corr()
+    if block_size is not None and isinstance(stats, FrameEDA):
+        high_corr = blockwise_high_correlation_pairs(stats.df, threshold, block_size, dtype)
+        target_corr = (target_correlations(stats.df, stats.df['fetal_health'], dtype)
+                       if 'fetal_health' in stats.columns else None)
+    else:
+        corrmat = stats.corr()
+        high_corr = high_correlation_pairs(corrmat, threshold)
+        target_corr = corrmat['fetal_health'] if 'fetal_health' in corrmat.columns else None
     
     # Find highly correlated features
-    print("\nHighly correlated features (|correlation| > 0.7):")
-    high_corr = []
-    for i in range(len(corrmat.columns)):
-        for j in range(i+1, len(corrmat.columns)):
-            if abs(corrmat.iloc[i, j]) > 0.7:
-                high_corr.append((corrmat.columns[i], corrmat.columns[j], corrmat.iloc[i, j]))
-    
-    if high_corr:
-        for feat1, feat2, corr in sorted(high_corr, key=lambda x: abs(x[2]), reverse=True):
+    print(f"\nHighly correlated features (|correlation| > {threshold}):")
+    if len(high_corr):
+        for feat1, feat2, corr in high_corr.itertuples(index=False):
             print(f"  {feat1} <-> {feat2}: {corr:.3f}")
     else:
-        print("  No features with correlation > 0.7 found")
+        print(f"  No features with correlation > {threshold} found")
     
     # Features with low correlation to target
-    if 'fetal_health' in corrmat.columns:
-        target_corr = corrmat['fetal_health'].abs().sort_values(ascending=True)
+    if target_corr is not None:
+        target_abs = target_corr.abs().sort_values(ascending=True)
         print("\nFeatures with lowest correlation to target (|correlation| < 0.1):")
-        low_corr_features = target_corr[target_corr < 0.1].drop('fetal_health', errors='ignore')
+        low_corr_features = target_abs[target_abs < 0.1].drop('fetal_health', errors='ignore')
         if len(low_corr_features) > 0:
-            for feat, corr in low_corr_features.items():
-                print(f"  {feat}: {corrmat.loc[feat, 'fetal_health']:.3f}")
+            for feat in low_corr_features.index:
+                print(f"  {feat}: {target_corr[feat]:.3f}")
             print("\n  💡 Consider removing these features during feature selection")
         else:
             print("  All features show meaningful correlation with target")
+    
+    return high_corr
+
+
+def save_correlated_pairs(high_corr):
+    """Save the highly correlated pairs for feature selection in training"""
+    pairs_path = DATA_DIR / "processed" / "high_correlation_pairs.csv"
+    pairs_path.parent.mkdir(parents=True, exist_ok=True)
+    high_corr.to_csv(pairs_path, index=False)
+    print(f"\n✅ Correlated pairs saved to: {pairs_path}")
 
 
 def save_clean_dataset(df):
     """Save cleaned dataset"""
     print_section_header("9. SAVING CLEAN DATASET")
+    stats = as_eda_stats(df)
     
     processed_path = DATA_DIR / "processed" / "fetal_health_clean.csv"
     processed_path.parent.mkdir(parents=True, exist_ok=True)
     
-    df.to_csv(processed_path, index=False)
+    # In streaming mode the clean copy was already written chunk by chunk
+    if isinstance(stats, FrameEDA):
+        stats.df.to_csv(processed_path, index=False)
     print(f"✅ Dataset guardado en: {processed_path}")
-    print(f"   Filas: {df.shape[0]} | Columnas: {df.shape[1]}")
+    print(f"   Filas: {stats.n_rows} | Columnas: {len(stats.columns)}")
+
+
+def stream_dataset(source_path, processed_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read the dataset in chunks, accumulating the EDA statistics and writing the clean copy
+    
+    Only one chunk is held in memory at a time.
+    
+    Returns:
+        StreamingEDA with the statistics of the whole dataset
+    """
+    stats = StreamingEDA()
+    processed_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = processed_path.with_suffix('.csv.tmp')
+    with open(tmp_path, 'w', newline='') as f:
+        for i, chunk in enumerate(pd.read_csv(source_path, chunksize=chunksize, dtype=SCHEMA)):
+            stats.update(chunk)
+            chunk.to_csv(f, header=(i == 0), index=False)
+    tmp_path.replace(processed_path)
+    
+    approximate = stats.approximate_columns()
+    if approximate:
+        print(f"⚠️  Approximate quantiles (too many distinct values): {approximate}")
+    return stats
 
 
 def generate_eda_summary(df):
     """Generate EDA summary report"""
     print_section_header("10. EDA SUMMARY")
+    stats = as_eda_stats(df)
+    
+    class_counts = stats.class_counts('fetal_health')
+    imbalance_ratio = class_counts.max() / class_counts.min()
+    duplicates_count = stats.duplicate_count()
     
     summary = f"""
 EDA SUMMARY REPORT
 {'=' * 80}
 
 Dataset Characteristics:
-- Total observations: {df.shape[0]}
-- Total features: {df.shape[1] - 1} (predictors)
+- Total observations: {stats.n_rows}
+- Total features: {len(stats.columns) - 1} (predictors)
 - Target variable: fetal_health
-- Data types: All numeric (float64)
-- Missing values: {df.isnull().sum().sum()}
-- Duplicate rows: {df.duplicated().sum()}
+- Data types: All numeric ({_dtype_summary(stats)})
+- Missing values: {stats.missing_counts().sum()}
+- Duplicate rows: {duplicates_count}
 
 Target Variable Distribution:
-{df['fetal_health'].value_counts().sort_index().to_string()}
+{class_counts.to_string()}
 
 Class Balance:
-- Imbalance ratio: {df['fetal_health'].value_counts().max() / df['fetal_health'].value_counts().min():.2f}:1
+- Imbalance ratio: {imbalance_ratio:.2f}:1
 
 Key Findings:
 1. Dataset is complete with no missing values
 2. All features are numeric, ready for modeling
-3. {df.duplicated().sum()} duplicate rows found (likely valid data)
-4. Class distribution shows {'moderate' if 1.5 <= df['fetal_health'].value_counts().max() / df['fetal_health'].value_counts().min() < 3 else 'severe' if df['fetal_health'].value_counts().max() / df['fetal_health'].value_counts().min() >= 3 else 'balanced'} imbalance
+3. {duplicates_count} duplicate rows found (likely valid data)
+4. Class distribution shows {'moderate' if 1.5 <= imbalance_ratio < 3 else 'severe' if imbalance_ratio >= 3 else 'balanced'} imbalance
 
 Recommendations:
 - Use stratified train-test split
@@ -239,28 +319,86 @@ Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
     print(f"\n✅ Summary saved to: {summary_path}")
 
 
+def run_eda_report(data, corr_block_size=None, corr_dtype=np.float64):
+    """
+    Run every EDA section
+    
+    Args:
+        data: Statistics source (FrameEDA/StreamingEDA) shared by all sections,
+            or a DataFrame (then each section computes its own statistics)
+    Returns:
+        DataFrame of highly correlated pairs
+    """
+    analyze_dataset_overview(data)
+    analyze_missing_values(data)
+    analyze_duplicates(data)
+    analyze_descriptive_stats(data)
+    plot_feature_distributions(data)
+    analyze_target_variable(data)
+    evaluate_class_balance(data)
+    high_corr = analyze_correlations(data, block_size=corr_block_size, dtype=corr_dtype)
+    save_correlated_pairs(high_corr)
+    save_clean_dataset(data)
+    generate_eda_summary(data)
+    return high_corr
+
+
+def parse_args():
+    """Command line arguments"""
+    parser = argparse.ArgumentParser(description="EDA of the fetal health dataset")
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Read the dataset in chunks (for datasets that don't fit in memory)"
+    )
+    parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help=f"Rows per chunk in streaming mode (default: {DEFAULT_CHUNKSIZE})"
+    )
+    parser.add_argument(
+        '--corr-block-size', type=int,
+        help="Compute correlated pairs block by block (wide datasets, in-memory mode)"
+    )
+    parser.add_argument(
+        '--corr-float32', action='store_true',
+        help="Use float32 for the block-wise correlation"
+    )
+    parser.add_argument(
+        '--timings', action='store_true',
+        help="Print the time spent computing each shared statistic (in-memory mode)"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main EDA execution function"""
+    args = parse_args()
+    
     print("\n" + "=" * 80)
     print("  EXPLORATORY DATA ANALYSIS - FETAL HEALTH DATASET")
     print("=" * 80)
     
     # Load data
     print("\nLoading dataset...")
-    df = load_data(RAW_DATA / "fetal_health.csv")
-    print(f"✅ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-    
-    # Execute all EDA steps
-    analyze_dataset_overview(df)
-    analyze_missing_values(df)
-    analyze_duplicates(df)
-    analyze_descriptive_stats(df)
-    plot_feature_distributions(df)
-    analyze_target_variable(df)
-    evaluate_class_balance(df)
-    analyze_correlations(df)
-    save_clean_dataset(df)
-    generate_eda_summary(df)
+    if args.stream:
+        df = stream_dataset(
+            RAW_DATA / "fetal_health.csv",
+            DATA_DIR / "processed" / "fetal_health_clean.csv",
+            chunksize=args.chunksize
+        )
+    else:
+        df = load_data(RAW_DATA / "fetal_health.csv")
+    stats = as_eda_stats(df)
+    print(f"✅ Dataset loaded: {stats.n_rows} rows, {len(stats.columns)} columns")
+    
+    # Execute all EDA steps (sharing the memoized statistics)
+    run_eda_report(
+        stats, corr_block_size=args.corr_block_size,
+        corr_dtype=np.float32 if args.corr_float32 else np.float64
+    )
+    
+    if args.timings and isinstance(stats, FrameEDA):
+        print_section_header("STATISTICS TIMING BREAKDOWN")
+        print(stats.timing_breakdown().to_string(index=False))
     
     print("\n" + "=" * 80)
     print("  EDA COMPLETED SUCCESSFULLY! ✅")
@@ -268,6 +406,7 @@ def main():
     print("\nGenerated files:")
     print(f"  - {DATA_DIR / 'processed' / 'fetal_health_clean.csv'}")
     print(f"  - {DATA_DIR / 'processed' / 'eda_summary.txt'}")
+    print(f"  - {DATA_DIR / 'processed' / 'high_correlation_pairs.csv'}")
     print("\n")
 
 
@@ -0,0 +1,321 @@
+"""
+Statistics sources for the EDA report
+
+The report functions in eda.py read their numbers from one of two sources
+with the same interface:
+
+- FrameEDA:     a DataFrame held in memory; pandas computes each statistic
+                the first time a report asks for it and the result is reused
+- StreamingEDA: mergeable accumulators updated chunk by chunk, for datasets
+                that don't fit in memory
+
+StreamingEDA keeps per column Welford/Chan moments (count, mean, M2), min and
+max, an exact value histogram (quantiles and class counts; it is compressed
+into weighted centroids, and the quantiles become approximate, once a column
+exceeds `max_distinct` distinct values), a running co-moment matrix for the
+correlations (over complete rows) and the set of 64-bit row hashes for the
+duplicate count. Two accumulators built over disjoint chunks can be merged,
+so chunks can also be processed in parallel.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+HEAD_ROWS = 5
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _lerp(low, high, t):
+    """Linear interpolation written as numpy's quantile does it (same rounding)"""
+    diff = high - low
+    return np.where(t >= 0.5, high - diff * (1 - t), low + diff * t)
+
+
+class ValueHistogram:
+    """Sorted distinct values and their counts for one column (mergeable)"""
+
+    def __init__(self, max_distinct=100_000):
+        self.max_distinct = max_distinct
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.approximate = False
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        distinct, counts = np.unique(values, return_counts=True)
+        self._combine(distinct, counts, False)
+        return self
+
+    def merge(self, other):
+        self._combine(other.values, other.counts, other.approximate)
+        return self
+
+    def _combine(self, values, counts, approximate):
+        all_values = np.concatenate([self.values, values])
+        distinct, inverse = np.unique(all_values, return_inverse=True)
+        self.counts = np.bincount(
+            inverse, weights=np.concatenate([self.counts, counts]), minlength=len(distinct)
+        ).astype(np.int64)
+        self.values = distinct
+        self.approximate = self.approximate or approximate
+        if len(self.values) > self.max_distinct:
+            self._compress()
+
+    def _compress(self):
+        """Collapse into max_distinct / 2 equal-count centroids (weighted means)"""
+        n_bins = max(self.max_distinct // 2, 1)
+        cumulative = np.cumsum(self.counts)
+        bins = np.minimum((cumulative - 1) * n_bins // cumulative[-1], n_bins - 1)
+        counts = np.bincount(bins, weights=self.counts, minlength=n_bins)
+        sums = np.bincount(bins, weights=self.values * self.counts, minlength=n_bins)
+        keep = counts > 0
+        self.values = sums[keep] / counts[keep]
+        self.counts = counts[keep].astype(np.int64)
+        self.approximate = True
+
+    def quantiles(self, qs=QUANTILES):
+        """Quantiles with linear interpolation (pandas' default)"""
+        n = self.counts.sum()
+        if n == 0:
+            return np.full(len(qs), np.nan)
+        cumulative = np.cumsum(self.counts)
+        positions = (n - 1) * np.asarray(qs, dtype=np.float64)
+        below = np.floor(positions)
+        low = self.values[np.searchsorted(cumulative, below, side='right')]
+        high = self.values[np.searchsorted(cumulative, np.ceil(positions), side='right')]
+        return _lerp(low, high, positions - below)
+
+    def value_counts(self):
+        return pd.Series(self.counts, index=self.values, name='count')
+
+
+class FrameEDA:
+    """
+    EDA statistics of a DataFrame in memory
+
+    Each statistic is computed lazily, once per run, and memoized: the report
+    functions share one FrameEDA, so describe(), value_counts() and
+    duplicated() run a single time however many sections use them. The
+    returned objects are shared; don't modify them in place.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+        self._timings = {}
+
+    def _memo(self, key, compute):
+        """Return the cached statistic, computing it (and timing it) on first use"""
+        timing = self._timings.setdefault(key, {'calls': 0, 'seconds': 0.0})
+        timing['calls'] += 1
+        if key not in self._cache:
+            start = time.perf_counter()
+            self._cache[key] = compute()
+            timing['seconds'] = time.perf_counter() - start
+        return self._cache[key]
+
+    def timing_breakdown(self):
+        """Per statistic: calls, seconds to compute it once and seconds saved by reusing it"""
+        rows = [
+            {
+                'statistic': key if isinstance(key, str) else f"{key[0]}({key[1]})",
+                'calls': timing['calls'],
+                'seconds': timing['seconds'],
+                'saved_seconds': timing['seconds'] * (timing['calls'] - 1)
+            }
+            for key, timing in self._timings.items()
+        ]
+        return pd.DataFrame(rows, columns=['statistic', 'calls', 'seconds', 'saved_seconds'])
+
+    @property
+    def n_rows(self):
+        return len(self.df)
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    @property
+    def dtypes(self):
+        return self.df.dtypes
+
+    def head(self):
+        return self.df.head(HEAD_ROWS)
+
+    def non_null_counts(self):
+        return self._memo('non_null_counts', lambda: self.df.notnull().sum())
+
+    def missing_counts(self):
+        return self._memo('missing_counts', lambda: self.df.isnull().sum())
+
+    def duplicate_count(self):
+        return self._memo('duplicate_count', lambda: int(self.df.duplicated().sum()))
+
+    def describe(self):
+        def compute():
+            # pandas accumulates float32 columns in float32; describe them in float64
+            float32 = self.df.select_dtypes(include=np.float32).columns
+            return self.df.astype({column: np.float64 for column in float32}).describe()
+        return self._memo('describe', compute)
+
+    def class_counts(self, column):
+        return self._memo(('class_counts', column), lambda: self.df[column].value_counts().sort_index())
+
+    def corr(self):
+        return self._memo('corr', self.df.corr)
+
+
+class StreamingEDA:
+    """
+    EDA statistics accumulated over chunks of a dataset
+
+    Args:
+        max_distinct: Distinct values kept exactly per column before its
+            histogram (and so its quantiles) becomes approximate
+    """
+
+    def __init__(self, max_distinct=100_000):
+        self.max_distinct = max_distinct
+        self.n_rows = 0
+        self.columns = None
+        self.dtypes = None
+        self._head = None
+        self.missing = None
+        # Moments per column (non-null values)
+        self.count = self.mean = self.m2 = self.min = self.max = None
+        self.histograms = None
+        # Co-moment matrix over complete rows
+        self.cov_n = 0
+        self.cov_mean = self.comoment = None
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+
+    @classmethod
+    def from_frame(cls, df, max_distinct=100_000):
+        """Accumulator of a single chunk"""
+        stats = cls(max_distinct)
+        values = df.to_numpy(dtype=np.float64)
+        n_columns = values.shape[1]
+        present = ~np.isnan(values)
+
+        stats.n_rows = len(df)
+        stats.columns = list(df.columns)
+        stats.dtypes = df.dtypes
+        stats._head = df.head(HEAD_ROWS)
+        stats.missing = (~present).sum(axis=0)
+
+        stats.count = present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats.mean = np.nansum(values, axis=0) / stats.count
+            stats.m2 = np.nansum((values - stats.mean) ** 2, axis=0)
+        stats.min = np.where(present, values, np.inf).min(axis=0, initial=np.inf)
+        stats.max = np.where(present, values, -np.inf).max(axis=0, initial=-np.inf)
+        stats.histograms = [
+            ValueHistogram(max_distinct).update(values[:, j]) for j in range(n_columns)
+        ]
+
+        complete = values[present.all(axis=1)]
+        stats.cov_n = len(complete)
+        stats.cov_mean = complete.mean(axis=0) if len(complete) else np.zeros(n_columns)
+        centered = complete - stats.cov_mean
+        stats.comoment = centered.T @ centered
+
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        stats.row_hashes = np.unique(hashes)
+        return stats
+
+    def update(self, chunk):
+        """Add a chunk of rows"""
+        return self.merge(StreamingEDA.from_frame(chunk, self.max_distinct))
+
+    def merge(self, other):
+        """Combine with the accumulator of other (disjoint) rows"""
+        if other.n_rows == 0:
+            return self
+        if self.n_rows == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge EDA accumulators with different columns")
+
+        self.n_rows += other.n_rows
+        self.missing = self.missing + other.missing
+
+        # Chan et al. pairwise update of count, mean and M2
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, self.mean + delta * other.count / count, np.nan)
+            m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.mean = np.where(self.count == 0, other.mean, np.where(other.count == 0, self.mean, mean))
+        self.m2 = np.where(self.count == 0, other.m2, np.where(other.count == 0, self.m2, m2))
+        self.count = count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        for histogram, other_histogram in zip(self.histograms, other.histograms):
+            histogram.merge(other_histogram)
+
+        if other.cov_n:
+            cov_n = self.cov_n + other.cov_n
+            delta = other.cov_mean - self.cov_mean
+            self.comoment = (self.comoment + other.comoment
+                             + np.outer(delta, delta) * self.cov_n * other.cov_n / cov_n)
+            self.cov_mean = self.cov_mean + delta * other.cov_n / cov_n
+            self.cov_n = cov_n
+
+        self.row_hashes = np.union1d(self.row_hashes, other.row_hashes)
+        return self
+
+    def head(self):
+        return self._head
+
+    def non_null_counts(self):
+        return pd.Series(self.count, index=self.columns)
+
+    def missing_counts(self):
+        return pd.Series(self.missing, index=self.columns)
+
+    def duplicate_count(self):
+        """Rows equal to an earlier row (64-bit row hashes, like df.duplicated().sum())"""
+        return int(self.n_rows - len(self.row_hashes))
+
+    def approximate_columns(self):
+        """Columns whose quantiles are approximate (too many distinct values)"""
+        return [c for c, histogram in zip(self.columns, self.histograms) if histogram.approximate]
+
+    def describe(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (self.count - 1))
+        quantiles = np.array([histogram.quantiles() for histogram in self.histograms])
+        empty = self.count == 0
+        return pd.DataFrame(
+            [
+                self.count.astype(np.float64),
+                np.where(empty, np.nan, self.mean),
+                std,
+                np.where(empty, np.nan, self.min),
+                *quantiles.T,
+                np.where(empty, np.nan, self.max),
+            ],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            columns=self.columns
+        )
+
+    def class_counts(self, column):
+        counts = self.histograms[self.columns.index(column)].value_counts()
+        counts.index.name = column
+        return counts
+
+    def corr(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.diag(self.comoment))
+            corr = self.comoment / np.outer(std, std)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def as_eda_stats(data):
+    """Wrap a DataFrame as FrameEDA; statistics sources are returned as they are"""
+    return FrameEDA(data) if isinstance(data, pd.DataFrame) else data
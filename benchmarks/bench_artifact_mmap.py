@@ -0,0 +1,116 @@
+"""
+Benchmark: per-worker memory and cold-start time of the model artifact,
+loaded normally versus memory-mapped (joblib.load(..., mmap_mode='r'))
+
+Starts N worker processes that each load the artifact and score one batch,
+then reports, while all workers are alive, their RSS (resident memory,
+counting shared pages in full) and PSS (proportional set size, shared pages
+split between the processes that map them). With memory mapping the tree
+arrays live once in the page cache, so PSS per worker drops as N grows.
+
+Linux only (reads /proc). Usage (from the project root):
+    PYTHONPATH=. python benchmarks/bench_artifact_mmap.py [path/to/fetal_health_model.pkl] [n_workers]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from backend.app.services.model_service import load_artifact, resolve_inference_path, run_inference
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODEL = PROJECT_ROOT / "models" / "fetal_health_model.pkl"
+RAW_CSV = PROJECT_ROOT / "data" / "raw" / "fetal_health.csv"
+
+
+def memory_kb():
+    """Return (rss_kb, pss_kb) of the current process"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def worker(model_path, mmap_mode, barrier, results):
+    # Import the estimator modules first so only the artifact load is measured
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    
+    baseline_rss, baseline_pss = memory_kb()
+    start = time.perf_counter()
+    model_dict = load_artifact(model_path, mmap_mode=mmap_mode)
+    model = model_dict['model']
+    n_features = len(model_dict.get('feature_names') or []) or model.n_features_in_
+    run_inference(model, np.zeros((64, n_features)), resolve_inference_path(model))
+    load_seconds = time.perf_counter() - start
+    
+    # Measure only once every worker has the model loaded
+    barrier.wait()
+    rss, pss = memory_kb()
+    results.put((load_seconds, rss - baseline_rss, pss - baseline_pss))
+    barrier.wait()
+
+
+def run(model_path, mmap_mode, n_workers):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(model_path, mmap_mode, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    samples = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    
+    load, rss, pss = (np.array(col) for col in zip(*samples))
+    return load.mean() * 1000, rss.mean() / 1024, pss.mean() / 1024
+
+
+def build_artifact(path):
+    """Fit a large Random Forest when no trained artifact is available"""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    
+    print(f"Model not found; fitting a 500-tree Random Forest into {path}")
+    df = pd.read_csv(RAW_CSV)
+    X = df.drop('fetal_health', axis=1)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=500, random_state=42, n_jobs=-1)
+    model.fit(scaler.transform(X), df['fetal_health'])
+    joblib.dump(
+        {'model': model, 'scaler': scaler, 'feature_names': X.columns.tolist()},
+        path, compress=0
+    )
+
+
+def main():
+    model_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MODEL
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        if not model_path.exists():
+            model_path = Path(tmp) / "fetal_health_model.pkl"
+            build_artifact(model_path)
+        
+        size_mb = model_path.stat().st_size / 1024 ** 2
+        print(f"\nArtifact: {model_path} ({size_mb:.1f} MB), {n_workers} workers")
+        print(f"{'Load mode':<14}{'cold start (ms)':>18}{'RSS/worker (MB)':>18}{'PSS/worker (MB)':>18}")
+        print("-" * 68)
+        for label, mode in (("copy", None), ("mmap_mode='r'", "r")):
+            load_ms, rss_mb, pss_mb = run(model_path, mode, n_workers)
+            print(f"{label:<14}{load_ms:>18.1f}{rss_mb:>18.1f}{pss_mb:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: load time and memory of the dataset from CSV versus the typed Arrow cache
+
+Tiles the raw dataset to 1x, 100x and 1000x its 2,126 rows and, for each
+size, loads it in a fresh process with:
+- csv:          plain pd.read_csv (float64 inference, as training did before)
+- csv_typed:    pd.read_csv with the explicit float32/float64 schema
+- arrow_cold:   src.load_data.load_data with no cache (CSV read + Feather write)
+- arrow_cached: src.load_data.load_data with a valid cache (stat check + memory-mapped read)
+
+Reports wall time, the DataFrame's in-memory size and the process's peak RSS
+growth during the load. Memory-mapped pages are counted in RSS as they are
+touched, so the cached load is measured after summing every column.
+
+Linux/macOS only (resource.getrusage). Usage (from the project root):
+    PYTHONPATH=. python benchmarks/bench_data_loading.py [scale ...]
+"""
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.load_data import cache_path_for, load_data, read_csv_typed
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_CSV = PROJECT_ROOT / "data" / "raw" / "fetal_health.csv"
+DEFAULT_SCALES = (1, 100, 1000)
+METHODS = ("csv", "csv_typed", "arrow_cold", "arrow_cached")
+
+
+def peak_rss_mb():
+    """Peak resident memory of the current process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def load(method, csv_path):
+    """Load the dataset with one method and return the DataFrame"""
+    if method == "csv":
+        return pd.read_csv(csv_path)
+    if method == "csv_typed":
+        return read_csv_typed(csv_path)
+    if method == "arrow_cold":
+        cache_path_for(csv_path, csv_path.parent).unlink(missing_ok=True)
+    # The Arrow copy goes next to the tiled CSV so the temporary directory removes it
+    return load_data(csv_path, cache_dir=csv_path.parent)
+
+
+def measure(method, csv_path, queue):
+    """Worker: time one load and report its memory (runs in a fresh process)"""
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    df = load(method, csv_path)
+    elapsed = time.perf_counter() - start
+    # Touch every value so memory-mapped columns are paged in
+    df.sum(numeric_only=True)
+    queue.put({
+        "seconds": elapsed,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024 ** 2,
+        "rss_growth_mb": peak_rss_mb() - rss_before,
+    })
+
+
+def run(method, csv_path):
+    """Measure one method in a new process so earlier loads don't skew RSS"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(method, csv_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SCALES)
+    base = pd.read_csv(RAW_CSV)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            csv_path = Path(tmp) / f"fetal_health_x{scale}.csv"
+            pd.concat([base] * scale, ignore_index=True).to_csv(csv_path, index=False)
+            csv_mb = csv_path.stat().st_size / 1024 ** 2
+            print(f"\n{scale}x: {len(base) * scale:,} rows, CSV {csv_mb:.1f} MB")
+
+            for method in METHODS:
+                result = run(method, csv_path)
+                rows.append({"scale": scale, "method": method, **result})
+                print(f"  {method:<13} {result['seconds']:8.3f} s  "
+                      f"frame {result['frame_mb']:8.1f} MB  "
+                      f"peak RSS +{result['rss_growth_mb']:8.1f} MB")
+
+            feather_mb = cache_path_for(csv_path, csv_path.parent).stat().st_size / 1024 ** 2
+            print(f"  Arrow cache on disk: {feather_mb:.1f} MB")
+
+    df = pd.DataFrame(rows)
+    speedup = df.pivot(index="scale", columns="method", values="seconds")
+    print("\nSpeedup of the cached Arrow load over plain CSV:")
+    print((speedup["csv"] / speedup["arrow_cached"]).round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
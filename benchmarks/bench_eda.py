@@ -0,0 +1,81 @@
+"""
+Benchmark: EDA report with per-section statistics versus a shared, memoized context
+
+Replicates the raw dataset (100x by default, ~212k rows) and times every
+report section of backend/eda.py twice:
+- per_section: each section gets the DataFrame and computes its own
+               statistics (describe, value_counts and duplicated repeat)
+- shared:      all sections read from one FrameEDA, which computes each
+               statistic once and memoizes it
+
+Also prints the FrameEDA breakdown: time to compute each statistic and the
+time saved by reusing it. The report output itself is suppressed.
+
+Usage (from the project root):
+    PYTHONPATH=. python benchmarks/bench_eda.py [scale]
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+import eda  # noqa: E402
+from eda_stats import FrameEDA  # noqa: E402
+from src.load_data import read_csv_typed  # noqa: E402
+
+RAW_CSV = PROJECT_ROOT / "data" / "raw" / "fetal_health.csv"
+SECTIONS = [
+    eda.analyze_dataset_overview,
+    eda.analyze_missing_values,
+    eda.analyze_duplicates,
+    eda.analyze_descriptive_stats,
+    eda.plot_feature_distributions,
+    eda.analyze_target_variable,
+    eda.evaluate_class_balance,
+    eda.analyze_correlations,
+    eda.generate_eda_summary,
+]
+
+
+def time_sections(data):
+    """Seconds spent in each report section (output discarded)"""
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for section in SECTIONS:
+            start = time.perf_counter()
+            section(data)
+            timings[section.__name__] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    df = pd.concat([read_csv_typed(RAW_CSV)] * scale, ignore_index=True)
+    print(f"{scale}x: {len(df):,} rows, {df.shape[1]} columns")
+
+    # The summary section writes eda_summary.txt; keep it out of the project
+    with tempfile.TemporaryDirectory() as tmp:
+        eda.DATA_DIR = Path(tmp)
+        per_section = time_sections(df)
+        context = FrameEDA(df)
+        shared = time_sections(context)
+
+    table = pd.DataFrame({'per_section (s)': per_section, 'shared (s)': shared})
+    table.loc['TOTAL'] = table.sum()
+    table['speedup'] = table['per_section (s)'] / table['shared (s)']
+    print("\nReport sections:")
+    print(table.round(3).to_string())
+
+    print("\nShared statistics (FrameEDA):")
+    print(context.timing_breakdown().round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
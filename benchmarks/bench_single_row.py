@@ -0,0 +1,117 @@
+"""
+Microbenchmark: per-request latency of single-row inference in /predict
+
+Compares the original pandas path (DataFrame -> rename -> reindex ->
+scaler.transform) with the precompiled FeatureTransform fast path, both for
+the preprocessing alone and end to end with the model.
+
+Usage (from the project root):
+    PYTHONPATH=. python benchmarks/bench_single_row.py [path/to/fetal_health_model.pkl]
+"""
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.app.main import FetalHealthFeatures, FIELD_TO_COLUMN
+from backend.app.services.model_service import (
+    FeatureTransform, resolve_inference_path, run_inference
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODEL = PROJECT_ROOT / "models" / "fetal_health_model.pkl"
+RAW_CSV = PROJECT_ROOT / "data" / "raw" / "fetal_health.csv"
+
+# The original handler relies on the deprecated pydantic .dict()
+warnings.filterwarnings('ignore')
+
+
+def load_artifact(model_path):
+    """Load the trained artifact, or fit a small forest if none exists"""
+    if model_path.exists():
+        data = joblib.load(model_path)
+        return data['model'], data['scaler'], data['feature_names']
+    
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    
+    print(f"Model not found at {model_path}; fitting a 100-tree Random Forest")
+    df = pd.read_csv(RAW_CSV)
+    X = df.drop('fetal_health', axis=1)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(scaler.transform(X), df['fetal_health'])
+    return model, scaler, X.columns.tolist()
+
+
+def pandas_preprocess(features, scaler, feature_names):
+    """Original /predict preprocessing"""
+    input_data = pd.DataFrame([features.dict()])
+    input_data = input_data.rename(columns={'baseline_value': 'baseline value'})
+    input_data = input_data[feature_names]
+    return scaler.transform(input_data)
+
+
+def timeit(fn, repeat):
+    """Median latency of fn() in microseconds"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    model_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MODEL
+    model, scaler, feature_names = load_artifact(model_path)
+    
+    row = pd.read_csv(RAW_CSV).drop('fetal_health', axis=1).iloc[0]
+    features = FetalHealthFeatures(**{
+        name: float(row[FIELD_TO_COLUMN.get(name, name)])
+        for name in FetalHealthFeatures.model_fields
+    })
+    
+    transform = FeatureTransform(
+        list(FetalHealthFeatures.model_fields), feature_names, scaler, FIELD_TO_COLUMN
+    )
+    path = resolve_inference_path(model)
+    
+    # Both paths must produce the same scaled row
+    np.testing.assert_allclose(
+        pandas_preprocess(features, scaler, feature_names), transform.row(features)
+    )
+    
+    def before_end_to_end():
+        X = pandas_preprocess(features, scaler, feature_names)
+        model.predict(X)
+        if hasattr(model, "predict_proba"):
+            model.predict_proba(X)
+    
+    def after_end_to_end():
+        run_inference(model, transform.row(features), path)
+    
+    results = {
+        'preprocess (pandas)': timeit(lambda: pandas_preprocess(features, scaler, feature_names), 2000),
+        'preprocess (FeatureTransform)': timeit(lambda: transform.row(features), 2000),
+        'end-to-end (before)': timeit(before_end_to_end, 300),
+        'end-to-end (after)': timeit(after_end_to_end, 300),
+    }
+    
+    print(f"\nModel: {type(model).__name__}")
+    print(f"{'Path':<32}{'median latency (us)':>22}")
+    print("-" * 54)
+    for name, value in results.items():
+        print(f"{name:<32}{value:>22.1f}")
+    print("-" * 54)
+    print(f"Preprocessing speed-up: {results['preprocess (pandas)'] / results['preprocess (FeatureTransform)']:.1f}x")
+    print(f"End-to-end speed-up:    {results['end-to-end (before)'] / results['end-to-end (after)']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Parity check and latency benchmark of the compiled tree engine (src.tree_engine)
+
+Fits each supported ensemble on the raw dataset, verifies that the compiled
+engine reproduces sklearn's predict_proba and compares the latency of both for
+a single row and for a 500-row batch.
+
+Usage (from the project root):
+    PYTHONPATH=. python benchmarks/bench_tree_engine.py
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import (
+    AdaBoostClassifier, BaggingClassifier, GradientBoostingClassifier, RandomForestClassifier
+)
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from src.tree_engine import check_parity, compile_tree_ensemble
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+
+MODELS = {
+    'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced'),
+    'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, max_depth=4, random_state=42),
+    'AdaBoost': AdaBoostClassifier(
+        estimator=DecisionTreeClassifier(max_depth=3), n_estimators=100, random_state=42
+    ),
+    'Bagging': BaggingClassifier(n_estimators=50, max_features=0.8, random_state=42),
+}
+
+
+def timeit(fn, X, repeat):
+    """Median latency of fn(X) in microseconds"""
+    fn(X)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    df = pd.read_csv(RAW_CSV)
+    X = df.drop('fetal_health', axis=1)
+    y = df['fetal_health']
+    X_train, X_test, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    X_train = scaler.transform(X_train)
+    X_test = scaler.transform(X_test)
+    
+    print(f"{'Model':<20}{'max |diff|':>12}{'1 row sklearn':>16}{'1 row compiled':>16}"
+          f"{'500 rows sklearn':>18}{'500 rows compiled':>19}")
+    print("-" * 101)
+    for name, model in MODELS.items():
+        model.fit(X_train, y_train)
+        compiled = compile_tree_ensemble(model)
+        max_diff = check_parity(compiled, model, X_test)
+        
+        row, batch = X_test[:1], X_test[:500]
+        timings = [
+            timeit(model.predict_proba, row, 200),
+            timeit(compiled.predict_proba, row, 200),
+            timeit(model.predict_proba, batch, 20),
+            timeit(compiled.predict_proba, batch, 20),
+        ]
+        print(f"{name:<20}{max_diff:>12.1e}{timings[0]:>14.0f}us{timings[1]:>14.0f}us"
+              f"{timings[2]:>16.0f}us{timings[3]:>17.0f}us")
+
+
+if __name__ == "__main__":
+    main()
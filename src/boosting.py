@@ -0,0 +1,80 @@
+"""
+Gradient boosting con histogramas: XGBoost con el desplazamiento de etiquetas encapsulado
+
+XGBClassifier exige clases 0..k-1, mientras que el dataset usa 1, 2, 3.
+LabelEncodedXGBClassifier codifica las etiquetas dentro de fit y devuelve las
+originales en predict, de modo que el resto del pipeline lo trata como
+cualquier otro clasificador de sklearn. Usa `tree_method='hist'` y parada
+temprana nativa sobre una partición de validación interna, en lugar de buscar
+n_estimators en la rejilla.
+"""
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from xgboost import XGBClassifier
+
+
+class LabelEncodedXGBClassifier(ClassifierMixin, BaseEstimator):
+    """
+    XGBClassifier (hist) con etiquetas arbitrarias y parada temprana
+
+    Args:
+        n_estimators: Máximo de rondas de boosting (la parada temprana decide cuántas se usan)
+        learning_rate, max_depth, subsample, colsample_bytree: Hiperparámetros de XGBoost
+        early_stopping_rounds: Rondas sin mejora en validación antes de parar (None: sin parada)
+        validation_fraction: Fracción estratificada del train reservada para la parada temprana
+        n_jobs: Hilos de XGBoost (None: los que permita OpenMP en el proceso)
+        random_state: Semilla
+    """
+
+    def __init__(self, n_estimators=500, learning_rate=0.1, max_depth=6, subsample=1.0,
+                 colsample_bytree=1.0, early_stopping_rounds=20, validation_fraction=0.1,
+                 n_jobs=None, random_state=None):
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.subsample = subsample
+        self.colsample_bytree = colsample_bytree
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        self.label_encoder_ = LabelEncoder()
+        y_encoded = self.label_encoder_.fit_transform(np.asarray(y))
+        self.classes_ = self.label_encoder_.classes_
+
+        fit_params = {}
+        if self.early_stopping_rounds:
+            X, X_val, y_encoded, y_val = train_test_split(
+                X, y_encoded, test_size=self.validation_fraction,
+                stratify=y_encoded, random_state=self.random_state
+            )
+            fit_params = {'eval_set': [(X_val, y_val)], 'verbose': False}
+
+        self.booster_ = XGBClassifier(
+            n_estimators=self.n_estimators,
+            learning_rate=self.learning_rate,
+            max_depth=self.max_depth,
+            subsample=self.subsample,
+            colsample_bytree=self.colsample_bytree,
+            early_stopping_rounds=self.early_stopping_rounds or None,
+            tree_method='hist',
+            eval_metric='mlogloss',
+            n_jobs=self.n_jobs,
+            random_state=self.random_state
+        )
+        self.booster_.fit(X, y_encoded, **fit_params)
+        self.n_features_in_ = self.booster_.n_features_in_
+        # Rondas usadas (con parada temprana, la mejor iteración)
+        best_iteration = getattr(self.booster_, 'best_iteration', None)
+        self.n_iter_ = best_iteration + 1 if best_iteration is not None else self.n_estimators
+        return self
+
+    def predict_proba(self, X):
+        return self.booster_.predict_proba(X)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,104 @@
+"""
+Cribado de correlaciones entre variables
+
+`high_correlation_pairs` extrae de una matriz de correlación los pares por
+encima de un umbral con una máscara del triángulo superior (sin bucles de
+Python). Para datasets anchos (cientos o miles de columnas),
+`blockwise_high_correlation_pairs` calcula la correlación por bloques de
+columnas, opcionalmente en float32, sin construir la matriz completa.
+
+Los pares se devuelven como DataFrame (feature_1, feature_2, correlation),
+ordenados por |correlation|, para que la selección de variables del
+entrenamiento los use directamente.
+"""
+import numpy as np
+import pandas as pd
+
+HIGH_CORRELATION = 0.7
+PAIR_COLUMNS = ['feature_1', 'feature_2', 'correlation']
+
+
+def _pairs_frame(names_1, names_2, values):
+    """DataFrame de pares ordenado por |correlación| descendente (estable)"""
+    pairs = pd.DataFrame({
+        'feature_1': np.asarray(names_1, dtype=object),
+        'feature_2': np.asarray(names_2, dtype=object),
+        'correlation': np.asarray(values, dtype=np.float64)
+    }, columns=PAIR_COLUMNS)
+    order = np.argsort(-np.abs(pairs['correlation'].to_numpy()), kind='stable')
+    return pairs.iloc[order].reset_index(drop=True)
+
+
+def high_correlation_pairs(corr, threshold=HIGH_CORRELATION):
+    """
+    Pares de variables con |correlación| > threshold
+
+    Args:
+        corr: Matriz de correlación (DataFrame cuadrado)
+        threshold: Umbral sobre el valor absoluto
+    Returns:
+        DataFrame con columnas feature_1, feature_2, correlation
+    """
+    values = corr.to_numpy()
+    # Triángulo superior sin la diagonal: cada par una sola vez
+    mask = np.triu(np.abs(values) > threshold, k=1)
+    rows, cols = np.nonzero(mask)
+    columns = np.asarray(corr.columns, dtype=object)
+    return _pairs_frame(columns[rows], columns[cols], values[rows, cols])
+
+
+def _standardize(X, dtype):
+    """Columnas centradas y escaladas a norma 1 (la correlación es su producto escalar)"""
+    Z = np.asarray(X, dtype=dtype)
+    Z = Z - Z.mean(axis=0, dtype=np.float64).astype(dtype)
+    norms = np.sqrt(np.einsum('ij,ij->j', Z, Z, dtype=np.float64)).astype(dtype)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return Z / norms
+
+
+def blockwise_high_correlation_pairs(X, threshold=HIGH_CORRELATION, block_size=256, dtype=np.float32):
+    """
+    Pares con |correlación| > threshold calculados por bloques de columnas
+
+    Solo se calculan los bloques del triángulo superior, y en memoria hay como
+    mucho un bloque de block_size x block_size. Con float32 la matriz de datos
+    estandarizada ocupa la mitad (la correlación tiene ~7 dígitos
+    significativos). Usa las filas completas (sin NaN), mientras que
+    DataFrame.corr usa, para cada par, las filas con ambos valores.
+
+    Args:
+        X: DataFrame numérico
+        threshold: Umbral sobre el valor absoluto
+        block_size: Columnas por bloque
+        dtype: np.float32 o np.float64
+    Returns:
+        DataFrame con columnas feature_1, feature_2, correlation
+    """
+    columns = np.asarray(X.columns, dtype=object)
+    Z = _standardize(X.dropna(), dtype)
+    n_columns = Z.shape[1]
+
+    names_1, names_2, values = [], [], []
+    for start_i in range(0, n_columns, block_size):
+        block_i = Z[:, start_i:start_i + block_size]
+        for start_j in range(start_i, n_columns, block_size):
+            block = block_i.T @ Z[:, start_j:start_j + block_size]
+            mask = np.abs(block) > threshold
+            if start_i == start_j:
+                mask = np.triu(mask, k=1)
+            rows, cols = np.nonzero(mask)
+            names_1.append(columns[start_i + rows])
+            names_2.append(columns[start_j + cols])
+            values.append(np.clip(block[rows, cols], -1.0, 1.0))
+
+    if not values:
+        return _pairs_frame([], [], [])
+    return _pairs_frame(np.concatenate(names_1), np.concatenate(names_2), np.concatenate(values))
+
+
+def target_correlations(X, y, dtype=np.float64):
+    """Correlación de cada columna de X con y (vector, sin la matriz completa)"""
+    data = pd.concat([X, pd.Series(np.asarray(y), index=X.index, name='__target__')], axis=1).dropna()
+    Z = _standardize(data.drop(columns='__target__'), dtype)
+    target = _standardize(data[['__target__']], dtype)[:, 0]
+    return pd.Series((Z.T @ target).astype(np.float64), index=X.columns)
@@ -0,0 +1,115 @@
+"""
+Especificación declarativa de experimentos de entrenamiento
+
+Un archivo YAML o JSON define qué modelos entrenar, sus espacios de búsqueda y
+estrategias, los workers, la validación cruzada, el preprocesado, la selección
+de variables y las rutas.
+Las claves omitidas toman los valores por defecto (los del entrenamiento
+completo). En src/configs/ se incluyen los perfiles 'fast' y 'full'.
+"""
+import copy
+import json
+from pathlib import Path
+
+import yaml
+
+from src.feature_selection import DEFAULT_OPTIONS as FEATURE_SELECTION_OPTIONS, validate_options
+from src.search import SEARCH_STRATEGIES
+
+PROFILES_DIR = Path(__file__).parent / "configs"
+
+DEFAULT_SPEC = {
+    'name': 'default',
+    'data': {
+        'path': '/app/data/processed/fetal_health_clean.csv',
+        'test_size': 0.2,
+        'apply_smote': True,
+    },
+    'output': {
+        'models_dir': '/app/models',
+        'reports_dir': '/app/reports',
+    },
+    'training': {
+        'random_state': 42,
+        'n_jobs': -1,
+        'cv_splits': 5,
+        'search_strategy': 'grid',
+        'search_budget': 20,
+        'pipeline_mode': False,
+        'warm_start_sweep': False,
+        # Trocear 'grid' y 'random' en tareas (candidato, fold) aunque no haya presupuesto
+        'split_search': False,
+        'fit_cache': True,
+        'fit_cache_max_mb': 256,
+        # Presupuestos de tiempo en segundos (None: sin límite)
+        'time_budget': None,
+        'model_time_budget': None,
+    },
+    # Selección de variables sobre el train (src/feature_selection.py); desactivada por defecto
+    'feature_selection': FEATURE_SELECTION_OPTIONS,
+    # None: todos los modelos con sus rejillas por defecto. Si no, {nombre: opciones}
+    # con 'strategy', 'param_grid' y 'time_budget' opcionales; los modelos ausentes no se entrenan
+    'models': None,
+}
+
+
+def _merge(base, override, path=''):
+    """Fusionar `override` sobre `base`, rechazando claves desconocidas"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if key not in base:
+            raise ValueError(f"Clave desconocida en la especificación: '{path}{key}'")
+        if isinstance(base[key], dict) and isinstance(value, dict):
+            merged[key] = _merge(base[key], value, f"{path}{key}.")
+        else:
+            merged[key] = value
+    return merged
+
+
+def resolve_spec_path(config):
+    """Ruta de la especificación: un archivo existente o el nombre de un perfil ('fast', 'full')"""
+    path = Path(config)
+    if path.exists():
+        return path
+    for suffix in ('.yaml', '.yml', '.json'):
+        profile = PROFILES_DIR / f"{config}{suffix}"
+        if profile.exists():
+            return profile
+    profiles = sorted(p.stem for p in PROFILES_DIR.glob('*.y*ml'))
+    raise FileNotFoundError(f"No existe la especificación '{config}'. Perfiles disponibles: {profiles}")
+
+
+def load_spec(config=None):
+    """
+    Cargar una especificación de experimento
+
+    Args:
+        config: Ruta a un YAML/JSON, nombre de perfil, o None para los valores por defecto
+    Returns:
+        Diccionario completo (valores por defecto + especificación)
+    Raises:
+        ValueError si la especificación contiene claves, estrategias o métodos de
+        selección de variables desconocidos
+    """
+    if config is None:
+        return copy.deepcopy(DEFAULT_SPEC)
+
+    path = resolve_spec_path(config)
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f) if path.suffix == '.json' else yaml.safe_load(f)
+
+    spec = _merge(DEFAULT_SPEC, raw or {})
+    strategies = [spec['training']['search_strategy']]
+    for name, options in (spec['models'] or {}).items():
+        options = options or {}
+        unknown = set(options) - {'strategy', 'param_grid', 'time_budget'}
+        if unknown:
+            raise ValueError(f"Opciones desconocidas para '{name}': {sorted(unknown)}")
+        spec['models'][name] = options
+        if 'strategy' in options:
+            strategies.append(options['strategy'])
+    for strategy in strategies:
+        if strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Estrategia de búsqueda desconocida '{strategy}'. Usa una de {SEARCH_STRATEGIES}")
+    validate_options(spec['feature_selection'])
+    return spec
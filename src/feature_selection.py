@@ -0,0 +1,145 @@
+"""
+Selección de variables previa al escalado
+
+Dos pasos configurables que se ajustan solo con el conjunto de train:
+
+1. Poda por correlación: de cada par con |correlación| > correlation_threshold
+   (el mismo cribado de src/correlation.py que usa el EDA) se descarta la
+   variable menos correlacionada con el objetivo. En este dataset elimina los
+   casi duplicados del histograma (histogram_mean / median / mode).
+2. Variables de poca señal (`low_signal`):
+   - 'permutation': importancia por permutación de un Random Forest medida en
+     una partición de validación del train; se descartan las variables con
+     importancia media <= min_importance
+   - 'rfe': eliminación recursiva de variables (RFE) con un Random Forest
+     hasta quedarse con n_features
+
+El subconjunto elegido se guarda en el artefacto como 'feature_names', así
+que el backend solo lee y escala esas variables en /predict.
+"""
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFE
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+from src.correlation import high_correlation_pairs, target_correlations
+
+LOW_SIGNAL_METHODS = ('permutation', 'rfe')
+
+# Opciones por defecto (sección 'feature_selection' de la especificación)
+DEFAULT_OPTIONS = {
+    'enabled': False,
+    # None: sin poda por correlación
+    'correlation_threshold': 0.85,
+    # None, 'permutation' o 'rfe'
+    'low_signal': None,
+    'min_importance': 0.0,
+    'n_repeats': 5,
+    'n_features': None,
+}
+
+
+def validate_options(options):
+    """
+    Comprobar las opciones de selección (con los valores por defecto aplicados)
+
+    Raises:
+        ValueError si el método de poca señal es desconocido o faltan sus parámetros
+    """
+    low_signal = options['low_signal']
+    if low_signal is not None and low_signal not in LOW_SIGNAL_METHODS:
+        raise ValueError(f"Método de selección desconocido '{low_signal}'. Usa uno de {LOW_SIGNAL_METHODS}")
+    if low_signal == 'rfe' and not options['n_features']:
+        raise ValueError("La selección 'rfe' necesita 'n_features' (variables a conservar)")
+    threshold = options['correlation_threshold']
+    if threshold is not None and not 0 < threshold < 1:
+        raise ValueError(f"correlation_threshold debe estar entre 0 y 1 (recibido {threshold})")
+
+
+def prune_correlated(X, y, threshold):
+    """
+    Variables redundantes: de cada par muy correlacionado, la de menor |correlación| con y
+
+    Los pares se recorren de mayor a menor |correlación|; un par con una
+    variable ya descartada se ignora, de modo que de un grupo de variables
+    casi iguales sobrevive la más informativa.
+
+    Returns:
+        Diccionario {variable descartada: motivo}
+    """
+    pairs = high_correlation_pairs(X.corr(), threshold)
+    relevance = target_correlations(X, y).abs()
+    dropped = {}
+    for feature_1, feature_2, correlation in pairs.itertuples(index=False):
+        if feature_1 in dropped or feature_2 in dropped:
+            continue
+        drop, keep = (feature_1, feature_2) if relevance[feature_1] < relevance[feature_2] else (feature_2, feature_1)
+        dropped[drop] = f"|correlación| {abs(correlation):.3f} con {keep}"
+    return dropped
+
+
+def _forest(random_state, n_jobs):
+    return RandomForestClassifier(n_estimators=200, random_state=random_state, n_jobs=n_jobs)
+
+
+def low_signal_permutation(X, y, min_importance=0.0, n_repeats=5, random_state=42, n_jobs=-1):
+    """Variables cuya permutación apenas cambia el F1 ponderado de un Random Forest"""
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=0.25, random_state=random_state, stratify=y
+    )
+    forest = _forest(random_state, n_jobs).fit(X_fit, y_fit)
+    result = permutation_importance(
+        forest, X_val, y_val, scoring='f1_weighted', n_repeats=n_repeats,
+        random_state=random_state, n_jobs=n_jobs
+    )
+    importances = pd.Series(result.importances_mean, index=X.columns)
+    return {
+        feature: f"importancia por permutación {importance:.4f}"
+        for feature, importance in importances.items() if importance <= min_importance
+    }
+
+
+def low_signal_rfe(X, y, n_features, random_state=42, n_jobs=-1):
+    """Variables eliminadas por RFE (Random Forest) al reducir el conjunto a n_features"""
+    rfe = RFE(_forest(random_state, n_jobs), n_features_to_select=n_features).fit(X, y)
+    ranking = pd.Series(rfe.ranking_, index=X.columns)
+    return {feature: f"RFE (ranking {rank})" for feature, rank in ranking.items() if rank > 1}
+
+
+def select_features(X, y, options, random_state=42, n_jobs=-1):
+    """
+    Elegir el subconjunto de variables con las opciones de la especificación
+
+    Args:
+        X: DataFrame de train (sin escalar ni remuestrear)
+        y: Variable objetivo de train
+        options: Diccionario con las claves de DEFAULT_OPTIONS
+        random_state: Semilla de los Random Forest
+        n_jobs: Workers de los Random Forest y de la permutación
+    Returns:
+        Diccionario con 'selected' (variables en el orden original), 'dropped'
+        ({variable: motivo}) y 'options'
+    Raises:
+        ValueError si las opciones no son válidas o no queda ninguna variable
+    """
+    options = {**DEFAULT_OPTIONS, **options}
+    validate_options(options)
+
+    dropped = {}
+    if options['correlation_threshold'] is not None:
+        dropped.update(prune_correlated(X, y, options['correlation_threshold']))
+
+    remaining = X.drop(columns=list(dropped))
+    if options['low_signal'] == 'permutation':
+        dropped.update(low_signal_permutation(
+            remaining, y, options['min_importance'], options['n_repeats'], random_state, n_jobs
+        ))
+    elif options['low_signal'] == 'rfe':
+        if options['n_features'] < remaining.shape[1]:
+            dropped.update(low_signal_rfe(remaining, y, options['n_features'], random_state, n_jobs))
+
+    selected = [column for column in X.columns if column not in dropped]
+    if not selected:
+        raise ValueError("La selección de variables ha descartado todas las variables")
+    return {'selected': selected, 'dropped': dropped, 'options': options}
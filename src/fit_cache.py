@@ -0,0 +1,113 @@
+"""
+Caché en disco de resultados de ajuste por fold
+
+Cada entrada guarda el score y los tiempos de un (candidato, fold) bajo una
+clave que se obtiene por contenido: hash del dataset, configuración de
+preprocesado, clase del estimador, hiperparámetros e índice de fold. Si se
+vuelve a entrenar con los mismos datos y una rejilla modificada, solo se
+ajustan los candidatos nuevos. Cuando la caché supera su tamaño máximo se
+eliminan las entradas usadas hace más tiempo.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_arrays(*arrays):
+    """Hash SHA-256 de varios arrays (forma, tipo y contenido)"""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(np.asarray(array))
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def describe_estimator(estimator):
+    """Descripción estable de un estimador: clase y parámetros (incluidos los anidados)"""
+    params = {
+        name: repr(value)
+        for name, value in sorted(estimator.get_params(deep=True).items())
+        # Los objetos estimador anidados ya quedan descritos por sus parámetros
+        if not hasattr(value, 'get_params')
+    }
+    cls = type(estimator)
+    return {'class': f"{cls.__module__}.{cls.__qualname__}", 'params': params}
+
+
+class FoldResultCache:
+    """
+    Caché direccionada por contenido de resultados (score, tiempos) por fold
+
+    Cada entrada es un pequeño JSON en `cache_dir`, nombrado por su clave. La
+    fecha de modificación marca el último uso y guía la expulsión LRU cuando el
+    tamaño total supera `max_size_mb`.
+    """
+
+    def __init__(self, cache_dir, max_size_mb=256):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(**parts):
+        """Clave SHA-256 de las partes (serializadas de forma determinista)"""
+        payload = json.dumps(parts, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Resultado guardado para la clave, o None"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # Marcar como usado recientemente para la expulsión LRU
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Guardar un resultado (escritura atómica)"""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Eliminar las entradas menos usadas hasta quedar por debajo del tamaño máximo"""
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob('*/*.json')]
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        """Aciertos y fallos de la sesión actual"""
+        return {'hits': self.hits, 'misses': self.misses}
@@ -1,27 +1,174 @@
 """
 Módulo para carga de datos
+
+La primera lectura de un CSV escribe en data/cache/ una copia en formato
+Feather (Arrow IPC sin comprimir) con un esquema explícito para las 22
+columnas del dataset: float32 para las columnas enteras (conteos, lpm,
+porcentajes; se representan sin pérdida) y float64 para las tasas
+fraccionarias y la variable objetivo. Las lecturas siguientes cargan la
+copia con memory-map (sin copiar los datos) mientras la fecha de
+modificación y el tamaño del CSV coincidan con los guardados en sus
+metadatos, junto al hash SHA-256 del CSV, que así solo se calcula al
+regenerarla.
 """
+import hashlib
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-def load_data(file_path):
+from src.fit_cache import hash_file
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # sin pyarrow se lee siempre el CSV
+    pa = None
+
+# Columnas con valores enteros: float32 las representa exactamente
+FLOAT32_COLUMNS = [
+    'baseline value',
+    'abnormal_short_term_variability',
+    'percentage_of_time_with_abnormal_long_term_variability',
+    'histogram_width',
+    'histogram_min',
+    'histogram_max',
+    'histogram_number_of_peaks',
+    'histogram_number_of_zeroes',
+    'histogram_mode',
+    'histogram_mean',
+    'histogram_median',
+    'histogram_variance',
+    'histogram_tendency',
+]
+
+# Tasas por segundo y medias con decimales, y la variable objetivo (las clases del modelo)
+FLOAT64_COLUMNS = [
+    'accelerations',
+    'fetal_movement',
+    'uterine_contractions',
+    'light_decelerations',
+    'severe_decelerations',
+    'prolongued_decelerations',
+    'mean_value_of_short_term_variability',
+    'mean_value_of_long_term_variability',
+    'fetal_health',
+]
+
+SCHEMA = {
+    **{column: np.float32 for column in FLOAT32_COLUMNS},
+    **{column: np.float64 for column in FLOAT64_COLUMNS},
+}
+
+# Directorio por defecto de las copias Arrow (ignorado por git)
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "cache"
+
+# Metadatos de la copia Arrow: hash, fecha de modificación y tamaño del CSV de origen
+SOURCE_HASH_KEY = b'source_sha256'
+SOURCE_STAT_KEY = b'source_stat'
+
+
+def cache_path_for(file_path, cache_dir=None):
+    """Ruta de la copia Arrow de un CSV: nombre del CSV más un hash de su ruta absoluta"""
+    file_path = Path(file_path)
+    path_id = hashlib.sha1(str(file_path.resolve()).encode()).hexdigest()[:8]
+    return Path(cache_dir or CACHE_DIR) / f"{file_path.stem}-{path_id}.feather"
+
+
+def _stat_key(file_path):
+    stat = Path(file_path).stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def read_csv_typed(file_path):
+    """Leer el CSV aplicando el esquema a las columnas conocidas (el resto, con la inferencia de pandas)"""
+    return pd.read_csv(file_path, dtype=SCHEMA)
+
+
+def _read_cache(cache_path, source_stat):
+    """(DataFrame, hash del CSV) de la copia Arrow, o None si no existe o es de otra versión del CSV"""
+    if not cache_path.exists():
+        return None
+    try:
+        table = feather.read_table(cache_path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(SOURCE_STAT_KEY, b'').decode() != source_stat or SOURCE_HASH_KEY not in metadata:
+        return None
+    # split_blocks evita consolidar columnas: los arrays apuntan al memory-map
+    return table.to_pandas(split_blocks=True), metadata[SOURCE_HASH_KEY].decode()
+
+
+def _write_cache(data, cache_path, source_stat, source_hash):
+    """Escribir la copia Arrow (sin comprimir, para poder leerla con memory-map)"""
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        SOURCE_STAT_KEY: source_stat.encode(),
+        SOURCE_HASH_KEY: source_hash.encode(),
+    })
+    cache_path.parent.mkdir(exist_ok=True, parents=True)
+    tmp_path = cache_path.with_suffix('.feather.tmp')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    tmp_path.replace(cache_path)
+
+
+def load_data_and_hash(file_path, use_cache=True, cache_dir=None):
+    """
+    Como load_data, pero devuelve también el hash SHA-256 del CSV
+
+    Con una copia Arrow válida el hash sale de sus metadatos sin volver a
+    leer el CSV.
+
+    Returns:
+        Tupla (DataFrame, hash SHA-256 del CSV)
+    """
+    if not use_cache or pa is None:
+        return read_csv_typed(file_path), hash_file(file_path)
+
+    cache_path = cache_path_for(file_path, cache_dir)
+    # Antes de leer: si el CSV cambia mientras tanto, la próxima lectura regenera la copia
+    source_stat = _stat_key(file_path)
+    cached = _read_cache(cache_path, source_stat)
+    if cached is not None:
+        return cached
+
+    source_hash = hash_file(file_path)
+    data = read_csv_typed(file_path)
+    try:
+        _write_cache(data, cache_path, source_stat, source_hash)
+    except OSError as e:
+        print(f"⚠️  No se pudo escribir la caché Arrow en {cache_path}: {e}")
+    return data, source_hash
+
+
+def load_data(file_path, use_cache=True, cache_dir=None):
     """
     Carga los datos desde un archivo CSV.
-    
+
+    Con `use_cache`, usa la copia Arrow tipada si corresponde al CSV actual y,
+    si no, lee el CSV y la (re)genera. Los arrays de un DataFrame leído de la
+    copia son de solo lectura: haz `.copy()` antes de modificarlos en el sitio.
+
     Args:
         file_path: Ruta al archivo CSV (string o Path)
+        use_cache: Leer/escribir la copia Arrow (requiere pyarrow)
+        cache_dir: Directorio de las copias Arrow (por defecto data/cache/)
     Returns:
         DataFrame de pandas con los datos cargados
     """
-    data = pd.read_csv(file_path)
-    return data
+    if not use_cache or pa is None:
+        return read_csv_typed(file_path)
+    return load_data_and_hash(file_path, cache_dir=cache_dir)[0]
 
 
 if __name__ == "__main__":
-    
+
     # Ejemplo de uso
     from backend.configure import RAW_DATA
-    
+
     data = load_data(RAW_DATA / 'fetal_health.csv')
     print(data.head())
     print(f"\nShape: {data.shape}")
-    print(f"Columns: {list(data.columns)}")
\ No newline at end of file
+    print(f"Columns: {list(data.columns)}")
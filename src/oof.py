@@ -0,0 +1,162 @@
+"""
+Evaluación con predicciones out-of-fold (OOF) y ensembles que las reutilizan
+
+Cada modelo se ajusta k+1 veces: una por fold (cuyas predicciones sobre la
+partición de validación forman las predicciones OOF) y una con todos los
+datos. Las métricas de validación cruzada se calculan a partir de esas
+predicciones, sin volver a entrenar.
+
+OOFVotingClassifier y OOFStackingClassifier combinan estimadores base ya
+ajustados: el voting promedia sus probabilidades y el stacking entrena el
+meta-modelo sobre las probabilidades OOF de los estimadores base, en lugar de
+repetir su validación cruzada interna como hace StackingClassifier.
+"""
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv, cross_val_predict, cross_validate
+from sklearn.utils import _safe_indexing
+
+
+def fit_and_predict_fold(estimator, X, y, train, test, scoring='accuracy'):
+    """
+    Ajustar un estimador en un fold y devolver su score y sus predicciones de validación
+
+    Returns:
+        Diccionario con score, tiempos, índices de test, predicciones y
+        probabilidades (None si el estimador no tiene predict_proba)
+    """
+    start = time.perf_counter()
+    estimator.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_test = _safe_indexing(X, test)
+    score = get_scorer(scoring)(estimator, X_test, _safe_indexing(y, test))
+    pred = estimator.predict(X_test)
+    proba = estimator.predict_proba(X_test) if hasattr(estimator, 'predict_proba') else None
+    score_time = time.perf_counter() - start
+
+    return {
+        'score': float(score), 'fit_time': fit_time, 'score_time': score_time,
+        'test': test, 'pred': pred, 'proba': proba, 'classes': estimator.classes_
+    }
+
+
+def assemble_oof(fold_results, n_samples, key='proba'):
+    """Unir las predicciones de validación de cada fold en un array OOF alineado con y"""
+    first = fold_results[0][key]
+    oof = np.empty((n_samples,) + first.shape[1:], dtype=first.dtype)
+    for result in fold_results:
+        oof[result['test']] = result[key]
+    return oof
+
+
+def fold_scores_from_oof(oof_pred, y, cv):
+    """Accuracy de cada fold a partir de predicciones OOF"""
+    y = np.asarray(y)
+    return [float(np.mean(oof_pred[test] == y[test])) for _, test in cv.split(np.zeros(len(y)), y)]
+
+
+class _OOFEnsemble(ClassifierMixin, BaseEstimator):
+    """Base común: estimadores base ajustados con todos los datos y sus probabilidades OOF"""
+
+    def fit(self, X, y):
+        """Ajustar los estimadores base (k+1 veces cada uno) y combinarlos"""
+        cv = check_cv(self.cv, y, classifier=True)
+        fitted, oof = {}, {}
+        for name, estimator in self.estimators:
+            cv_results = cross_validate(
+                estimator, X, y, cv=cv, return_estimator=True, return_indices=True
+            )
+            folds = [
+                {'test': test, 'proba': fold_estimator.predict_proba(_safe_indexing(X, test))}
+                for fold_estimator, test in zip(cv_results['estimator'], cv_results['indices']['test'])
+            ]
+            oof[name] = assemble_oof(folds, len(y))
+            fitted[name] = clone(estimator).fit(X, y)
+        return self.set_fitted(fitted, oof, y)
+
+    def _base_proba(self, X):
+        return [estimator.predict_proba(X) for estimator in self.estimators_]
+
+    def set_fitted(self, fitted_estimators, oof_probas, y):
+        """
+        Registrar los estimadores base ya ajustados y sus probabilidades OOF
+
+        Args:
+            fitted_estimators: {nombre: estimador ajustado con todos los datos}
+            oof_probas: {nombre: probabilidades OOF, forma (n_muestras, n_clases)}
+            y: Etiquetas de entrenamiento
+        """
+        names = [name for name, _ in self.estimators]
+        self.estimators_ = [fitted_estimators[name] for name in names]
+        self.named_estimators_ = dict(zip(names, self.estimators_))
+        self.classes_ = self.estimators_[0].classes_
+        self.n_features_in_ = self.estimators_[0].n_features_in_
+        self.oof_probas_ = [oof_probas[name] for name in names]
+        return self
+
+    def with_estimators(self, estimators):
+        """Copia del ensemble con otros estimadores base ya ajustados (mismo orden)"""
+        names = [name for name, _ in self.estimators]
+        ensemble = clone(self)
+        ensemble.estimators_ = list(estimators)
+        ensemble.named_estimators_ = dict(zip(names, ensemble.estimators_))
+        ensemble.classes_ = self.classes_
+        ensemble.n_features_in_ = self.n_features_in_
+        ensemble.oof_probas_ = self.oof_probas_
+        if hasattr(self, 'final_estimator_'):
+            ensemble.final_estimator_ = self.final_estimator_
+        return ensemble
+
+    def predict(self, X):
+        """Clase con mayor probabilidad"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class OOFVotingClassifier(_OOFEnsemble):
+    """Voting suave sobre estimadores base ya ajustados"""
+
+    def __init__(self, estimators, cv=5):
+        self.estimators = estimators
+        self.cv = cv
+
+    def predict_proba(self, X):
+        return np.mean(self._base_proba(X), axis=0)
+
+    def oof_predictions(self, y, cv):
+        """Predicciones OOF del voting: en cada fold, la media de los estimadores base de ese fold"""
+        return self.classes_[np.mean(self.oof_probas_, axis=0).argmax(axis=1)]
+
+
+class OOFStackingClassifier(_OOFEnsemble):
+    """Stacking cuyo meta-modelo se entrena sobre las probabilidades OOF de los estimadores base"""
+
+    def __init__(self, estimators, final_estimator, cv=5):
+        self.estimators = estimators
+        self.final_estimator = final_estimator
+        self.cv = cv
+
+    def set_fitted(self, fitted_estimators, oof_probas, y):
+        super().set_fitted(fitted_estimators, oof_probas, y)
+        self.final_estimator_ = clone(self.final_estimator).fit(np.hstack(self.oof_probas_), y)
+        return self
+
+    def transform(self, X):
+        """Probabilidades de los estimadores base concatenadas (entrada del meta-modelo)"""
+        return np.hstack(self._base_proba(X))
+
+    def predict_proba(self, X):
+        return self.final_estimator_.predict_proba(self.transform(X))
+
+    def oof_predictions(self, y, cv):
+        """
+        Predicciones OOF del stacking
+
+        El meta-modelo se valida con los mismos folds sobre las probabilidades
+        OOF de los estimadores base (solo se reentrena el meta-modelo, que es barato).
+        """
+        return cross_val_predict(clone(self.final_estimator), np.hstack(self.oof_probas_), y, cv=cv)
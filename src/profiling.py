@@ -0,0 +1,169 @@
+"""
+Perfilado del entrenamiento: tiempo y memoria por etapa, por tarea y por candidato
+
+StageTimer mide cada etapa del pipeline (carga, preprocesado, entrenamiento...)
+con tiempo de pared, tiempo de CPU del proceso principal y pico de memoria
+residente (RSS). Las tareas de los workers las cronometra el planificador
+(src/scheduler.py), que mide con TaskMemory cuánto sube la memoria de cada
+una sobre la que tenía el worker al empezarla. `profile` envuelve un bloque con cProfile o pyinstrument
+y vuelca el resultado a disco.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage
+    resource = None
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return round(peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def _proc_status_mb(key):
+    """Campo de memoria de /proc/self/status (VmRSS, VmHWM) en MB; None fuera de Linux"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(f"{key}:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reiniciar el pico de RSS del proceso (VmHWM, Linux >= 4.0); False si no se puede"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class TaskMemory:
+    """
+    Crecimiento del pico de RSS durante una tarea, en un worker reutilizado
+
+    ru_maxrss es el pico de toda la vida del proceso, así que en un worker de
+    loky que encadena tareas solo puede crecer. En Linux se reinicia el pico
+    (VmHWM) al empezar la tarea y se informa su pico menos la RSS inicial. Si
+    no se puede, se informa cuánto supera la tarea el pico previo del proceso
+    (cota inferior: 0 si no lo supera).
+    """
+
+    def __init__(self):
+        self.rss_start = _proc_status_mb('VmRSS')
+        self.resettable = self.rss_start is not None and _reset_peak_rss()
+        self.peak_start = peak_rss_mb()
+
+    def growth_mb(self):
+        """MB que la tarea añadió sobre la memoria del worker al empezar (None si no se puede medir)"""
+        if self.resettable:
+            peak = _proc_status_mb('VmHWM')
+            if peak is not None:
+                return round(max(peak - self.rss_start, 0.0), 1)
+        peak = peak_rss_mb()
+        if peak is None or self.peak_start is None:
+            return None
+        return round(peak - self.peak_start, 1)
+
+
+class StageTimer:
+    """Tiempo de pared, CPU y pico de RSS de cada etapa del pipeline"""
+
+    def __init__(self):
+        self.t0 = time.time()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        """Medir el bloque como la etapa `name` (se registra aunque falle)"""
+        start = time.time()
+        cpu_start = time.process_time()
+        rss_start = peak_rss_mb()
+        try:
+            yield
+        finally:
+            rss_end = peak_rss_mb()
+            self.stages.append({
+                'stage': name,
+                'start': round(start - self.t0, 3),
+                'end': round(time.time() - self.t0, 3),
+                'wall': round(time.time() - start, 3),
+                'cpu': round(time.process_time() - cpu_start, 3),
+                'peak_rss_mb': rss_end,
+                'rss_growth_mb': None if rss_start is None else round(rss_end - rss_start, 1)
+            })
+
+    def print_summary(self):
+        """Imprimir el tiempo de cada etapa"""
+        print("\n" + "=" * 80)
+        print("TIEMPOS POR ETAPA")
+        print("=" * 80)
+        total = sum(stage['wall'] for stage in self.stages) or 1.0
+        for stage in self.stages:
+            rss = f"{stage['peak_rss_mb']:.0f} MB" if stage['peak_rss_mb'] is not None else "-"
+            print(f"   {stage['stage']:<28} {stage['wall']:>8.2f}s ({stage['wall'] / total:>5.1%})  "
+                  f"CPU {stage['cpu']:>8.2f}s  pico RSS {rss}")
+
+
+@contextmanager
+def profile(profiler, output_base):
+    """
+    Perfilar el bloque y volcar el resultado
+
+    Args:
+        profiler: 'cprofile', 'pyinstrument' o None (sin perfilado)
+        output_base: Ruta sin extensión; se añade .prof (cProfile) o .html (pyinstrument)
+    """
+    if profiler is None:
+        yield
+        return
+
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️  pyinstrument no está instalado; se usa cProfile")
+            profiler = 'cprofile'
+
+    if profiler == 'pyinstrument':
+        instrument = Profiler()
+        instrument.start()
+        try:
+            yield
+        finally:
+            instrument.stop()
+            path = f"{output_base}.html"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(instrument.output_html())
+            print(f"✓ Perfil de pyinstrument guardado en: {path}")
+        return
+
+    cprofiler = cProfile.Profile()
+    cprofiler.enable()
+    try:
+        yield
+    finally:
+        cprofiler.disable()
+        path = f"{output_base}.prof"
+        cprofiler.dump_stats(path)
+        # Resumen de las funciones con más tiempo acumulado (solo el proceso principal)
+        summary = io.StringIO()
+        pstats.Stats(cprofiler, stream=summary).sort_stats('cumulative').print_stats(15)
+        print(summary.getvalue())
+        print(f"✓ Perfil de cProfile guardado en: {path} (abrir con snakeviz o pstats)")
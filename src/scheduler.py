@@ -0,0 +1,211 @@
+"""
+Planificador de entrenamiento en paralelo
+
+Ejecuta en un único pool de procesos (el executor reutilizable de loky, que
+incluye joblib) todas las tareas independientes del entrenamiento: los
+(candidato, fold) de las búsquedas troceadas, las búsquedas de sklearn
+completas, y los ajustes y folds de validación cruzada de los modelos sin
+búsqueda. Todas comparten el mismo presupuesto de workers; cada tarea corre
+con un solo hilo para no sobresuscribir la CPU.
+
+Registra el inicio, el fin y el tiempo de CPU de cada tarea para mostrar una
+línea temporal por modelo, junto con el crecimiento del pico de memoria
+residente del worker durante cada tarea (profiling.TaskMemory). Cada modelo
+puede tener un plazo absoluto y un presupuesto propio, que cuenta desde que
+se despacha su primera tarea: las tareas que empiezan después de su plazo no
+se ejecutan y devuelven DeadlineExceeded; las que ya están en marcha terminan
+normalmente. En las búsquedas troceadas cada tarea es un único ajuste, así que
+un modelo se pasa de su plazo como mucho lo que dura uno; una búsqueda de
+sklearn completa es una sola tarea y solo se comprueba al empezar. El
+presupuesto de un modelo se mantiene entre llamadas a `run`.
+
+Las tareas se despachan a medida que quedan workers libres, y cada resultado
+puede generar tareas de seguimiento (el reajuste del mejor candidato de una
+búsqueda troceada), que pasan delante de las pendientes. Una reserva por
+modelo adelanta el plazo de sus tareas, salvo el reajuste, para que este
+quepa en el presupuesto.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import pandas as pd
+from joblib import effective_n_jobs
+from joblib.externals.loky import get_reusable_executor
+
+from src.profiling import TaskMemory
+
+
+# Cada worker usa un solo hilo (BLAS/OpenMP) para no anidar paralelismo
+THREAD_LIMIT_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'BLIS_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+)
+WORKER_ENV = {var: '1' for var in THREAD_LIMIT_VARS}
+
+# Tareas que no descuentan la reserva de su modelo
+REFIT_TASK = 'refit'
+
+
+class DeadlineExceeded(Exception):
+    """La tarea no se ejecutó porque el presupuesto de tiempo de su modelo se había agotado"""
+
+
+def fit_estimator(estimator, X, y):
+    """Ajustar un estimador y devolverlo (se ejecuta en un worker)"""
+    return estimator.fit(X, y)
+
+
+def _warm_up(seconds=0.1):
+    """Arrancar un worker e importar sklearn, para no cargar su arranque al plazo de la primera tarea"""
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.model_selection  # noqa: F401
+    # Mantener ocupado el worker para que cada calentamiento caiga en uno distinto
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _run_timed(func, args, deadline=None):
+    """Ejecutar una tarea capturando su error, sus tiempos de pared y CPU y lo que sube el RSS del worker"""
+    start = time.time()
+    cpu_start = time.process_time()
+    memory = TaskMemory()
+    if deadline is not None and start >= deadline:
+        result, error = None, DeadlineExceeded(f"plazo vencido hace {start - deadline:.1f}s")
+    else:
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            result, error = None, e
+    timing = {
+        'start': start,
+        'end': time.time(),
+        'cpu': time.process_time() - cpu_start,
+        'rss_growth_mb': memory.growth_mb(),
+        'pid': os.getpid()
+    }
+    return result, error, timing
+
+
+class TrainingScheduler:
+    """
+    Pool compartido para las tareas de entrenamiento de todos los modelos
+
+    Cada tarea es una tupla (modelo, id_tarea, función, argumentos). `run`
+    devuelve (modelo, id_tarea, resultado, error) en orden de finalización; un
+    error en una tarea no detiene a las demás. Las tareas omitidas por plazo
+    vencido tienen como error una instancia de DeadlineExceeded.
+    """
+
+    def __init__(self, n_jobs=-1, verbose=1):
+        self.n_workers = effective_n_jobs(n_jobs)
+        self.verbose = verbose
+        self.records = []
+        self.t0 = time.time()
+        # Primera tarea despachada de cada modelo (inicio de su presupuesto)
+        self.first_dispatch = {}
+
+    def run(self, tasks, deadlines=None, budgets=None, reserves=None, on_result=None):
+        """
+        Ejecutar las tareas en paralelo y registrar sus tiempos
+
+        Args:
+            tasks: Lista de (modelo, id_tarea, función, argumentos)
+            deadlines: {modelo: hora límite (time.time())} opcional
+            budgets: {modelo: segundos desde que se despacha su primera tarea} opcional;
+                cuenta desde la primera tarea del modelo en cualquier llamada a `run`
+            reserves: {modelo: segundos} que se descuentan del plazo de sus tareas,
+                salvo las de id 'refit'; se lee al despachar cada tarea, así que
+                `on_result` puede actualizarlo
+            on_result: Función (modelo, id_tarea, resultado, error) que devuelve
+                tareas de seguimiento; se despachan antes que las pendientes
+        Returns:
+            Lista de (modelo, id_tarea, resultado, error) en orden de finalización
+        """
+        deadlines = deadlines or {}
+        budgets = budgets or {}
+        reserves = {} if reserves is None else reserves
+        if not tasks:
+            return []
+        if self.verbose:
+            print(f"\n⚙️  Ejecutando {len(tasks)} tareas con {self.n_workers} workers")
+
+        def deadline_for(model_name, task_id):
+            # Se evalúa al despachar la tarea, que empieza en cuanto llega a un worker libre
+            limits = [deadlines.get(model_name)]
+            if budgets.get(model_name) is not None:
+                start = self.first_dispatch.setdefault(model_name, time.time())
+                limits.append(start + budgets[model_name])
+            limits = [limit for limit in limits if limit is not None]
+            if not limits:
+                return None
+            if task_id == REFIT_TASK:
+                return min(limits)
+            return min(limits) - reserves.get(model_name, 0.0)
+
+        executor = get_reusable_executor(max_workers=self.n_workers, env=WORKER_ENV)
+        # Los workers inactivos se cierran tras unos segundos: arrancarlos antes de despachar
+        wait([executor.submit(_warm_up) for _ in range(self.n_workers)])
+        pending = deque(tasks)
+        running = {}
+        results = []
+        while pending or running:
+            # Tantas tareas en vuelo como workers: cada una empieza al despacharse
+            while pending and len(running) < self.n_workers:
+                model_name, task_id, func, args = pending.popleft()
+                future = executor.submit(_run_timed, func, args, deadline_for(model_name, task_id))
+                running[future] = (model_name, task_id)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                model_name, task_id = running.pop(future)
+                result, error, timing = future.result()
+                self.records.append({
+                    'model': model_name, 'task': str(task_id), 'task_id': task_id, 'error': error is not None,
+                    'skipped': isinstance(error, DeadlineExceeded), **timing
+                })
+                results.append((model_name, task_id, result, error))
+                if on_result is not None:
+                    pending.extendleft(reversed(on_result(model_name, task_id, result, error)))
+        return results
+
+    def skipped_tasks(self, model_name):
+        """Tareas de un modelo omitidas por plazo vencido"""
+        return sum(1 for r in self.records if r['model'] == model_name and r['skipped'])
+
+    def model_times(self, model_name):
+        """Segundos de trabajo (suma de tiempos de pared de sus tareas) de un modelo"""
+        return sum(r['end'] - r['start'] for r in self.records if r['model'] == model_name)
+
+    def timeline(self):
+        """Línea temporal por modelo: inicio, fin, tiempo de pared, CPU y tareas"""
+        executed = [r for r in self.records if not r['skipped']]
+        if not executed:
+            return pd.DataFrame(columns=['Model', 'Start (s)', 'End (s)', 'Wall (s)', 'CPU (s)', 'Tasks', 'Workers'])
+        df = pd.DataFrame(executed)
+        grouped = df.groupby('model', sort=False).agg(
+            start=('start', 'min'), end=('end', 'max'), cpu=('cpu', 'sum'),
+            tasks=('task', 'count'), workers=('pid', 'nunique')
+        )
+        timeline = pd.DataFrame({
+            'Model': grouped.index,
+            'Start (s)': (grouped['start'] - self.t0).round(2).values,
+            'End (s)': (grouped['end'] - self.t0).round(2).values,
+            'Wall (s)': (grouped['end'] - grouped['start']).round(2).values,
+            'CPU (s)': grouped['cpu'].round(2).values,
+            'Tasks': grouped['tasks'].values,
+            'Workers': grouped['workers'].values
+        })
+        return timeline.sort_values('Start (s)').reset_index(drop=True)
+
+    def print_timeline(self):
+        """Imprimir la línea temporal por modelo"""
+        timeline = self.timeline()
+        print("\n" + "=" * 80)
+        print(f"LÍNEA TEMPORAL DE ENTRENAMIENTO ({self.n_workers} workers)")
+        print("=" * 80)
+        print(timeline.to_string(index=False))
+        total_wall = time.time() - self.t0
+        total_cpu = timeline['CPU (s)'].sum()
+        print(f"\n✓ Tiempo total: {total_wall:.1f}s de pared, {total_cpu:.1f}s de CPU en workers")
+        return timeline
@@ -0,0 +1,457 @@
+"""
+Estrategias de búsqueda de hiperparámetros intercambiables
+
+Permite elegir por modelo entre la búsqueda exhaustiva actual (GridSearchCV),
+una búsqueda aleatoria con presupuesto de candidatos (RandomizedSearchCV) y
+las variantes de successive halving (HalvingGridSearchCV /
+HalvingRandomSearchCV), que descartan pronto los candidatos malos entrenando
+con pocas muestras y solo dan todos los datos a los mejores.
+
+Con una caché de folds (src/fit_cache.py), las estrategias 'grid' y 'random'
+usan CachedSearchCV, que reutiliza los resultados de (candidato, fold) ya
+calculados en ejecuciones anteriores. En modo barrido warm-start, los
+candidatos que solo difieren en n_estimators se evalúan con un único ajuste
+incremental por fold (warm_start en Random Forest y Bagging, predicciones por
+etapas en Gradient Boosting y AdaBoost).
+
+Para ejecutarlas en el planificador de entrenamiento (src/scheduler.py), las
+búsquedas 'grid' y 'random' se pueden trocear en tareas (candidato, fold) con
+CachedSearchCV. Así un presupuesto de tiempo puede cortarlas entre dos ajustes
+y quedarse con el mejor candidato evaluado hasta entonces. Las de successive
+halving son siempre las de sklearn y se ejecutan como una sola tarea.
+"""
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, clone
+from sklearn.ensemble import (
+    AdaBoostClassifier, BaggingClassifier, ExtraTreesClassifier,
+    GradientBoostingClassifier, RandomForestClassifier
+)
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import accuracy_score, get_scorer
+from sklearn.model_selection import (
+    GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV,
+    ParameterGrid, ParameterSampler, check_cv
+)
+from sklearn.utils import _safe_indexing
+
+from src.fit_cache import describe_estimator, hash_arrays
+
+SEARCH_STRATEGIES = ('grid', 'random', 'halving_grid', 'halving_random')
+
+# Búsquedas de sklearn que devuelve build_search
+SKLEARN_SEARCHES = (GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV)
+
+
+def is_search(model):
+    """True si el modelo es una búsqueda de hiperparámetros"""
+    return isinstance(model, (*SKLEARN_SEARCHES, _SplitSearch))
+
+
+def is_split_search(model):
+    """True si la búsqueda se ejecuta como tareas independientes (plan / collect / select_best)"""
+    return isinstance(model, _SplitSearch)
+
+
+def fit_and_score_fold(estimator, X, y, train, test, scoring):
+    """Ajustar un estimador en un fold y puntuarlo en su partición de validación"""
+    start = time.perf_counter()
+    estimator.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = get_scorer(scoring)(estimator, _safe_indexing(X, test), _safe_indexing(y, test))
+    score_time = time.perf_counter() - start
+
+    return {'score': float(score), 'fit_time': fit_time, 'score_time': score_time}
+
+
+def _final_estimator(estimator):
+    """Último paso si el estimador es un Pipeline, o el propio estimador"""
+    return estimator.steps[-1][1] if hasattr(estimator, 'steps') else estimator
+
+
+def sweep_kind(estimator, scoring='accuracy'):
+    """
+    Cómo recorrer n_estimators de forma incremental: 'warm_start', 'staged' o None
+
+    Las predicciones por etapas solo dan la accuracy (no pasan por el scorer).
+    """
+    final = _final_estimator(estimator)
+    if isinstance(final, (RandomForestClassifier, ExtraTreesClassifier, BaggingClassifier)):
+        return 'warm_start'
+    if isinstance(final, (GradientBoostingClassifier, AdaBoostClassifier)) and scoring == 'accuracy':
+        return 'staged'
+    return None
+
+
+def fit_and_score_sweep(estimator, sweep_param, values, X, y, train, test, scoring):
+    """
+    Evaluar en un fold varios n_estimators con un único ajuste incremental
+
+    Con warm_start se añaden árboles al mismo ensemble hasta cada punto de
+    control; con predicciones por etapas se ajusta el tamaño mayor una vez y se
+    puntúa cada etapa pedida. Ambos dan el mismo resultado que ajustar cada
+    tamaño por separado.
+
+    Returns:
+        Lista de resultados (como fit_and_score_fold), en el orden de `values`
+    """
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    results = [None] * len(values)
+
+    if sweep_kind(estimator, scoring) == 'warm_start':
+        estimator.set_params(**{sweep_param.replace('n_estimators', 'warm_start'): True})
+        fit_time = 0.0
+        for i in order:
+            start = time.perf_counter()
+            estimator.set_params(**{sweep_param: values[i]}).fit(X_train, y_train)
+            # Tiempo acumulado: lo que costaría ajustar este tamaño desde cero
+            fit_time += time.perf_counter() - start
+            start = time.perf_counter()
+            score = get_scorer(scoring)(estimator, X_test, y_test)
+            results[i] = {'score': float(score), 'fit_time': fit_time, 'score_time': time.perf_counter() - start}
+        return results
+
+    n_max = max(values)
+    start = time.perf_counter()
+    estimator.set_params(**{sweep_param: n_max}).fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # En un Pipeline, los pasos previos transforman X (los samplers no actúan al predecir)
+    X_eval = X_test
+    for _, step in getattr(estimator, 'steps', [])[:-1]:
+        if hasattr(step, 'transform'):
+            X_eval = step.transform(X_eval)
+    scores, pred = {}, None
+    for n, pred in enumerate(_final_estimator(estimator).staged_predict(X_eval), start=1):
+        if n in values:
+            scores[n] = float(accuracy_score(y_test, pred))
+    score_time = time.perf_counter() - start
+    for i in order:
+        # AdaBoost puede terminar antes de n_max si el ajuste es perfecto
+        score = scores.get(values[i], float(accuracy_score(y_test, pred)))
+        results[i] = {'score': score, 'fit_time': fit_time * values[i] / n_max, 'score_time': score_time}
+    return results
+
+
+class _SplitSearch(BaseEstimator):
+    """
+    Búsqueda dividida en tareas que se pueden ejecutar fuera de ella
+
+    `plan` devuelve las tareas (id_tarea, función, argumentos) y `collect`
+    registra el resultado de cada una. Después, `select_best` elige el mejor
+    candidato con los resultados disponibles y `set_best_estimator` recibe su
+    reajuste con todos los datos.
+    """
+
+    def _track_fit(self, fit_time, n_train):
+        """Recordar el ajuste con más muestras (y, entre ellos, el más lento)"""
+        size, seconds = getattr(self, '_largest_fit', (0, 0.0))
+        if n_train > size or (n_train == size and fit_time > seconds):
+            self._largest_fit = (n_train, fit_time)
+
+    def refit_time_estimate(self, n_samples):
+        """
+        Segundos estimados del reajuste con n_samples
+
+        Escala linealmente el ajuste con más muestras visto hasta ahora (una
+        cota holgada si fue con pocas muestras). Es 0 mientras ningún
+        candidato tenga todos sus folds: aún no hay nada que reajustar.
+        """
+        size, seconds = getattr(self, '_largest_fit', (0, 0.0))
+        if not size or not self._has_complete_candidate():
+            return 0.0
+        return seconds * n_samples / size
+
+    def best_candidate(self):
+        """Mejor candidato sin ajustar"""
+        return clone(self.estimator).set_params(**self.best_params_)
+
+    def set_best_estimator(self, estimator):
+        """Registrar el mejor candidato ya reajustado con todos los datos"""
+        self.best_estimator_ = estimator
+        self.classes_ = estimator.classes_
+        return self
+
+    def finalize(self, X, y):
+        """Elegir el mejor candidato y reajustarlo con todos los datos"""
+        self.select_best()
+        return self.set_best_estimator(self.best_candidate().fit(X, y))
+
+    def fit(self, X, y):
+        """Ejecutar la búsqueda completa con joblib"""
+        tasks = self.plan(X, y)
+        results = Parallel(n_jobs=self.n_jobs)(delayed(func)(*args) for _, func, args in tasks)
+        for (task_id, _, _), result in zip(tasks, results):
+            self.collect(task_id, result)
+        return self.finalize(X, y)
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+
+class CachedSearchCV(_SplitSearch):
+    """
+    Búsqueda exhaustiva o aleatoria con caché de resultados por fold
+
+    Equivale a GridSearchCV / RandomizedSearchCV (mismos atributos best_params_,
+    best_score_, best_estimator_, cv_results_), pero cada (candidato, fold) se
+    busca primero en una FoldResultCache: solo se ajustan los que faltan.
+
+    Con `warm_start_sweep`, los candidatos pendientes que solo difieren en
+    n_estimators se agrupan en una tarea por fold (fit_and_score_sweep), de modo
+    que todo el eje cuesta aproximadamente un ajuste del tamaño mayor.
+
+    Sin caché se usa igualmente para trocear la búsqueda en tareas
+    (candidato, fold) que ejecuta src/scheduler.py.
+    """
+
+    def __init__(self, estimator, param_grid, strategy='grid', cv=5, scoring='accuracy',
+                 n_jobs=-1, n_iter=20, random_state=None, cache=None, cache_context=None,
+                 warm_start_sweep=False, verbose=1):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.strategy = strategy
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.n_iter = n_iter
+        self.random_state = random_state
+        self.cache = cache
+        self.cache_context = cache_context
+        self.warm_start_sweep = warm_start_sweep
+        self.verbose = verbose
+
+    def _candidate_params(self):
+        if self.strategy == 'random':
+            n_iter = min(self.n_iter, len(ParameterGrid(self.param_grid)))
+            return list(ParameterSampler(self.param_grid, n_iter=n_iter, random_state=self.random_state))
+        return list(ParameterGrid(self.param_grid))
+
+    def plan(self, X, y):
+        """
+        Preparar candidatos y folds y devolver las tareas que no están en caché
+
+        Returns:
+            Lista de (id_tarea, función, argumentos)
+        """
+        self.candidates_ = self._candidate_params()
+        self.splits_ = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        self._fold_results = {}
+        self._keys = {}
+        self._largest_fit = (0, 0.0)
+
+        data_hash = hash_arrays(X, y) if self.cache is not None else None
+        pending = []
+        for ci, params in enumerate(self.candidates_):
+            estimator = clone(self.estimator).set_params(**params)
+            for fi in range(len(self.splits_)):
+                if self.cache is not None:
+                    key = self.cache.make_key(
+                        context=self.cache_context, data=data_hash, cv=repr(self.cv),
+                        scoring=self.scoring, estimator=describe_estimator(estimator),
+                        params=params, fold=fi
+                    )
+                    self._keys[(ci, fi)] = key
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        self._fold_results[(ci, fi)] = cached
+                        continue
+                pending.append((ci, fi))
+
+        self.n_cached_ = len(self._fold_results)
+        self.n_fitted_ = len(pending)
+        sweep_tasks = self._sweep_tasks(pending, X, y) if self.warm_start_sweep else []
+        swept = {(ci, task_id[1]) for task_id, _, _ in sweep_tasks for ci in task_id[2]}
+        tasks = list(sweep_tasks)
+        for ci, fi in pending:
+            if (ci, fi) not in swept:
+                train, test = self.splits_[fi]
+                estimator = clone(self.estimator).set_params(**self.candidates_[ci])
+                tasks.append(((ci, fi), fit_and_score_fold, (estimator, X, y, train, test, self.scoring)))
+
+        if self.verbose:
+            sweeps = f", {len(sweep_tasks)} barridos warm-start" if sweep_tasks else ""
+            print(f"Ajustando {len(self.splits_)} folds para cada uno de {len(self.candidates_)} candidatos, "
+                  f"{len(self.candidates_) * len(self.splits_)} ajustes en total "
+                  f"({self.n_cached_} en caché, {self.n_fitted_} por ajustar{sweeps})")
+        return tasks
+
+    def _sweep_param(self):
+        """Nombre del parámetro n_estimators (con prefijo si el estimador es un Pipeline)"""
+        if hasattr(self.estimator, 'steps'):
+            return f"{self.estimator.steps[-1][0]}__n_estimators"
+        return 'n_estimators'
+
+    def _sweep_tasks(self, pending, X, y):
+        """Agrupar los (candidato, fold) pendientes que solo difieren en n_estimators"""
+        if sweep_kind(self.estimator, self.scoring) is None:
+            return []
+        sweep_param = self._sweep_param()
+        groups = {}
+        for ci, fi in pending:
+            params = self.candidates_[ci]
+            if sweep_param not in params:
+                continue
+            rest = tuple(sorted((k, repr(v)) for k, v in params.items() if k != sweep_param))
+            groups.setdefault((rest, fi), []).append(ci)
+
+        tasks = []
+        for (_, fi), cis in groups.items():
+            if len(cis) < 2:
+                continue
+            train, test = self.splits_[fi]
+            params = dict(self.candidates_[cis[0]])
+            values = [self.candidates_[ci][sweep_param] for ci in cis]
+            estimator = clone(self.estimator).set_params(**params)
+            tasks.append((('sweep', fi, tuple(cis)), fit_and_score_sweep,
+                          (estimator, sweep_param, values, X, y, train, test, self.scoring)))
+        return tasks
+
+    def collect(self, task_id, result):
+        """Registrar el resultado de una tarea (y guardarlo en la caché)"""
+        if task_id[0] == 'sweep':
+            _, fi, cis = task_id
+            for ci, ci_result in zip(cis, result):
+                self.collect((ci, fi), ci_result)
+            return
+        self._fold_results[task_id] = result
+        self._track_fit(result['fit_time'], len(self.splits_[task_id[1]][0]))
+        if self.cache is not None:
+            self.cache.put(self._keys[task_id], result)
+
+    def task_params(self, task_id):
+        """Hiperparámetros de los candidatos que evalúa una tarea"""
+        candidates = task_id[2] if task_id[0] == 'sweep' else [task_id[0]]
+        return [self.candidates_[ci] for ci in candidates]
+
+    def _has_complete_candidate(self):
+        n_splits = len(self.splits_)
+        return any(
+            all((ci, fi) in self._fold_results for fi in range(n_splits))
+            for ci in range(len(self.candidates_))
+        )
+
+    def select_best(self):
+        """
+        Construir cv_results_ y elegir el mejor candidato a partir de los resultados por fold
+
+        Si la búsqueda se cortó (p. ej. por presupuesto de tiempo), solo se
+        consideran los candidatos con todos sus folds evaluados; `truncated_`
+        indica si faltó alguno.
+
+        Raises:
+            ValueError si ningún candidato completó todos sus folds
+        """
+        n_splits = len(self.splits_)
+        complete = [
+            ci for ci in range(len(self.candidates_))
+            if all((ci, fi) in self._fold_results for fi in range(n_splits))
+        ]
+        if not complete:
+            raise ValueError("Ningún candidato completó todos sus folds")
+        self.truncated_ = len(complete) < len(self.candidates_)
+        candidates = [self.candidates_[ci] for ci in complete]
+
+        scores = np.array([
+            [self._fold_results[(ci, fi)]['score'] for fi in range(n_splits)]
+            for ci in complete
+        ])
+        fit_times = np.array([
+            [self._fold_results[(ci, fi)]['fit_time'] for fi in range(n_splits)]
+            for ci in complete
+        ])
+
+        mean_scores = scores.mean(axis=1)
+        self.cv_results_ = {
+            'params': candidates,
+            'mean_test_score': mean_scores,
+            'std_test_score': scores.std(axis=1),
+            'rank_test_score': rankdata(-mean_scores, method='min').astype(np.int32),
+            'mean_fit_time': fit_times.mean(axis=1),
+        }
+        for fi in range(n_splits):
+            self.cv_results_[f'split{fi}_test_score'] = scores[:, fi]
+
+        # Igual que sklearn: en caso de empate gana el primer candidato
+        self.best_index_ = int(np.argmax(mean_scores))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(mean_scores[self.best_index_])
+        return self
+
+
+def build_search(estimator, param_grid, strategy='grid', cv=5, scoring='accuracy',
+                 n_jobs=-1, n_iter=20, factor=3, random_state=None, verbose=1,
+                 cache=None, cache_context=None, warm_start_sweep=False, split=False):
+    """
+    Construir la búsqueda de hiperparámetros para un estimador
+
+    Args:
+        estimator: Estimador base
+        param_grid: Espacio de búsqueda (dict de listas de valores)
+        strategy: 'grid' (exhaustiva), 'random' (n_iter candidatos),
+            'halving_grid' o 'halving_random' (successive halving)
+        cv: Estrategia de validación cruzada
+        scoring: Métrica a optimizar
+        n_jobs: Procesos en paralelo
+        n_iter: Presupuesto de candidatos para 'random' y 'halving_random'
+        factor: Proporción de candidatos que sobrevive en cada ronda de halving
+        random_state: Semilla para las estrategias aleatorias
+        verbose: Nivel de detalle
+        cache: FoldResultCache opcional; con ella 'grid' y 'random' usan CachedSearchCV
+            (successive halving cambia el número de muestras en cada ronda y no se cachea)
+        cache_context: Datos que identifican el dataset y el preprocesado en la clave
+        warm_start_sweep: Evaluar el eje n_estimators con un ajuste incremental por fold
+            ('grid' y 'random'; usa CachedSearchCV aunque no haya caché)
+        split: Trocear 'grid' y 'random' en tareas (CachedSearchCV) para ejecutarlas
+            en src/scheduler.py; successive halving usa siempre la búsqueda de sklearn
+    Returns:
+        Objeto de búsqueda sin ajustar
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Estrategia de búsqueda desconocida '{strategy}'. Usa una de {SEARCH_STRATEGIES}")
+
+    if (cache is not None or warm_start_sweep or split) and strategy in ('grid', 'random'):
+        return CachedSearchCV(
+            estimator, param_grid, strategy=strategy, cv=cv, scoring=scoring, n_jobs=n_jobs,
+            n_iter=n_iter, random_state=random_state, cache=cache, cache_context=cache_context,
+            warm_start_sweep=warm_start_sweep, verbose=verbose
+        )
+
+    common = dict(cv=cv, scoring=scoring, n_jobs=n_jobs, verbose=verbose)
+    # No tiene sentido muestrear más candidatos que los que tiene la rejilla
+    budget = min(n_iter, len(ParameterGrid(param_grid)))
+
+    if strategy == 'grid':
+        return GridSearchCV(estimator, param_grid, **common)
+    if strategy == 'random':
+        return RandomizedSearchCV(
+            estimator, param_grid, n_iter=budget, random_state=random_state, **common
+        )
+    if strategy == 'halving_grid':
+        return HalvingGridSearchCV(
+            estimator, param_grid, factor=factor, min_resources='exhaust',
+            random_state=random_state, **common
+        )
+    return HalvingRandomSearchCV(
+        estimator, param_grid, n_candidates=budget, factor=factor, min_resources='exhaust',
+        random_state=random_state, **common
+    )
+
+
+def count_candidates(search):
+    """Número de combinaciones distintas evaluadas por una búsqueda ya ajustada"""
+    # En halving cv_results_ repite los candidatos supervivientes en cada ronda
+    if hasattr(search, 'n_candidates_'):
+        return int(search.n_candidates_[0])
+    return len(search.cv_results_['params'])
@@ -1,17 +1,23 @@
 """
 Script de entrenamiento de modelos baseline y ensemble para clasificación de salud fetal
-Incluye optimización automática de hiperparámetros usando GridSearchCV
+Incluye optimización automática de hiperparámetros (GridSearchCV, búsqueda aleatoria
+o successive halving, seleccionable por modelo)
 Diseñado para ejecutarse dentro del contenedor Docker backend
 """
 import pandas as pd
 import numpy as np
 import joblib
+import argparse
 import json
+import os
+import shutil
 from pathlib import Path
 from datetime import datetime
 from sklearn.model_selection import (
-    train_test_split, cross_val_score, StratifiedKFold, GridSearchCV
+    train_test_split, StratifiedKFold
 )
+import time
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
@@ -31,13 +37,49 @@ from sklearn.ensemble import (
     GradientBoostingClassifier,
     AdaBoostClassifier,
     BaggingClassifier,
-    VotingClassifier,
-    StackingClassifier
+    HistGradientBoostingClassifier
 )
-from xgboost import XGBClassifier
+
+# XGBoost (hist) con el desplazamiento de etiquetas encapsulado
+from src.boosting import LabelEncodedXGBClassifier
+
+# Estrategias de búsqueda de hiperparámetros
+from src.search import (
+    SEARCH_STRATEGIES, build_search, count_candidates, is_search, is_split_search
+)
+
+# Evaluación out-of-fold y ensembles que reutilizan las predicciones OOF
+from src.oof import (
+    OOFStackingClassifier, OOFVotingClassifier, _OOFEnsemble,
+    assemble_oof, fit_and_predict_fold, fold_scores_from_oof
+)
+
+# Planificador de entrenamiento en paralelo
+from src.scheduler import REFIT_TASK, DeadlineExceeded, TrainingScheduler, fit_estimator
+
+# Especificación declarativa de experimentos
+from src.experiment import load_spec
+
+# Carga de datos con caché Arrow tipada
+from src.load_data import load_data_and_hash
+
+# Selección de variables (poda por correlación, permutación o RFE)
+from src.feature_selection import (
+    DEFAULT_OPTIONS as FEATURE_SELECTION_OPTIONS, LOW_SIGNAL_METHODS, select_features, validate_options
+)
+
+# Caché de resultados por fold
+from src.fit_cache import FoldResultCache
+
+# Tiempos por etapa y perfilado
+from src.profiling import PROFILERS, StageTimer, profile
+
+# Motor de inferencia compilado para ensembles de árboles
+from src.tree_engine import compile_tree_ensemble, check_parity
 
 # Para manejo de desbalanceo
 from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
 from collections import Counter
 
 import warnings
@@ -47,28 +89,140 @@ warnings.filterwarnings('ignore')
 class FetalHealthModelTrainer:
     """Clase para entrenar y evaluar modelos de clasificación de salud fetal"""
     
-    def __init__(self, data_path, random_state=42):
+    def __init__(self, data_path, random_state=42, search_strategies=None, search_budget=20,
+                 use_fit_cache=True, fit_cache_max_mb=256, n_jobs=-1, pipeline_mode=False,
+                 warm_start_sweep=False, split_search=False, cv_splits=5, model_names=None, param_grids=None,
+                 models_dir="/app/models", reports_dir="/app/reports",
+                 time_budget=None, model_time_budget=None, model_time_budgets=None,
+                 feature_selection=None):
         """
         Inicializar el trainer
         
         Args:
             data_path: Ruta al archivo CSV con los datos
             random_state: Semilla para reproducibilidad
+            search_strategies: Estrategia de búsqueda para todos los modelos
+                ('grid', 'random', 'halving_grid', 'halving_random') o por modelo,
+                p. ej. {'Random Forest': 'halving_grid'}; los no indicados usan 'grid'
+            search_budget: Candidatos a evaluar en las estrategias aleatorias
+            use_fit_cache: Reutilizar los resultados por fold de ejecuciones anteriores
+                (estrategias 'grid' y 'random')
+            fit_cache_max_mb: Tamaño máximo de la caché de folds en disco
+            n_jobs: Workers compartidos por todas las tareas de entrenamiento (-1: todas las CPUs)
+            pipeline_mode: Escalar y aplicar SMOTE dentro de cada fold con un Pipeline de
+                imblearn (transformaciones cacheadas y compartidas entre candidatos)
+            warm_start_sweep: Evaluar el eje n_estimators de RF, GB, AdaBoost y Bagging
+                con un único ajuste incremental por fold
+            split_search: Trocear las búsquedas 'grid' y 'random' en tareas (candidato, fold)
+                del planificador; sin él se usan GridSearchCV / RandomizedSearchCV, salvo en
+                los modelos con presupuesto de tiempo (o con la caché o el barrido activos)
+            cv_splits: Folds de la validación cruzada estratificada
+            model_names: Modelos a entrenar (None: todos)
+            param_grids: Rejillas que sustituyen a las por defecto, p. ej.
+                {'Random Forest': {'n_estimators': [50, 100]}}
+            models_dir: Directorio del modelo y las cachés
+            reports_dir: Directorio de los informes
+            time_budget: Segundos máximos para el entrenamiento de todos los modelos (None: sin límite)
+            model_time_budget: Segundos máximos por modelo (None: sin límite)
+            model_time_budgets: Presupuestos por modelo que sustituyen a model_time_budget,
+                p. ej. {'Support Vector Machine': 60}
+            feature_selection: Opciones de la selección de variables (src/feature_selection.py),
+                p. ej. {'correlation_threshold': 0.85, 'low_signal': 'permutation'};
+                None: se usan todas las variables
         """
         self.data_path = Path(data_path)
         self.random_state = random_state
+        self.search_strategies = search_strategies or {}
+        self.search_budget = search_budget
+        self.n_jobs = n_jobs
+        self.pipeline_mode = pipeline_mode
+        self.warm_start_sweep = warm_start_sweep
+        self.split_search = split_search
+        self.cv_splits = cv_splits
+        self.model_names = model_names
+        self.param_grids = param_grids or {}
+        self.time_budget = time_budget
+        self.model_time_budget = model_time_budget
+        self.model_time_budgets = model_time_budgets or {}
+        self.feature_selection = feature_selection
+        self.feature_selection_result = None
+        self.model_status = {}
+        self.stage_timer = StageTimer()
+        self.run_timestamp = None
+        self.apply_smote = True
+        self.scheduler = None
+        self.timeline = None
+        self.search_spaces = {}
         self.models = {}
         self.results = {}
         self.best_model = None
         self.best_model_name = None
+        self.compiled_model = None
+        self.compiled_parity = None
         self.scaler = StandardScaler()
         
-        # Directorios (en el contenedor Docker)
-        self.models_dir = Path("/app/models")
-        self.reports_dir = Path("/app/reports")
+        # Directorios (por defecto, en el contenedor Docker)
+        self.models_dir = Path(models_dir)
+        self.reports_dir = Path(reports_dir)
         self.models_dir.mkdir(exist_ok=True, parents=True)
         self.reports_dir.mkdir(exist_ok=True, parents=True)
         
+        # Caché de (candidato, fold) direccionada por contenido
+        self.fit_cache = FoldResultCache(self.models_dir / "fit_cache", fit_cache_max_mb) if use_fit_cache else None
+        # Caché de transformaciones del modo pipeline (escalado y SMOTE por fold)
+        self.pipeline_cache_dir = self.models_dir / "pipeline_cache"
+        self.dataset_hash = None
+        self.preprocessing_config = None
+    
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Crear el trainer a partir de una especificación de experimento (src/experiment.py)
+        
+        Args:
+            spec: Diccionario devuelto por load_spec
+        """
+        training = spec['training']
+        models = spec['models']
+        if models is None:
+            search_strategies = training['search_strategy']
+        else:
+            search_strategies = {
+                name: options.get('strategy', training['search_strategy'])
+                for name, options in models.items()
+            }
+        return cls(
+            data_path=spec['data']['path'],
+            random_state=training['random_state'],
+            search_strategies=search_strategies,
+            search_budget=training['search_budget'],
+            use_fit_cache=training['fit_cache'],
+            fit_cache_max_mb=training['fit_cache_max_mb'],
+            n_jobs=training['n_jobs'],
+            pipeline_mode=training['pipeline_mode'],
+            warm_start_sweep=training['warm_start_sweep'],
+            split_search=training['split_search'],
+            cv_splits=training['cv_splits'],
+            model_names=None if models is None else list(models),
+            param_grids={
+                name: options['param_grid']
+                for name, options in (models or {}).items() if 'param_grid' in options
+            },
+            models_dir=spec['output']['models_dir'],
+            reports_dir=spec['output']['reports_dir'],
+            time_budget=training['time_budget'],
+            model_time_budget=training['model_time_budget'],
+            model_time_budgets={
+                name: options['time_budget']
+                for name, options in (models or {}).items() if 'time_budget' in options
+            },
+            feature_selection=spec['feature_selection'] if spec['feature_selection']['enabled'] else None
+        )
+    
+    def _cv(self):
+        """Validación cruzada estratificada usada por búsquedas y evaluación"""
+        return StratifiedKFold(n_splits=self.cv_splits, shuffle=True, random_state=self.random_state)
+        
     def load_and_explore_data(self):
         """Cargar y explorar el dataset"""
         print("=" * 80)
@@ -76,7 +230,7 @@ class FetalHealthModelTrainer:
         print("=" * 80)
         
         # Cargar datos
-        self.df = pd.read_csv(self.data_path)
+        self.df, self.dataset_hash = load_data_and_hash(self.data_path)
         print(f"\n✓ Dataset cargado: {self.df.shape[0]} filas, {self.df.shape[1]} columnas")
         
         # Información básica
@@ -129,6 +283,41 @@ class FetalHealthModelTrainer:
         print(f"\n✓ Train set: {X_train.shape[0]} muestras")
         print(f"✓ Test set: {X_test.shape[0]} muestras")
         
+        # Todas las variables, para comparar con el subconjunto seleccionado
+        self.X_train_all = X_train
+        self.X_test_all = X_test
+        
+        # Selección de variables ajustada solo con el train (antes del escalado)
+        if self.feature_selection is not None:
+            X_train, X_test = self._select_features(X_train, X_test, y_train)
+        
+        # Datos sin escalar ni remuestrear (modo pipeline y comparaciones)
+        self.X_train_raw = X_train
+        self.y_train_raw = y_train
+        self.X_test_raw = X_test
+        self.apply_smote = apply_smote
+        
+        if self.pipeline_mode:
+            # El escalado y SMOTE se ajustan dentro de cada fold (sin fuga entre folds)
+            self.scaler.fit(X_train)
+            self._reset_pipeline_cache()
+            print(f"\n✓ Modo pipeline: StandardScaler{' + SMOTE' if apply_smote else ''} "
+                  f"se aplican dentro de cada fold (caché en {self.pipeline_cache_dir})")
+            self.X_train = X_train
+            self.X_test = X_test
+            self.y_train = y_train
+            self.y_test = y_test
+            self.feature_names = X_train.columns.tolist()
+            self.preprocessing_config = {
+                'test_size': test_size,
+                'apply_smote': apply_smote,
+                'scaler': type(self.scaler).__name__,
+                'random_state': self.random_state,
+                'pipeline_mode': True,
+                'feature_selection': self._feature_selection_config()
+            }
+            return self.X_train, self.X_test, self.y_train, self.y_test
+        
         # Normalizar datos
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
@@ -151,10 +340,43 @@ class FetalHealthModelTrainer:
         self.X_test = X_test_scaled
         self.y_train = y_train
         self.y_test = y_test
-        self.feature_names = X.columns.tolist()
+        self.feature_names = X_train.columns.tolist()
+        self.preprocessing_config = {
+            'test_size': test_size,
+            'apply_smote': apply_smote,
+            'scaler': type(self.scaler).__name__,
+            'random_state': self.random_state,
+            'pipeline_mode': False,
+            'feature_selection': self._feature_selection_config()
+        }
         
         return self.X_train, self.X_test, self.y_train, self.y_test
     
+    def _select_features(self, X_train, X_test, y_train):
+        """Elegir las variables con el train y reducir a ellas train y test"""
+        start = time.perf_counter()
+        self.feature_selection_result = select_features(
+            X_train, y_train, self.feature_selection, self.random_state, self.n_jobs
+        )
+        selected = self.feature_selection_result['selected']
+        dropped = self.feature_selection_result['dropped']
+        
+        print(f"\n✓ Selección de variables: {len(selected)} de {X_train.shape[1]} "
+              f"({time.perf_counter() - start:.2f}s)")
+        for feature, reason in dropped.items():
+            print(f"   - {feature:<55} {reason}")
+        
+        return X_train[selected], X_test[selected]
+    
+    def _feature_selection_config(self):
+        """Opciones y subconjunto elegido (forman parte de la clave de la caché de folds)"""
+        if self.feature_selection_result is None:
+            return None
+        return {
+            **self.feature_selection_result['options'],
+            'selected': self.feature_selection_result['selected']
+        }
+    
     def initialize_models(self):
         """Inicializar modelos baseline y ensemble con optimización de hiperparámetros"""
         print("\n" + "=" * 80)
@@ -162,7 +384,7 @@ class FetalHealthModelTrainer:
         print("=" * 80)
         
         # Configuración de validación cruzada para GridSearch
-        cv_strategy = StratifiedKFold(n_splits=5, shuffle=True, random_state=self.random_state)
+        cv_strategy = self._cv()
         
         # Modelos Baseline (sin optimización para comparación rápida)
         baseline_models = {
@@ -180,10 +402,10 @@ class FetalHealthModelTrainer:
         }
         
         # Modelos Ensemble CON optimización de hiperparámetros
-        print("\n🔍 Configurando GridSearchCV para modelos ensemble...")
+        print("\n🔍 Configurando la búsqueda de hiperparámetros para modelos ensemble...")
         print("   Nota: La optimización puede tardar varios minutos")
         
-        # AdaBoost con GridSearchCV
+        # AdaBoost con búsqueda de hiperparámetros
         print("\n📊 AdaBoost: Optimizando hiperparámetros...")
         ada_param_grid = {
             'n_estimators': [50, 100, 150, 200],
@@ -194,12 +416,9 @@ class FetalHealthModelTrainer:
             estimator=DecisionTreeClassifier(random_state=self.random_state),
             random_state=self.random_state
         )
-        ada_grid = GridSearchCV(
-            ada_base, ada_param_grid, cv=cv_strategy, 
-            scoring='accuracy', n_jobs=-1, verbose=1
-        )
+        ada_grid = self._make_search('AdaBoost', ada_base, ada_param_grid, cv_strategy)
         
-        # Random Forest con GridSearchCV
+        # Random Forest con búsqueda de hiperparámetros
         print("\n📊 Random Forest: Optimizando hiperparámetros...")
         rf_param_grid = {
             'n_estimators': [50, 100, 150],
@@ -212,12 +431,9 @@ class FetalHealthModelTrainer:
             class_weight='balanced',
             n_jobs=1  # GridSearch ya paraleliza
         )
-        rf_grid = GridSearchCV(
-            rf_base, rf_param_grid, cv=cv_strategy,
-            scoring='accuracy', n_jobs=-1, verbose=1
-        )
+        rf_grid = self._make_search('Random Forest', rf_base, rf_param_grid, cv_strategy)
         
-        # Gradient Boosting con GridSearchCV
+        # Gradient Boosting con búsqueda de hiperparámetros
         print("\n📊 Gradient Boosting: Optimizando hiperparámetros...")
         gb_param_grid = {
             'n_estimators': [50, 100, 150],
@@ -226,12 +442,9 @@ class FetalHealthModelTrainer:
             'subsample': [0.8, 1.0]
         }
         gb_base = GradientBoostingClassifier(random_state=self.random_state)
-        gb_grid = GridSearchCV(
-            gb_base, gb_param_grid, cv=cv_strategy,
-            scoring='accuracy', n_jobs=-1, verbose=1
-        )
+        gb_grid = self._make_search('Gradient Boosting', gb_base, gb_param_grid, cv_strategy)
         
-        # Bagging con GridSearchCV (optimización ligera)
+        # Bagging con búsqueda de hiperparámetros (optimización ligera)
         print("\n📊 Bagging: Optimizando hiperparámetros...")
         bagging_param_grid = {
             'n_estimators': [30, 50, 70],
@@ -239,91 +452,383 @@ class FetalHealthModelTrainer:
             'max_features': [0.7, 0.8, 1.0]
         }
         bagging_base = BaggingClassifier(random_state=self.random_state, n_jobs=1)
-        bagging_grid = GridSearchCV(
-            bagging_base, bagging_param_grid, cv=cv_strategy,
-            scoring='accuracy', n_jobs=-1, verbose=1
+        bagging_grid = self._make_search('Bagging', bagging_base, bagging_param_grid, cv_strategy)
+        
+        # Boosting con histogramas: el número de iteraciones lo decide la parada
+        # temprana nativa, por lo que no se busca en la rejilla
+        print("\n📊 Hist Gradient Boosting: Optimizando hiperparámetros...")
+        hgb_param_grid = {
+            'learning_rate': [0.05, 0.1, 0.2],
+            'max_leaf_nodes': [15, 31, 63],
+            'l2_regularization': [0.0, 1.0]
+        }
+        hgb_base = HistGradientBoostingClassifier(
+            max_iter=500, early_stopping=True, validation_fraction=0.1,
+            n_iter_no_change=20, random_state=self.random_state
         )
+        hgb_grid = self._make_search('Hist Gradient Boosting', hgb_base, hgb_param_grid, cv_strategy)
         
         ensemble_models = {
             'Random Forest': rf_grid,
             'Gradient Boosting': gb_grid,
+            'Hist Gradient Boosting': hgb_grid,
             'AdaBoost': ada_grid,
             'Bagging': bagging_grid,
         }
         
-        # XGBoost (deshabilitado por problemas de compatibilidad con sklearn)
-        # try:
-        #     ensemble_models['XGBoost'] = XGBClassifier(
-        #         n_estimators=100, learning_rate=0.1, max_depth=5,
-        #         random_state=self.random_state, eval_metric='mlogloss'
-        #     )
-        # except Exception as e:
-        #     print(f"⚠️ XGBoost no disponible: {e}")
+        # XGBoost con tree_method='hist' (las etiquetas 1-3 se codifican dentro del wrapper)
+        try:
+            print("\n📊 XGBoost: Optimizando hiperparámetros...")
+            xgb_param_grid = {
+                'learning_rate': [0.05, 0.1, 0.2],
+                'max_depth': [3, 5, 7],
+                'subsample': [0.8, 1.0]
+            }
+            xgb_base = LabelEncodedXGBClassifier(
+                n_estimators=500, early_stopping_rounds=20, validation_fraction=0.1,
+                random_state=self.random_state
+            )
+            ensemble_models['XGBoost'] = self._make_search('XGBoost', xgb_base, xgb_param_grid, cv_strategy)
+        except Exception as e:
+            print(f"⚠️ XGBoost no disponible: {e}")
         
         # Voting y Stacking (sin GridSearch para evitar complejidad excesiva)
+        # Comparten los estimadores base: cada uno se ajusta una vez por fold y otra
+        # con todos los datos, y ambos ensembles reutilizan sus predicciones OOF
+        ensemble_bases = [
+            ('rf', self._wrap(RandomForestClassifier(n_estimators=50, random_state=self.random_state))),
+            ('gb', self._wrap(GradientBoostingClassifier(n_estimators=50, random_state=self.random_state))),
+        ]
         try:
-            ensemble_models['Voting Classifier'] = VotingClassifier(
-                estimators=[
-                    ('rf', RandomForestClassifier(n_estimators=50, random_state=self.random_state)),
-                    ('gb', GradientBoostingClassifier(n_estimators=50, random_state=self.random_state)),
-                ],
-                voting='soft'
+            ensemble_models['Voting Classifier'] = OOFVotingClassifier(
+                estimators=ensemble_bases, cv=cv_strategy
             )
         except Exception as e:
             print(f"⚠️ Voting Classifier no disponible: {e}")
         
         try:
-            ensemble_models['Stacking Classifier'] = StackingClassifier(
-                estimators=[
-                    ('rf', RandomForestClassifier(n_estimators=50, random_state=self.random_state)),
-                    ('gb', GradientBoostingClassifier(n_estimators=50, random_state=self.random_state)),
-                ],
+            ensemble_models['Stacking Classifier'] = OOFStackingClassifier(
+                estimators=ensemble_bases,
                 final_estimator=LogisticRegression(random_state=self.random_state),
-                cv=5
+                cv=cv_strategy
             )
         except Exception as e:
             print(f"⚠️ Stacking Classifier no disponible: {e}")
         
-        self.models = {**baseline_models, **ensemble_models}
+        # Las búsquedas y los ensembles OOF ya envuelven sus estimadores en el pipeline
+        self.models = {
+            name: model if is_search(model) or isinstance(model, _OOFEnsemble) else self._wrap(model)
+            for name, model in {**baseline_models, **ensemble_models}.items()
+        }
+        
+        # Modelos seleccionados por la especificación del experimento
+        unused_grids = set(self.param_grids) - set(self.search_spaces)
+        if unused_grids:
+            raise ValueError(f"Rejillas para modelos sin búsqueda de hiperparámetros: {sorted(unused_grids)}")
+        if self.model_names is not None:
+            unknown = set(self.model_names) - set(self.models)
+            if unknown:
+                raise ValueError(f"Modelos desconocidos: {sorted(unknown)}. Disponibles: {list(self.models)}")
+            self.models = {name: model for name, model in self.models.items() if name in self.model_names}
+            self.search_spaces = {name: space for name, space in self.search_spaces.items() if name in self.models}
+            baseline_models = {name: m for name, m in baseline_models.items() if name in self.models}
+            ensemble_models = {name: m for name, m in ensemble_models.items() if name in self.models}
         
         print(f"\n✓ {len(baseline_models)} modelos baseline inicializados")
-        print(f"✓ {len(ensemble_models)} modelos ensemble configurados con GridSearchCV")
-        print(f"\n⏱️  Tiempo estimado total: 10-20 minutos")
+        print(f"✓ {len(ensemble_models)} modelos ensemble configurados")
+        for name in self.search_spaces:
+            split = " (troceada en tareas)" if is_split_search(self.models[name]) else ""
+            print(f"   - {name}: búsqueda '{self._strategy_for(name)}'{split}")
+            if not split and self._has_time_budget(name):
+                print("     ⚠️ successive halving es una sola tarea: su presupuesto solo se comprueba al empezar")
+        # La duración depende del perfil (rejillas, folds, barrido): solo se informa el tope
+        if self.time_budget:
+            print(f"\n⏱️  Presupuesto de tiempo global: {self.time_budget}s")
+        else:
+            print(f"\n⏱️  Sin presupuesto de tiempo global (--time-budget para acotar la duración)")
         
         return self.models
     
+    def _strategy_for(self, name):
+        """Estrategia de búsqueda configurada para un modelo"""
+        if isinstance(self.search_strategies, str):
+            return self.search_strategies
+        return self.search_strategies.get(name, 'grid')
+    
+    def _reset_pipeline_cache(self):
+        """Vaciar la caché de transformaciones del modo pipeline"""
+        shutil.rmtree(self.pipeline_cache_dir, ignore_errors=True)
+        self.pipeline_cache_dir.mkdir(exist_ok=True, parents=True)
+    
+    def _make_pipeline(self, estimator, memory=True):
+        """Pipeline de imblearn: escalado y SMOTE (solo en fit) seguidos del modelo"""
+        steps = [('scaler', StandardScaler())]
+        if self.apply_smote:
+            steps.append(('smote', SMOTE(random_state=self.random_state)))
+        steps.append(('model', estimator))
+        # Con memory, las transformaciones de cada fold se calculan una vez y
+        # se reutilizan en todos los candidatos de la búsqueda
+        return Pipeline(steps, memory=str(self.pipeline_cache_dir) if memory else None)
+    
+    def _wrap(self, estimator, param_grid=None):
+        """Envolver un estimador (y su rejilla) en el pipeline si el modo pipeline está activo"""
+        if not self.pipeline_mode:
+            return estimator if param_grid is None else (estimator, param_grid)
+        pipeline = self._make_pipeline(estimator)
+        if param_grid is None:
+            return pipeline
+        return pipeline, {f"model__{key}": values for key, values in param_grid.items()}
+    
+    def _make_search(self, name, estimator, param_grid, cv, strategy=None):
+        """Crear la búsqueda de hiperparámetros de un modelo y recordar su espacio"""
+        # La especificación del experimento puede sustituir la rejilla por defecto
+        param_grid = self.param_grids.get(name, param_grid)
+        self.search_spaces[name] = (estimator, param_grid, cv)
+        estimator, param_grid = self._wrap(estimator, param_grid)
+        return build_search(
+            estimator, param_grid,
+            strategy=strategy or self._strategy_for(name),
+            cv=cv, scoring='accuracy', n_jobs=-1,
+            n_iter=self.search_budget, random_state=self.random_state,
+            cache=self.fit_cache,
+            cache_context={'dataset': self.dataset_hash, 'preprocessing': self.preprocessing_config},
+            warm_start_sweep=self.warm_start_sweep,
+            # Troceada en tareas (candidato, fold) si se pide o si hay que cortarla por tiempo
+            split=self.split_search or self._has_time_budget(name)
+        )
+    
+    def _has_time_budget(self, name):
+        """True si el modelo tiene presupuesto de tiempo (global o propio)"""
+        return (self.time_budget is not None
+                or self.model_time_budgets.get(name, self.model_time_budget) is not None)
+    
+    def _fold_tasks(self, name, model, y, cv):
+        """Ajuste final y k folds (con predicciones OOF) de un modelo sin búsqueda: k+1 ajustes"""
+        tasks = [(name, 'fit', fit_estimator, (model, self.X_train, y))]
+        for fold, (train, test) in enumerate(cv.split(self.X_train, y)):
+            tasks.append((name, ('cv', fold), fit_and_predict_fold,
+                          (clone(model), self.X_train, y, train, test, 'accuracy')))
+        return tasks
+    
+    def _time_limits(self, ensemble_bases):
+        """
+        Plazos de las tareas de entrenamiento
+        
+        El presupuesto global es una hora límite común contada desde ahora; el de
+        cada modelo cuenta desde que el planificador despacha su primera tarea.
+        Los estimadores base de Voting/Stacking usan el mayor presupuesto de los
+        ensembles que los comparten.
+        
+        Returns:
+            ({modelo: hora límite}, {modelo: segundos})
+        """
+        deadline = None if self.time_budget is None else time.time() + self.time_budget
+        budgets = {
+            name: self.model_time_budgets.get(name, self.model_time_budget)
+            for name in self.models
+        }
+        for base_name in ensemble_bases:
+            users = [
+                budgets[name] for name, model in self.models.items()
+                if isinstance(model, _OOFEnsemble) and base_name[5:] in dict(model.estimators)
+            ]
+            budgets[base_name] = None if None in users else max(users)
+        
+        deadlines = {name: deadline for name in budgets} if deadline is not None else {}
+        budgets = {name: budget for name, budget in budgets.items() if budget is not None}
+        return deadlines, budgets
+    
+    def _fit_all_models(self):
+        """
+        Ajustar todos los modelos en un único pool de workers
+        
+        Trocea el trabajo en tareas independientes: (candidato, fold) de las
+        búsquedas troceadas, las búsquedas de sklearn completas (con n_jobs=1),
+        y el ajuste final y los folds de CV (con predicciones OOF) de los modelos
+        sin búsqueda. Los estimadores base de Voting y Stacking se ajustan una
+        sola vez y ambos ensembles reutilizan sus predicciones OOF. En cuanto una
+        búsqueda troceada termina sus tareas, se despacha el reajuste de su
+        mejor candidato con todos los datos.
+        
+        Con presupuestos de tiempo, las tareas que empiezan tras el plazo de su
+        modelo (o el global) se omiten. Las tareas de cada búsqueda troceada se
+        cortan antes, reservando el tiempo estimado de su reajuste, que también
+        tiene plazo: se quedan con el mejor candidato que completó todos sus
+        folds. Una búsqueda de sklearn solo se omite si no empieza a tiempo. Los
+        modelos sin ningún resultado se marcan como omitidos.
+        
+        Returns:
+            (modelos ajustados, (scores por fold, predicciones OOF) por modelo sin
+            búsqueda, errores por modelo, modelos cortados por tiempo)
+        """
+        self.scheduler = TrainingScheduler(n_jobs=self.n_jobs)
+        cv = self._cv()
+        
+        tasks, errors, ensemble_bases = [], {}, {}
+        y = self.y_train
+        for name, model in self.models.items():
+            try:
+                if is_split_search(model):
+                    tasks += [(name, task_id, func, args) for task_id, func, args in model.plan(self.X_train, y)]
+                elif is_search(model):
+                    # La búsqueda completa es una sola tarea: sin paralelismo interno
+                    model.set_params(n_jobs=1)
+                    tasks.append((name, 'search', fit_estimator, (model, self.X_train, y)))
+                elif isinstance(model, _OOFEnsemble):
+                    # Los estimadores base con el mismo nombre se comparten entre ensembles
+                    for base_name, base in model.estimators:
+                        ensemble_bases.setdefault(f"base:{base_name}", base)
+                else:
+                    tasks += self._fold_tasks(name, model, y, cv)
+            except Exception as e:
+                errors[name] = e
+        for base_name, base in ensemble_bases.items():
+            tasks += self._fold_tasks(base_name, base, self.y_train, cv)
+        
+        # Las tareas más largas (búsquedas completas) primero, para equilibrar la carga
+        tasks.sort(key=lambda task: task[1] != 'search')
+        deadlines, budgets = self._time_limits(ensemble_bases)
+        
+        fitted, folds, timed_out = {}, {}, set()
+        # Segundos reservados al final del plazo de cada búsqueda para su reajuste
+        reserves = {}
+        outstanding = Counter(name for name, _, _, _ in tasks)
+        n_train = len(self.y_train)
+        
+        def on_result(name, task_id, result, error):
+            """Registrar un resultado y devolver las tareas de seguimiento de su búsqueda"""
+            model = self.models.get(name)
+            outstanding[name] -= 1
+            if isinstance(error, DeadlineExceeded):
+                timed_out.add(name)
+                if task_id == REFIT_TASK:
+                    errors[name] = DeadlineExceeded(f"el reajuste del mejor candidato no empezó antes del plazo ({error})")
+            elif error is not None:
+                errors.setdefault(name, error)
+            elif task_id == REFIT_TASK:
+                fitted[name] = model.set_best_estimator(result)
+            elif is_split_search(model):
+                model.collect(task_id, result)
+                reserves[name] = model.refit_time_estimate(n_train)
+            elif task_id == 'search':
+                # La búsqueda se ajustó en un worker: guardar la copia ajustada (cv_results_)
+                fitted[name] = self.models[name] = result
+            elif task_id == 'fit':
+                fitted[name] = result
+            else:
+                folds.setdefault(name, []).append(result)
+            
+            if not is_split_search(model) or outstanding[name] or task_id == REFIT_TASK or name in errors:
+                return []
+            # Búsqueda troceada sin tareas en curso: reajuste del mejor candidato
+            try:
+                model.select_best()
+            except ValueError as e:
+                errors[name] = DeadlineExceeded(str(e)) if name in timed_out else e
+                return []
+            outstanding[name] += 1
+            return [(name, REFIT_TASK, fit_estimator, (model.best_candidate(), self.X_train, self.y_train))]
+        
+        self.scheduler.run(tasks, deadlines, budgets, reserves, on_result)
+        
+        # Evaluación OOF: sin reentrenar, a partir de las predicciones de cada fold
+        evaluations = {}
+        n_samples = len(self.y_train)
+        for name, model in self.models.items():
+            if name in errors or is_search(model):
+                if is_search(model) and name not in fitted:
+                    errors.setdefault(name, DeadlineExceeded("la búsqueda no empezó antes del plazo"))
+                continue
+            try:
+                if isinstance(model, _OOFEnsemble):
+                    bases = [f"base:{base_name}" for base_name, _ in model.estimators]
+                    failed = [base for base in bases if base in errors]
+                    if failed:
+                        raise RuntimeError(f"falló el estimador base '{failed[0]}': {errors[failed[0]]}")
+                    if any(base in timed_out for base in bases):
+                        # El stacking necesita las predicciones OOF de todos los folds
+                        timed_out.add(name)
+                        raise DeadlineExceeded("los estimadores base no completaron sus folds antes del plazo")
+                    fitted[name] = model.set_fitted(
+                        {base[5:]: fitted[base] for base in bases},
+                        {base[5:]: assemble_oof(folds[base], n_samples) for base in bases},
+                        self.y_train
+                    )
+                    oof_pred = fitted[name].oof_predictions(self.y_train, cv)
+                    evaluations[name] = (fold_scores_from_oof(oof_pred, self.y_train, cv), oof_pred)
+                else:
+                    if name not in fitted:
+                        raise DeadlineExceeded("el ajuste final no empezó antes del plazo")
+                    model_folds = folds.get(name, [])
+                    scores = [result['score'] for result in model_folds]
+                    # Con folds omitidos por tiempo, el CV usa solo los completados y no hay OOF
+                    oof_pred = (assemble_oof(model_folds, n_samples, key='pred')
+                                if len(model_folds) == self.cv_splits else None)
+                    evaluations[name] = (scores, oof_pred)
+            except Exception as e:
+                errors[name] = e
+        
+        self.timeline = self.scheduler.print_timeline()
+        return fitted, evaluations, errors, timed_out
+    
+    def _print_status_summary(self):
+        """Resumen de modelos completados, cortados por tiempo, omitidos o con error"""
+        print("\n" + "=" * 80)
+        print("ESTADO DE LOS MODELOS")
+        print("=" * 80)
+        if self.time_budget or self.model_time_budget or self.model_time_budgets:
+            print(f"Presupuesto global: {self.time_budget or '-'}s, por modelo: {self.model_time_budget or '-'}s"
+                  + (f", específicos: {self.model_time_budgets}" if self.model_time_budgets else ""))
+        icons = {'completed': '✓', 'truncated': '⏱️ ', 'skipped': '⏱️ ', 'error': '❌'}
+        for name, status in self.model_status.items():
+            detail = f" - {status['detail']}" if status['detail'] else ""
+            print(f"   {icons[status['status']]} {name:<24} {status['status']}{detail}")
+    
+    def _work_time(self, name):
+        """Segundos de trabajo de un modelo (los ensembles OOF suman los de sus estimadores base)"""
+        model = self.models[name]
+        if isinstance(model, _OOFEnsemble):
+            return sum(self.scheduler.model_times(f"base:{base_name}") for base_name, _ in model.estimators)
+        return self.scheduler.model_times(name)
+    
     def train_and_evaluate(self):
-        """Entrenar y evaluar todos los modelos (con optimización automática para GridSearchCV)"""
+        """Entrenar y evaluar todos los modelos (con optimización automática para las búsquedas)"""
         print("\n" + "=" * 80)
         print("ENTRENANDO Y EVALUANDO MODELOS CON OPTIMIZACIÓN")
         print("=" * 80)
         
-        for name, model in self.models.items():
+        fitted, evaluations, errors, timed_out = self._fit_all_models()
+        
+        for name in self.models:
             print(f"\n{'─' * 80}")
-            print(f"Entrenando: {name}")
+            print(f"Evaluando: {name}")
             print(f"{'─' * 80}")
             
-            try:
-                # Verificar si es un GridSearchCV
-                is_grid_search = hasattr(model, 'best_estimator_')
-                
-                # Ajustar etiquetas para XGBoost (requiere clases 0-indexed)
-                if 'XGBoost' in name:
-                    y_train_adjusted = self.y_train - 1
-                    y_test_adjusted = self.y_test - 1
+            if name in errors:
+                if isinstance(errors[name], DeadlineExceeded):
+                    self.model_status[name] = {'status': 'skipped', 'detail': f"presupuesto de tiempo agotado: {errors[name]}"}
+                    print(f"⏱️  {name} omitido: presupuesto de tiempo agotado ({errors[name]})")
                 else:
-                    y_train_adjusted = self.y_train
-                    y_test_adjusted = self.y_test
+                    self.model_status[name] = {'status': 'error', 'detail': f"{type(errors[name]).__name__}: {errors[name]}"}
+                    print(f"❌ Error entrenando {name}: {str(errors[name])}")
+                continue
+            
+            try:
+                model = fitted[name]
+                fit_time = self._work_time(name)
                 
-                # Entrenar modelo (GridSearchCV hará la optimización automáticamente)
-                model.fit(self.X_train, y_train_adjusted)
+                # Verificar si es una búsqueda de hiperparámetros
+                is_grid_search = is_search(model)
                 
-                # Si es GridSearchCV, usar el mejor estimador encontrado
-                if isinstance(model, GridSearchCV):
-                    print(f"\n🎯 Mejores hiperparámetros encontrados:")
+                # Si es una búsqueda, usar el mejor estimador encontrado
+                if is_grid_search:
+                    print(f"\n🎯 Mejores hiperparámetros encontrados ({self._strategy_for(name)}, "
+                          f"{count_candidates(model)} candidatos, {fit_time:.1f}s):")
                     for param, value in model.best_params_.items():
                         print(f"   {param}: {value}")
                     print(f"   Mejor CV Score: {model.best_score_:.4f}")
+                    if hasattr(model, 'n_cached_'):
+                        print(f"   Caché de folds: {model.n_cached_} reutilizados, {model.n_fitted_} ajustados")
                     best_model = model.best_estimator_
                 else:
                     best_model = model
@@ -332,11 +837,6 @@ class FetalHealthModelTrainer:
                 y_pred_train = best_model.predict(self.X_train)
                 y_pred_test = best_model.predict(self.X_test)
                 
-                # Ajustar predicciones de XGBoost (convertir de 0-indexed a 1-indexed)
-                if 'XGBoost' in name:
-                    y_pred_train = y_pred_train + 1
-                    y_pred_test = y_pred_test + 1
-                
                 # Predicciones de probabilidad (si están disponibles)
                 try:
                     y_pred_proba = best_model.predict_proba(self.X_test)
@@ -350,24 +850,23 @@ class FetalHealthModelTrainer:
                 recall = recall_score(self.y_test, y_pred_test, average='weighted', zero_division=0)
                 f1 = f1_score(self.y_test, y_pred_test, average='weighted', zero_division=0)
                 
-                # Cross-validation (usar el modelo optimizado si es GridSearchCV)
-                cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=self.random_state)
-                if isinstance(model, GridSearchCV):
-                    # Para GridSearchCV, usar el best_score_ directamente
+                # Cross-validation (usar el modelo optimizado si es una búsqueda)
+                cv_f1 = None
+                if is_grid_search:
+                    # Para las búsquedas, usar el best_score_ directamente
                     cv_mean = model.best_score_
                     cv_std = model.cv_results_['std_test_score'][model.best_index_]
                 else:
-                    # Para XGBoost usar etiquetas ajustadas
-                    if 'XGBoost' in name:
-                        cv_scores = cross_val_score(best_model, self.X_train, y_train_adjusted, cv=cv, scoring='accuracy')
-                    else:
-                        cv_scores = cross_val_score(best_model, self.X_train, self.y_train, cv=cv, scoring='accuracy')
-                    cv_mean = cv_scores.mean()
-                    cv_std = cv_scores.std()
+                    # Folds y predicciones OOF calculados por el planificador (sin reentrenar)
+                    fold_scores, oof_pred = evaluations[name]
+                    cv_mean = np.mean(fold_scores) if fold_scores else np.nan
+                    cv_std = np.std(fold_scores) if fold_scores else np.nan
+                    if oof_pred is not None:
+                        cv_f1 = f1_score(self.y_train, oof_pred, average='weighted', zero_division=0)
                 
-                # Guardar resultados (guardar best_estimator para GridSearchCV)
+                # Guardar resultados (guardar best_estimator para las búsquedas)
                 result_data = {
-                    'model': best_model,  # Guardar el mejor modelo, no el GridSearchCV
+                    'model': best_model,  # Guardar el mejor modelo, no la búsqueda
                     'train_accuracy': train_accuracy,
                     'test_accuracy': test_accuracy,
                     'precision': precision,
@@ -375,19 +874,41 @@ class FetalHealthModelTrainer:
                     'f1_score': f1,
                     'cv_mean': cv_mean,
                     'cv_std': cv_std,
+                    'cv_f1': cv_f1,
                     'y_pred': y_pred_test,
                     'y_pred_proba': y_pred_proba,
                     'confusion_matrix': confusion_matrix(self.y_test, y_pred_test),
-                    'classification_report': classification_report(self.y_test, y_pred_test, zero_division=0)
+                    'classification_report': classification_report(self.y_test, y_pred_test, zero_division=0),
+                    'fit_time': fit_time
                 }
                 
-                # Agregar hiperparámetros optimizados si es GridSearchCV
-                if isinstance(model, GridSearchCV):
+                # Agregar hiperparámetros optimizados si es una búsqueda
+                if is_grid_search:
                     result_data['best_params'] = model.best_params_
                     result_data['grid_search_cv_score'] = model.best_score_
+                    result_data['search_strategy'] = self._strategy_for(name)
+                    result_data['n_candidates'] = count_candidates(model)
+                    if hasattr(model, 'n_cached_'):
+                        result_data['cached_folds'] = model.n_cached_
+                        result_data['fitted_folds'] = model.n_fitted_
                 
                 self.results[name] = result_data
                 
+                # Estado frente al presupuesto de tiempo: 'truncated' solo si hay un resultado parcial
+                detail = None
+                if is_grid_search and getattr(model, 'truncated_', False):
+                    detail = (f"búsqueda cortada por tiempo: {count_candidates(model)} de "
+                              f"{len(model.candidates_)} candidatos evaluados")
+                    result_data['n_candidates_planned'] = len(model.candidates_)
+                elif not is_grid_search and name in timed_out:
+                    detail = (f"validación cruzada cortada por tiempo: {len(evaluations[name][0])} "
+                              f"de {self.cv_splits} folds")
+                if detail is not None:
+                    self.model_status[name] = {'status': 'truncated', 'detail': detail}
+                    print(f"⏱️  {detail}")
+                else:
+                    self.model_status[name] = {'status': 'completed', 'detail': ''}
+                
                 # Imprimir resultados
                 print(f"✓ Train Accuracy: {train_accuracy:.4f}")
                 print(f"✓ Test Accuracy:  {test_accuracy:.4f}")
@@ -395,19 +916,308 @@ class FetalHealthModelTrainer:
                 print(f"✓ Recall:         {recall:.4f}")
                 print(f"✓ F1-Score:       {f1:.4f}")
                 print(f"✓ CV Score:       {cv_mean:.4f} (+/- {cv_std:.4f})")
+                if cv_f1 is not None:
+                    print(f"✓ CV F1 (OOF):    {cv_f1:.4f}")
                 
             except Exception as e:
-                print(f"❌ Error entrenando {name}: {str(e)}")
+                self.model_status[name] = {'status': 'error', 'detail': f"{type(e).__name__}: {e}"}
+                print(f"❌ Error evaluando {name}: {str(e)}")
                 continue
         
+        self._print_status_summary()
+        
+        if self.fit_cache is not None:
+            removed = self.fit_cache.evict()
+            stats = self.fit_cache.stats()
+            print(f"\n✓ Caché de folds: {stats['hits']} aciertos, {stats['misses']} fallos"
+                  + (f", {removed} entradas expulsadas" if removed else ""))
+        
         return self.results
     
+    def compare_search_strategies(self, model_names=None, strategies=SEARCH_STRATEGIES):
+        """
+        Comparar estrategias de búsqueda sobre los mismos modelos
+        
+        Ajusta cada modelo con cada estrategia y registra el tiempo de pared,
+        los candidatos evaluados, el mejor score de CV y la accuracy en test,
+        para elegir la estrategia más barata que iguale la precisión.
+        
+        Args:
+            model_names: Modelos con búsqueda a comparar (por defecto todos)
+            strategies: Estrategias a probar
+        Returns:
+            DataFrame con una fila por (modelo, estrategia)
+        """
+        print("\n" + "=" * 80)
+        print("COMPARANDO ESTRATEGIAS DE BÚSQUEDA")
+        print("=" * 80)
+        
+        rows = []
+        for name in model_names or list(self.search_spaces):
+            estimator, param_grid, cv = self.search_spaces[name]
+            estimator, param_grid = self._wrap(estimator, param_grid)
+            for strategy in strategies:
+                search = build_search(
+                    estimator, param_grid, strategy=strategy, cv=cv, scoring='accuracy',
+                    n_jobs=-1, n_iter=self.search_budget, random_state=self.random_state, verbose=0
+                )
+                start = time.perf_counter()
+                search.fit(self.X_train, self.y_train)
+                wall_time = time.perf_counter() - start
+                test_accuracy = accuracy_score(self.y_test, search.best_estimator_.predict(self.X_test))
+                rows.append({
+                    'Model': name,
+                    'Strategy': strategy,
+                    'Candidates': count_candidates(search),
+                    'Wall Time (s)': round(wall_time, 2),
+                    'Best CV Score': search.best_score_,
+                    'Test Acc': test_accuracy
+                })
+                print(f"   {name:<20} {strategy:<15} {wall_time:>7.1f}s  "
+                      f"CV={search.best_score_:.4f}  Test={test_accuracy:.4f}")
+        
+        df_strategies = pd.DataFrame(rows)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        strategies_path = self.reports_dir / f"search_strategies_{timestamp}.csv"
+        df_strategies.to_csv(strategies_path, index=False)
+        print(f"\n✓ Comparación de estrategias guardada en: {strategies_path}")
+        
+        return df_strategies
+    
+    def compare_pipeline_mode(self, model_names=None):
+        """
+        Comparar el preprocesado previo con el modo pipeline
+        
+        Para cada modelo con búsqueda ajusta la misma búsqueda de tres formas:
+        escalado y SMOTE aplicados una vez antes de la validación cruzada (los
+        folds de validación contienen muestras sintéticas), dentro de cada fold
+        sin caché (se repiten por candidato) y dentro de cada fold con la caché
+        del pipeline (una vez por fold, compartidos por todos los candidatos).
+        
+        Args:
+            model_names: Modelos con búsqueda a comparar (por defecto todos)
+        Returns:
+            DataFrame con una fila por (modelo, modo)
+        """
+        print("\n" + "=" * 80)
+        print("COMPARANDO PREPROCESADO PREVIO VS. MODO PIPELINE")
+        print("=" * 80)
+        
+        # Preprocesado previo sobre los mismos datos de train
+        scaler = StandardScaler()
+        X_upfront = scaler.fit_transform(self.X_train_raw)
+        X_test_upfront = scaler.transform(self.X_test_raw)
+        y_upfront = self.y_train_raw
+        if self.apply_smote:
+            X_upfront, y_upfront = SMOTE(random_state=self.random_state).fit_resample(X_upfront, y_upfront)
+        
+        rows = []
+        for name in model_names or list(self.search_spaces):
+            estimator, param_grid, cv = self.search_spaces[name]
+            prefixed_grid = {f"model__{key}": values for key, values in param_grid.items()}
+            modes = [
+                ('upfront', estimator, param_grid, X_upfront, y_upfront, X_test_upfront),
+                ('pipeline', self._make_pipeline(estimator, memory=False), prefixed_grid,
+                 self.X_train_raw, self.y_train_raw, self.X_test_raw),
+                ('pipeline+memory', self._make_pipeline(estimator), prefixed_grid,
+                 self.X_train_raw, self.y_train_raw, self.X_test_raw),
+            ]
+            for mode, mode_estimator, mode_grid, X, y, X_test in modes:
+                if mode == 'pipeline+memory':
+                    self._reset_pipeline_cache()
+                search = build_search(
+                    mode_estimator, mode_grid, strategy=self._strategy_for(name), cv=cv,
+                    scoring='accuracy', n_jobs=self.n_jobs, n_iter=self.search_budget,
+                    random_state=self.random_state, verbose=0
+                )
+                start = time.perf_counter()
+                search.fit(X, y)
+                wall_time = time.perf_counter() - start
+                test_accuracy = accuracy_score(self.y_test, search.best_estimator_.predict(X_test))
+                rows.append({
+                    'Model': name,
+                    'Mode': mode,
+                    'Train Samples': len(y),
+                    'Wall Time (s)': round(wall_time, 2),
+                    'Best CV Score': search.best_score_,
+                    'Test Acc': test_accuracy
+                })
+                print(f"   {name:<20} {mode:<16} {wall_time:>7.1f}s  "
+                      f"CV={search.best_score_:.4f}  Test={test_accuracy:.4f}")
+        
+        # No dejar la caché con entradas de la comparación
+        if self.pipeline_mode:
+            self._reset_pipeline_cache()
+        
+        df_pipeline = pd.DataFrame(rows)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        pipeline_path = self.reports_dir / f"pipeline_comparison_{timestamp}.csv"
+        df_pipeline.to_csv(pipeline_path, index=False)
+        print(f"\n✓ Comparación de preprocesado guardada en: {pipeline_path}")
+        print("   Nota: en modo 'upfront' los folds de validación incluyen muestras sintéticas de SMOTE,")
+        print("   por lo que su CV Score es optimista; los modos pipeline validan solo con datos reales")
+        
+        return df_pipeline
+    
+    def compare_boosting(self, repeats=3):
+        """
+        Comparar el Gradient Boosting exacto con los boosting de histogramas
+        
+        Ajusta con todos los datos de train el GB actual (150 árboles, el máximo
+        de su rejilla), HistGradientBoostingClassifier y XGBoost (hist) con
+        parada temprana, usando todos los hilos disponibles, y registra la mediana
+        del tiempo de ajuste, las iteraciones usadas y la accuracy en test.
+        
+        Args:
+            repeats: Ajustes por modelo (se informa la mediana)
+        Returns:
+            DataFrame con una fila por modelo
+        """
+        print("\n" + "=" * 80)
+        print("COMPARANDO GRADIENT BOOSTING EXACTO VS. HISTOGRAMAS")
+        print("=" * 80)
+        
+        candidates = {
+            'Gradient Boosting': GradientBoostingClassifier(
+                n_estimators=150, learning_rate=0.1, max_depth=3, random_state=self.random_state
+            ),
+            'Hist Gradient Boosting': HistGradientBoostingClassifier(
+                max_iter=500, learning_rate=0.1, early_stopping=True, validation_fraction=0.1,
+                n_iter_no_change=20, random_state=self.random_state
+            ),
+            'XGBoost': LabelEncodedXGBClassifier(
+                n_estimators=500, learning_rate=0.1, max_depth=6, early_stopping_rounds=20,
+                validation_fraction=0.1, random_state=self.random_state
+            ),
+        }
+        
+        rows = []
+        for name, estimator in candidates.items():
+            times = []
+            for _ in range(repeats):
+                model = self._wrap(clone(estimator))
+                start = time.perf_counter()
+                model.fit(self.X_train, self.y_train)
+                times.append(time.perf_counter() - start)
+            final = model.named_steps['model'] if isinstance(model, Pipeline) else model
+            test_accuracy = accuracy_score(self.y_test, model.predict(self.X_test))
+            rows.append({
+                'Model': name,
+                'Fit Time (s)': round(float(np.median(times)), 3),
+                'Iterations': int(getattr(final, 'n_iter_', getattr(final, 'n_estimators_', 0))),
+                'Test Acc': test_accuracy
+            })
+            print(f"   {name:<24} {np.median(times):>7.2f}s  iteraciones={rows[-1]['Iterations']:<4} "
+                  f"Test={test_accuracy:.4f}")
+        
+        df_boosting = pd.DataFrame(rows)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        boosting_path = self.reports_dir / f"boosting_comparison_{timestamp}.csv"
+        df_boosting.to_csv(boosting_path, index=False)
+        print(f"\n✓ Comparación de boosting guardada en: {boosting_path}")
+        
+        return df_boosting
+    
+    def compare_feature_selection(self, repeats=200):
+        """
+        Comparar accuracy y latencia con todas las variables frente al subconjunto seleccionado
+        
+        Ajusta Regresión Logística, Random Forest e HistGradientBoosting con el
+        preprocesado del entrenamiento (StandardScaler y SMOTE si está activo)
+        sobre ambos conjuntos de variables, y mide en test la accuracy, el F1,
+        el tiempo de ajuste, la latencia de una fila (escalado + predict_proba,
+        como en /predict) y la de todo el test en una llamada. Si el experimento
+        no activa la selección, se aplica con las opciones por defecto solo
+        para esta comparación.
+        
+        Args:
+            repeats: Predicciones de una fila cronometradas (se informa la mediana)
+        Returns:
+            DataFrame con una fila por modelo y conjunto de variables
+        """
+        print("\n" + "=" * 80)
+        print("COMPARANDO TODAS LAS VARIABLES VS. SUBCONJUNTO SELECCIONADO")
+        print("=" * 80)
+        
+        if self.feature_selection_result is not None:
+            selection = self.feature_selection_result
+        else:
+            selection = select_features(
+                self.X_train_all, self.y_train_raw, FEATURE_SELECTION_OPTIONS, self.random_state, self.n_jobs
+            )
+        variants = {
+            'all': self.X_train_all.columns.tolist(),
+            'selected': selection['selected']
+        }
+        print(f"\n✓ Subconjunto: {len(selection['selected'])} de {len(variants['all'])} variables "
+              f"(descartadas: {', '.join(selection['dropped']) or 'ninguna'})")
+        
+        candidates = {
+            'Logistic Regression': LogisticRegression(max_iter=1000, random_state=self.random_state),
+            'Random Forest': RandomForestClassifier(n_estimators=100, random_state=self.random_state),
+            'Hist Gradient Boosting': HistGradientBoostingClassifier(random_state=self.random_state),
+        }
+        
+        rows = []
+        for name, estimator in candidates.items():
+            for variant, features in variants.items():
+                X_train = self.X_train_all[features]
+                X_test = self.X_test_all[features]
+                scaler = StandardScaler().fit(X_train)
+                X_fit, y_fit = scaler.transform(X_train), self.y_train_raw
+                if self.apply_smote:
+                    X_fit, y_fit = SMOTE(random_state=self.random_state).fit_resample(X_fit, y_fit)
+                
+                model = clone(estimator)
+                start = time.perf_counter()
+                model.fit(X_fit, y_fit)
+                fit_time = time.perf_counter() - start
+                
+                # Una fila cada vez, escalada con las estadísticas del scaler como en el backend
+                X_rows = X_test.to_numpy(dtype=np.float64)
+                row_times = []
+                for i in range(repeats):
+                    row = X_rows[i % len(X_rows)].reshape(1, -1)
+                    start = time.perf_counter()
+                    model.predict_proba((row - scaler.mean_) / scaler.scale_)
+                    row_times.append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                y_pred = model.predict(scaler.transform(X_test))
+                batch_time = time.perf_counter() - start
+                
+                rows.append({
+                    'Model': name,
+                    'Features': variant,
+                    'N Features': len(features),
+                    'Test Acc': accuracy_score(self.y_test, y_pred),
+                    'F1-Score': f1_score(self.y_test, y_pred, average='weighted'),
+                    'Fit Time (s)': round(fit_time, 3),
+                    'Row Latency (ms)': round(float(np.median(row_times)) * 1000, 3),
+                    'Batch Latency (ms)': round(batch_time * 1000, 3)
+                })
+                print(f"   {name:<24} {variant:<9} {len(features):>2} variables  "
+                      f"Test={rows[-1]['Test Acc']:.4f}  F1={rows[-1]['F1-Score']:.4f}  "
+                      f"ajuste={fit_time:.2f}s  fila={rows[-1]['Row Latency (ms)']:.3f}ms  "
+                      f"test={rows[-1]['Batch Latency (ms)']:.1f}ms")
+        
+        df_selection = pd.DataFrame(rows)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        selection_path = self.reports_dir / f"feature_selection_comparison_{timestamp}.csv"
+        df_selection.to_csv(selection_path, index=False)
+        print(f"\n✓ Comparación de selección de variables guardada en: {selection_path}")
+        
+        return df_selection
+    
     def get_best_model(self):
         """Obtener el mejor modelo basado en test accuracy"""
         print("\n" + "=" * 80)
         print("SELECCIONANDO MEJOR MODELO")
         print("=" * 80)
         
+        if not self.results:
+            raise RuntimeError("Ningún modelo completó el entrenamiento (revisa el presupuesto de tiempo y los errores)")
+        
         # Crear tabla de comparación
         comparison = []
         for name, result in self.results.items():
@@ -433,19 +1243,66 @@ class FetalHealthModelTrainer:
         self.best_model_name = best_model_name
         self.best_model = self.results[best_model_name]['model']
         
+        # En modo pipeline se sirve el modelo final con el scaler ajustado en el
+        # pipeline: el backend escala las entradas por separado y SMOTE solo
+        # actúa durante el entrenamiento
+        if isinstance(self.best_model, Pipeline):
+            self.scaler = self.best_model.named_steps['scaler']
+            self.best_model = self.best_model.named_steps['model']
+        elif isinstance(self.best_model, _OOFEnsemble) and isinstance(self.best_model.estimators_[0], Pipeline):
+            # Todos los estimadores base ajustaron su scaler con los mismos datos
+            self.scaler = self.best_model.estimators_[0].named_steps['scaler']
+            self.best_model = self.best_model.with_estimators(
+                [base.named_steps['model'] for base in self.best_model.estimators_]
+            )
+        
         print(f"\n🏆 MEJOR MODELO: {best_model_name}")
         print(f"   Test Accuracy: {df_comparison.iloc[0]['Test Acc']:.4f}")
         print(f"   F1-Score: {df_comparison.iloc[0]['F1-Score']:.4f}")
         
         return self.best_model, self.best_model_name, df_comparison
     
+    def export_compiled_model(self):
+        """
+        Aplanar el mejor modelo (si es un ensemble de árboles) en el motor compilado
+        
+        Verifica la paridad de probabilidades con sklearn sobre el test set; si
+        el modelo no está soportado o la paridad falla, el backend sigue
+        sirviendo el modelo de sklearn.
+        """
+        print("\n" + "=" * 80)
+        print("EXPORTANDO MOTOR DE INFERENCIA COMPILADO")
+        print("=" * 80)
+        
+        self.compiled_model = None
+        self.compiled_parity = None
+        
+        compiled = compile_tree_ensemble(self.best_model)
+        if compiled is None:
+            print(f"\n⚠️  {type(self.best_model).__name__} no soportado por el motor compilado")
+            return None
+        
+        try:
+            # Test set escalado igual que en el backend
+            X_test = self.scaler.transform(self.X_test_raw)
+            self.compiled_parity = check_parity(compiled, self.best_model, X_test)
+        except AssertionError as e:
+            print(f"\n❌ {e}")
+            return None
+        
+        self.compiled_model = compiled
+        print(f"\n✓ {compiled.n_trees} árboles aplanados ({len(compiled.feature)} nodos, profundidad máx. {compiled.max_depth})")
+        print(f"✓ Paridad con sklearn en test: diferencia máxima {self.compiled_parity:.2e}")
+        
+        return self.compiled_model
+    
     def save_results(self):
         """Guardar modelo y reportes"""
         print("\n" + "=" * 80)
         print("GUARDANDO RESULTADOS")
         print("=" * 80)
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = self.run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Guardar mejor modelo
         model_path = self.models_dir / "fetal_health_model.pkl"
@@ -453,7 +1310,16 @@ class FetalHealthModelTrainer:
             'model': self.best_model,
             'scaler': self.scaler,
             'feature_names': self.feature_names,
-            'model_name': self.best_model_name
+            'model_name': self.best_model_name,
+            # Ruta de inferencia: el backend deriva la clase de predict_proba
+            # (una sola pasada) y solo usa predict si el modelo no la soporta
+            'inference_path': 'predict_proba' if hasattr(self.best_model, 'predict_proba') else 'predict',
+            # Motor compilado (None si el modelo no es un ensemble de árboles soportado)
+            'compiled_model': self.compiled_model,
+            'compiled_parity_max_diff': self.compiled_parity,
+            'preprocessing': self.preprocessing_config,
+            # Variables descartadas y motivo (None si se usan todas)
+            'feature_selection': self.feature_selection_result
         }
         
         # Agregar hiperparámetros optimizados si existen
@@ -463,7 +1329,14 @@ class FetalHealthModelTrainer:
         else:
             model_data['optimized'] = False
         
-        joblib.dump(model_data, model_path)
+        # Escritura atómica: el backend puede recargar el modelo en caliente y
+        # nunca debe leer un archivo a medio escribir
+        # Sin compresión: el backend carga el artefacto con mmap_mode='r' y los
+        # arrays grandes (nodos de los árboles, estadísticas del scaler) se
+        # comparten entre workers a través de la caché de páginas del SO
+        tmp_path = model_path.with_suffix('.pkl.tmp')
+        joblib.dump(model_data, tmp_path, compress=0)
+        os.replace(tmp_path, model_path)
         print(f"\n✓ Modelo guardado en: {model_path}")
         
         # Guardar scaler por separado
@@ -477,6 +1350,12 @@ class FetalHealthModelTrainer:
         df_comparison.to_csv(comparison_path, index=False)
         print(f"✓ Comparación guardada en: {comparison_path}")
         
+        # Guardar línea temporal del entrenamiento en paralelo
+        if self.timeline is not None:
+            timeline_path = self.reports_dir / f"training_timeline_{timestamp}.csv"
+            self.timeline.to_csv(timeline_path, index=False)
+            print(f"✓ Línea temporal guardada en: {timeline_path}")
+        
         # Guardar reporte detallado del mejor modelo
         report_path = self.reports_dir / f"best_model_report_{timestamp}.txt"
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -488,10 +1367,15 @@ class FetalHealthModelTrainer:
             
             f.write(f"Modelo: {self.best_model_name}\n")
             f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Variables: {len(self.feature_names)}\n")
+            if self.feature_selection_result is not None:
+                f.write(f"\nVARIABLES DESCARTADAS (selección de variables):\n")
+                for feature, reason in self.feature_selection_result['dropped'].items():
+                    f.write(f"  {feature}: {reason}\n")
             
             # Agregar hiperparámetros optimizados si existen
             if 'best_params' in result:
-                f.write(f"Optimizado: Sí (GridSearchCV)\n")
+                f.write(f"Optimizado: Sí (búsqueda '{result['search_strategy']}', {result['n_candidates']} candidatos)\n")
                 f.write(f"\nMEJORES HIPERPARÁMETROS:\n")
                 for param, value in result['best_params'].items():
                     f.write(f"  {param}: {value}\n")
@@ -529,55 +1413,305 @@ class FetalHealthModelTrainer:
                 'recall': float(result['recall']),
                 'f1_score': float(result['f1_score']),
                 'cv_mean': float(result['cv_mean']),
-                'cv_std': float(result['cv_std'])
+                'cv_std': float(result['cv_std']),
+                'fit_time_seconds': float(result['fit_time'])
             }
+            if result.get('cv_f1') is not None:
+                model_metrics['cv_f1_oof'] = float(result['cv_f1'])
+            status = self.model_status.get(name, {'status': 'completed', 'detail': ''})
+            model_metrics['status'] = status['status']
+            model_metrics['timed_out'] = status['status'] == 'truncated'
+            if status['detail']:
+                model_metrics['status_detail'] = status['detail']
+            if 'n_candidates_planned' in result:
+                model_metrics['n_candidates_planned'] = result['n_candidates_planned']
             
             # Agregar hiperparámetros optimizados si existen
             if 'best_params' in result:
                 model_metrics['best_params'] = result['best_params']
                 model_metrics['optimized'] = True
                 model_metrics['grid_search_cv_score'] = float(result.get('grid_search_cv_score', 0))
+                model_metrics['search_strategy'] = result['search_strategy']
+                model_metrics['n_candidates'] = result['n_candidates']
+                if 'cached_folds' in result:
+                    model_metrics['cached_folds'] = result['cached_folds']
+                    model_metrics['fitted_folds'] = result['fitted_folds']
             else:
                 model_metrics['optimized'] = False
             
             metrics[name] = model_metrics
         
+        # Modelos omitidos por tiempo o con error (sin métricas)
+        for name, status in self.model_status.items():
+            if name not in metrics:
+                metrics[name] = {
+                    'status': status['status'],
+                    'timed_out': status['status'] == 'skipped',
+                    'status_detail': status['detail']
+                }
+        
         with open(metrics_path, 'w', encoding='utf-8') as f:
             json.dump(metrics, f, indent=2)
         
         print(f"✓ Métricas JSON guardadas en: {metrics_path}")
         
         print("\n✓ Todos los resultados guardados exitosamente")
+    
+    def _task_timings(self):
+        """Tiempos de cada tarea del planificador, con los hiperparámetros de los candidatos"""
+        t0 = self.stage_timer.t0
+        tasks = []
+        for record in (self.scheduler.records if self.scheduler is not None else []):
+            task = {
+                'model': record['model'],
+                'task': record['task'],
+                'start': round(record['start'] - t0, 3),
+                'wall': round(record['end'] - record['start'], 3),
+                'cpu': round(record['cpu'], 3),
+                'rss_growth_mb': record['rss_growth_mb'],
+                'pid': record['pid'],
+                'skipped': record['skipped'],
+                'error': record['error']
+            }
+            model, task_id = self.models.get(record['model']), record['task_id']
+            if is_split_search(model) and isinstance(task_id, tuple):
+                task['params'] = model.task_params(task_id)
+            tasks.append(task)
+        return tasks
+    
+    def _model_timings(self, tasks):
+        """Tiempo, CPU y mayor crecimiento de RSS de una tarea por modelo y, en las búsquedas, por candidato"""
+        models = {}
+        for name, model in self.models.items():
+            owners = {name}
+            if isinstance(model, _OOFEnsemble):
+                owners = {f"base:{base_name}" for base_name, _ in model.estimators}
+            own = [task for task in tasks if task['model'] in owners]
+            executed = [task for task in own if not task['skipped']]
+            rss = [task['rss_growth_mb'] for task in executed if task['rss_growth_mb'] is not None]
+            entry = {
+                'status': self.model_status.get(name, {}).get('status'),
+                'tasks': len(executed),
+                'skipped_tasks': len(own) - len(executed),
+                'wall': round(sum(task['wall'] for task in executed), 3),
+                'cpu': round(sum(task['cpu'] for task in executed), 3),
+                'max_task_rss_growth_mb': max(rss) if rss else None
+            }
+            if is_search(model) and hasattr(model, 'cv_results_'):
+                cv_results = model.cv_results_
+                entry['candidates'] = [
+                    {
+                        'params': params,
+                        'mean_fit_time': round(float(cv_results['mean_fit_time'][i]), 4),
+                        'mean_test_score': round(float(cv_results['mean_test_score'][i]), 4)
+                    }
+                    for i, params in enumerate(cv_results['params'])
+                ]
+            models[name] = entry
+        return models
+    
+    def save_timings(self):
+        """
+        Guardar tiempos y memoria por etapa, modelo, tarea y candidato en timings_<timestamp>.json
+        
+        Las etapas incluyen el CPU del proceso principal y el de los workers
+        (suma de las tareas que empezaron durante la etapa). De cada tarea se
+        guarda cuánto subió la memoria de su worker sobre la que tenía al
+        empezarla (rss_growth_mb), no el pico acumulado del worker.
+        """
+        self.stage_timer.print_summary()
+        timestamp = self.run_timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        tasks = self._task_timings()
+        
+        stages = []
+        for stage in self.stage_timer.stages:
+            in_stage = [
+                task for task in tasks
+                if not task['skipped'] and stage['start'] <= task['start'] < stage['end']
+            ]
+            stages.append({**stage, 'worker_cpu': round(sum(task['cpu'] for task in in_stage), 3)})
+        
+        timings = {
+            'timestamp': timestamp,
+            'n_workers': self.scheduler.n_workers if self.scheduler is not None else None,
+            'total_wall': round(time.time() - self.stage_timer.t0, 3),
+            'stages': stages,
+            'models': self._model_timings(tasks),
+            'tasks': tasks
+        }
+        timings_path = self.reports_dir / f"timings_{timestamp}.json"
+        with open(timings_path, 'w', encoding='utf-8') as f:
+            # Los hiperparámetros pueden ser tipos de numpy
+            json.dump(timings, f, indent=2, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+        print(f"✓ Tiempos por etapa guardados en: {timings_path}")
+
+
+def parse_args():
+    """Argumentos de línea de comandos (los indicados sustituyen a los de --config)"""
+    parser = argparse.ArgumentParser(description="Entrenamiento de modelos de salud fetal")
+    parser.add_argument(
+        '--config',
+        help="Especificación del experimento (YAML/JSON) o perfil incluido: 'fast' o 'full'"
+    )
+    parser.add_argument(
+        '--search-strategy', choices=SEARCH_STRATEGIES,
+        help="Estrategia de búsqueda para todos los modelos ensemble (por defecto: grid)"
+    )
+    parser.add_argument(
+        '--search-budget', type=int,
+        help="Candidatos a evaluar en las estrategias aleatorias (por defecto: 20)"
+    )
+    parser.add_argument(
+        '--compare-search', action='store_true',
+        help="Comparar todas las estrategias de búsqueda y guardar el informe"
+    )
+    parser.add_argument(
+        '--no-fit-cache', action='store_true',
+        help="No reutilizar resultados por fold de ejecuciones anteriores"
+    )
+    parser.add_argument(
+        '--fit-cache-max-mb', type=float,
+        help="Tamaño máximo de la caché de folds en MB (por defecto: 256)"
+    )
+    parser.add_argument(
+        '--n-jobs', type=int,
+        help="Workers compartidos por todos los modelos (por defecto: -1, todas las CPUs)"
+    )
+    parser.add_argument(
+        '--pipeline', action='store_true',
+        help="Escalar y aplicar SMOTE dentro de cada fold (imblearn Pipeline con caché)"
+    )
+    parser.add_argument(
+        '--compare-pipeline', action='store_true',
+        help="Comparar tiempo y CV del preprocesado previo frente al modo pipeline"
+    )
+    parser.add_argument(
+        '--warm-start-sweep', action='store_true',
+        help="Evaluar n_estimators con un ajuste incremental por fold (warm_start / por etapas)"
+    )
+    parser.add_argument(
+        '--split-search', action='store_true',
+        help="Trocear las búsquedas grid/random en tareas (candidato, fold) en lugar de usar las de sklearn"
+    )
+    parser.add_argument(
+        '--time-budget', type=float,
+        help="Segundos máximos para entrenar todos los modelos (por defecto: sin límite)"
+    )
+    parser.add_argument(
+        '--model-time-budget', type=float,
+        help="Segundos máximos por modelo (por defecto: sin límite)"
+    )
+    parser.add_argument(
+        '--profile', choices=PROFILERS,
+        help="Perfilar el entrenamiento y guardar reports/profile_<timestamp>.prof (.html con pyinstrument)"
+    )
+    parser.add_argument(
+        '--compare-boosting', action='store_true',
+        help="Cronometrar Gradient Boosting frente a HistGradientBoosting y XGBoost (hist)"
+    )
+    parser.add_argument(
+        '--feature-selection', choices=('correlation',) + LOW_SIGNAL_METHODS,
+        help="Seleccionar variables: poda por correlación, más permutación o RFE para las de poca señal"
+    )
+    parser.add_argument(
+        '--n-features', type=int,
+        help="Variables a conservar con --feature-selection rfe"
+    )
+    parser.add_argument(
+        '--compare-feature-selection', action='store_true',
+        help="Comparar accuracy y latencia con todas las variables frente al subconjunto seleccionado"
+    )
+    return parser.parse_args()
+
+
+def apply_cli_overrides(spec, args):
+    """Aplicar sobre la especificación las opciones indicadas explícitamente en la CLI"""
+    training = spec['training']
+    if args.search_strategy is not None:
+        training['search_strategy'] = args.search_strategy
+        # La estrategia de la CLI se aplica a todos los modelos
+        for options in (spec['models'] or {}).values():
+            options.pop('strategy', None)
+    if args.search_budget is not None:
+        training['search_budget'] = args.search_budget
+    if args.fit_cache_max_mb is not None:
+        training['fit_cache_max_mb'] = args.fit_cache_max_mb
+    if args.n_jobs is not None:
+        training['n_jobs'] = args.n_jobs
+    if args.time_budget is not None:
+        training['time_budget'] = args.time_budget
+    if args.model_time_budget is not None:
+        training['model_time_budget'] = args.model_time_budget
+    if args.no_fit_cache:
+        training['fit_cache'] = False
+    if args.pipeline:
+        training['pipeline_mode'] = True
+    if args.warm_start_sweep:
+        training['warm_start_sweep'] = True
+    if args.split_search:
+        training['split_search'] = True
+    selection = spec['feature_selection']
+    if args.feature_selection is not None:
+        selection['enabled'] = True
+        selection['low_signal'] = None if args.feature_selection == 'correlation' else args.feature_selection
+    if args.n_features is not None:
+        selection['n_features'] = args.n_features
+    validate_options(selection)
+    return spec
 
 
 def main():
     """Función principal"""
+    args = parse_args()
+    spec = apply_cli_overrides(load_spec(args.config), args)
+    
     print("\n" + "=" * 80)
     print("ENTRENAMIENTO DE MODELOS - CLASIFICACIÓN DE SALUD FETAL")
     print("=" * 80)
     print("Ejecutándose en contenedor Docker")
+    print(f"Experimento: {spec['name']}")
     print("=" * 80)
     
-    # Configuración (rutas en el contenedor)
-    # Usar el dataset limpio generado por eda.py
-    data_path = "/app/data/processed/fetal_health_clean.csv"
-    
-    # Crear trainer
-    trainer = FetalHealthModelTrainer(data_path=data_path, random_state=42)
+    # Crear trainer (por defecto usa el dataset limpio generado por eda.py)
+    trainer = FetalHealthModelTrainer.from_spec(spec)
     
-    # Pipeline completo
-    trainer.load_and_explore_data()
-    trainer.preprocess_data(test_size=0.2, apply_smote=True)
-    trainer.initialize_models()
-    trainer.train_and_evaluate()
-    trainer.get_best_model()
-    trainer.save_results()
+    # Pipeline completo (cada etapa cronometrada)
+    stage = trainer.stage_timer.stage
+    profile_base = trainer.reports_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    with profile(args.profile, profile_base):
+        with stage('load_and_explore_data'):
+            trainer.load_and_explore_data()
+        with stage('preprocess_data'):
+            trainer.preprocess_data(test_size=spec['data']['test_size'], apply_smote=spec['data']['apply_smote'])
+        with stage('initialize_models'):
+            trainer.initialize_models()
+        if args.compare_search:
+            with stage('compare_search_strategies'):
+                trainer.compare_search_strategies()
+        if args.compare_pipeline:
+            with stage('compare_pipeline_mode'):
+                trainer.compare_pipeline_mode()
+        if args.compare_boosting:
+            with stage('compare_boosting'):
+                trainer.compare_boosting()
+        if args.compare_feature_selection:
+            with stage('compare_feature_selection'):
+                trainer.compare_feature_selection()
+        with stage('train_and_evaluate'):
+            trainer.train_and_evaluate()
+        with stage('get_best_model'):
+            trainer.get_best_model()
+        with stage('export_compiled_model'):
+            trainer.export_compiled_model()
+        with stage('save_results'):
+            trainer.save_results()
+    trainer.save_timings()
     
     print("\n" + "=" * 80)
     print("✅ ENTRENAMIENTO COMPLETADO EXITOSAMENTE")
     print("=" * 80)
-    print(f"Modelo guardado en: /app/models/fetal_health_model.pkl")
-    print(f"Reportes guardados en: /app/reports/")
+    print(f"Modelo guardado en: {trainer.models_dir / 'fetal_health_model.pkl'}")
+    print(f"Reportes guardados en: {trainer.reports_dir}/")
     print("=" * 80)
 
 
@@ -0,0 +1,266 @@
+"""
+Motor de inferencia compilado para ensembles de árboles
+
+Aplana los árboles del modelo ganador (Random Forest, Gradient Boosting,
+AdaBoost, Bagging de árboles o un único árbol de decisión) en arrays
+contiguos de feature/threshold/hijos/valores y recorre todos los árboles a la
+vez con operaciones vectorizadas de NumPy, evitando la sobrecarga por llamada
+de predict_proba de sklearn en entradas pequeñas.
+"""
+import numpy as np
+from scipy.special import expit, softmax
+
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import (
+    RandomForestClassifier,
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    AdaBoostClassifier,
+    BaggingClassifier
+)
+from sklearn.tree import DecisionTreeClassifier
+
+
+class CompiledTreeEnsemble:
+    """
+    Ensemble de árboles aplanado en arrays contiguos
+
+    Todos los nodos de todos los árboles comparten los arrays `feature`,
+    `threshold`, `left`, `right` y `value`; `roots` indica el nodo raíz de
+    cada árbol. Las hojas apuntan a sí mismas, de modo que basta con iterar
+    `max_depth` veces para que todas las muestras lleguen a su hoja.
+
+    Expone `classes_`, `predict_proba` y `predict` como un clasificador de
+    sklearn, por lo que el backend lo sirve sin cambios. Valida la entrada
+    igual que sklearn: infinitos siempre son un error y NaN solo se acepta en
+    los modelos que lo admiten (árboles, bosques y Bagging).
+    """
+
+    def __init__(self, kind, classes, trees, n_features, base=None, weight_sum=None):
+        """
+        Args:
+            kind: 'average', 'gradient_boosting' o 'adaboost' (cómo se agregan las hojas)
+            classes: Clases del modelo original (classes_)
+            trees: Lista de (tree_, valores_hoja, mapa_features); valores_hoja
+                tiene forma (n_nodos, n_salidas) y ya incluye pesos/escalas
+            n_features: Número de features de entrada
+            base: Predicción inicial (raw) para gradient boosting
+            weight_sum: Suma de pesos de los estimadores para AdaBoost
+        """
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = n_features
+        self.n_trees = len(trees)
+        self.base = base
+        self.weight_sum = weight_sum
+
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree, leaf_values, feature_map in trees:
+            n_nodes = tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            is_leaf = left == -1
+            own = np.arange(n_nodes)
+
+            feature = tree.feature.astype(np.int64)
+            feature = np.where(is_leaf, 0, feature)
+            if feature_map is not None:
+                feature = np.asarray(feature_map)[feature]
+
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own, left) + offset)
+            rights.append(np.where(is_leaf, own, right) + offset)
+            missing.append(_missing_go_to_left(tree, n_nodes))
+            values.append(leaf_values)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.int32)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=np.int32)
+        self.missing_left = np.ascontiguousarray(np.concatenate(missing), dtype=bool)
+        self.value = np.ascontiguousarray(np.vstack(values), dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+
+    @property
+    def allow_nan(self):
+        """GradientBoosting y AdaBoost rechazan NaN en sklearn (propiedad: vale para artefactos ya guardados)"""
+        return self.kind == 'average'
+
+    def _validate(self, X):
+        """
+        Comprobar la entrada como lo haría sklearn antes de recorrer los árboles
+
+        Raises:
+            ValueError si X no es 2D, no tiene n_features_in_ columnas o
+            contiene valores no finitos que el modelo original rechaza
+        """
+        # Igual que sklearn: los árboles comparan sobre X en float32, y un valor
+        # fuera de su rango se desborda a infinito
+        with np.errstate(over='ignore'):
+            X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Se esperaba un array 2D, recibido {X.ndim}D")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X tiene {X.shape[1]} features, el modelo espera {self.n_features_in_}")
+        if np.isinf(X).any():
+            raise ValueError("La entrada contiene infinitos o valores demasiado grandes para float32")
+        if not self.allow_nan and np.isnan(X).any():
+            raise ValueError("La entrada contiene NaN y el modelo no admite valores faltantes")
+        return X
+
+    def apply(self, X):
+        """Índice global de la hoja alcanzada en cada árbol, forma (n_muestras, n_árboles)"""
+        X = self._validate(X)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _aggregate(self, X):
+        return self.value[self.apply(X)].sum(axis=1)
+
+    def predict_proba(self, X):
+        """Probabilidades por clase, en el orden de classes_"""
+        agg = self._aggregate(X)
+
+        if self.kind == 'average':
+            return agg / self.n_trees
+
+        if self.kind == 'gradient_boosting':
+            raw = agg + self.base
+            if raw.shape[1] == 1:
+                p = expit(raw[:, 0])
+                return np.column_stack([1 - p, p])
+            return softmax(raw, axis=1)
+
+        # AdaBoost (SAMME): agg es la suma de pesos de los estimadores que votan cada clase
+        k = self.n_classes_
+        decision = (agg * k / (k - 1) - self.weight_sum / (k - 1)) / self.weight_sum
+        if k == 2:
+            decision[:, 0] *= -1
+            d = decision.sum(axis=1)
+            decision = np.column_stack([-d, d]) / 2
+        else:
+            decision /= k - 1
+        return softmax(decision, axis=1)
+
+    def predict(self, X):
+        """Clase con mayor probabilidad"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _missing_go_to_left(tree, n_nodes):
+    """Dirección de los valores faltantes por nodo (sklearn >= 1.3)"""
+    nodes = tree.__getstate__()['nodes']
+    if 'missing_go_to_left' in nodes.dtype.names:
+        return nodes['missing_go_to_left'].astype(bool)
+    return np.zeros(n_nodes, dtype=bool)
+
+
+def _class_proba_leaves(tree, classes, n_classes):
+    """Valores de hoja normalizados a probabilidades, alineados con las clases del ensemble"""
+    value = tree.value[:, 0, :]
+    proba = value / value.sum(axis=1, keepdims=True)
+    leaves = np.zeros((tree.node_count, n_classes))
+    # Un estimador puede no haber visto todas las clases (p. ej. en Bagging)
+    leaves[:, np.asarray(classes, dtype=np.int64)] = proba
+    return leaves
+
+
+def compile_tree_ensemble(model):
+    """
+    Aplanar un ensemble de árboles de sklearn en un CompiledTreeEnsemble
+
+    Args:
+        model: Modelo entrenado (el mejor estimador, no el GridSearchCV)
+    Returns:
+        CompiledTreeEnsemble, o None si el tipo de modelo no está soportado
+    """
+    n_features = model.n_features_in_
+
+    if isinstance(model, DecisionTreeClassifier):
+        trees = [(model.tree_, _class_proba_leaves(model.tree_, np.arange(model.n_classes_), model.n_classes_), None)]
+        return CompiledTreeEnsemble('average', model.classes_, trees, n_features)
+
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+        n_classes = len(model.classes_)
+        trees = [
+            (est.tree_, _class_proba_leaves(est.tree_, est.classes_, n_classes), None)
+            for est in model.estimators_
+        ]
+        return CompiledTreeEnsemble('average', model.classes_, trees, n_features)
+
+    if isinstance(model, BaggingClassifier):
+        if not all(isinstance(est, DecisionTreeClassifier) for est in model.estimators_):
+            return None
+        n_classes = len(model.classes_)
+        trees = [
+            (est.tree_, _class_proba_leaves(est.tree_, est.classes_, n_classes), features)
+            for est, features in zip(model.estimators_, model.estimators_features_)
+        ]
+        return CompiledTreeEnsemble('average', model.classes_, trees, n_features)
+
+    if isinstance(model, GradientBoostingClassifier):
+        # Solo inicializaciones constantes (prior o 'zero')
+        if not (model.init_ == 'zero' or isinstance(model.init_, DummyClassifier)):
+            return None
+        n_outputs = model.estimators_.shape[1]
+        trees = []
+        for stage in model.estimators_:
+            for k, est in enumerate(stage):
+                leaves = np.zeros((est.tree_.node_count, n_outputs))
+                leaves[:, k] = model.learning_rate * est.tree_.value[:, 0, 0]
+                trees.append((est.tree_, leaves, None))
+        compiled = CompiledTreeEnsemble('gradient_boosting', model.classes_, trees, n_features,
+                                        base=np.zeros(n_outputs))
+        # La predicción inicial es constante: se obtiene de decision_function
+        x0 = np.zeros((1, n_features))
+        raw0 = np.asarray(model.decision_function(x0), dtype=np.float64).reshape(1, -1)
+        compiled.base = raw0[0] - compiled._aggregate(x0)[0]
+        return compiled
+
+    if isinstance(model, AdaBoostClassifier):
+        if not all(isinstance(est, DecisionTreeClassifier) for est in model.estimators_):
+            return None
+        n_classes = len(model.classes_)
+        trees = []
+        for est, weight in zip(model.estimators_, model.estimator_weights_):
+            # Cada árbol vota con su peso por la clase de mayor valor en la hoja
+            votes = np.zeros((est.tree_.node_count, n_classes))
+            best = est.tree_.value[:, 0, :].argmax(axis=1)
+            votes[np.arange(len(best)), np.searchsorted(model.classes_, est.classes_[best])] = weight
+            trees.append((est.tree_, votes, None))
+        return CompiledTreeEnsemble('adaboost', model.classes_, trees, n_features,
+                                    weight_sum=float(np.sum(model.estimator_weights_)))
+
+    return None
+
+
+def check_parity(compiled, model, X, atol=1e-9):
+    """
+    Comprobar que el motor compilado reproduce las probabilidades de sklearn
+
+    Returns:
+        Diferencia absoluta máxima entre ambas predict_proba
+    Raises:
+        AssertionError si la diferencia supera atol o cambia alguna clase predicha
+    """
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max())
+    if max_diff > atol:
+        raise AssertionError(f"Paridad fallida: diferencia máxima {max_diff:.3e} > {atol:.0e}")
+    if not np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)):
+        raise AssertionError("Paridad fallida: cambia la clase predicha")
+    return max_diff
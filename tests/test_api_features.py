@@ -0,0 +1,116 @@
+"""
+Validación de las variables de entrada en la API (backend.app.main)
+
+Cada test publica un artefacto entrenado en tmp_path: el modelo completo de
+21 variables o uno entrenado sobre un subconjunto, como el que genera la
+selección de variables.
+"""
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import backend.app.main as main
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+COLUMN_TO_FIELD = {column: field for field, column in main.FIELD_TO_COLUMN.items()}
+SUBSET = ['baseline value', 'accelerations', 'abnormal_short_term_variability', 'histogram_mean']
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    df = pd.read_csv(RAW_CSV)
+    return df.drop('fetal_health', axis=1), df['fetal_health']
+
+
+def _request_rows(X):
+    return X.rename(columns=COLUMN_TO_FIELD).to_dict('records')
+
+
+def _fields(columns):
+    return [COLUMN_TO_FIELD.get(column, column) for column in columns]
+
+
+def _client(tmp_path, monkeypatch, X, y, feature_names):
+    X = X[feature_names]
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=20, random_state=42).fit(scaler.transform(X), y)
+    path = tmp_path / "fetal_health_model.pkl"
+    joblib.dump({'model': model, 'scaler': scaler, 'feature_names': feature_names,
+                 'model_name': 'Random Forest'}, path)
+    monkeypatch.setattr(main.model_registry, 'model_path', path)
+    monkeypatch.setattr(main, 'MODEL_WATCH_INTERVAL', 0)
+    main.prediction_cache.clear()
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def full_client(tmp_path, monkeypatch, dataset):
+    X, y = dataset
+    with _client(tmp_path, monkeypatch, X, y, list(X.columns)) as client:
+        yield client
+
+
+@pytest.fixture
+def subset_client(tmp_path, monkeypatch, dataset):
+    X, y = dataset
+    with _client(tmp_path, monkeypatch, X, y, SUBSET) as client:
+        yield client
+
+
+def _error_fields(response):
+    return [error['loc'][-1] for error in response.json()['detail']]
+
+
+def test_full_model_requires_every_feature(full_client, dataset):
+    X, _ = dataset
+    row = _request_rows(X)[0]
+    assert full_client.post('/predict', json=row).status_code == 200
+
+    row.pop('histogram_tendency')
+    response = full_client.post('/predict', json=row)
+    assert response.status_code == 422
+    assert _error_fields(response) == ['histogram_tendency']
+
+
+def test_null_feature_in_batch_is_422(full_client, dataset):
+    X, _ = dataset
+    rows = _request_rows(X)[:3]
+    rows[1] = {**rows[1], 'accelerations': None}
+
+    response = full_client.post('/predict/batch', json={'instances': rows})
+    assert response.status_code == 422
+    assert _error_fields(response) == ['accelerations']
+
+
+def test_subset_model_ignores_unused_features(subset_client, dataset):
+    X, _ = dataset
+    rows = _request_rows(X)[:2]
+    # Mismas variables del subconjunto, el resto cambiado
+    changed = {**rows[1], **{field: rows[0][field] for field in _fields(SUBSET)}}
+
+    info = subset_client.get('/model/info').json()
+    assert info['used_fields'] == _fields(SUBSET)
+
+    first = subset_client.post('/predict', json=rows[0]).json()
+    assert subset_client.post('/predict', json=changed).json() == first
+
+    batch = subset_client.post('/predict/batch', json={'instances': [rows[0], changed]})
+    assert batch.status_code == 200
+    assert [p['prediction'] for p in batch.json()['predictions']] == [first['prediction']] * 2
+
+    # Las 21 variables siguen siendo obligatorias
+    rows[0].pop('histogram_tendency')
+    response = subset_client.post('/predict', json=rows[0])
+    assert response.status_code == 422
+    assert _error_fields(response) == ['histogram_tendency']
+
+
+def test_openapi_requires_every_feature(subset_client, dataset):
+    X, _ = dataset
+    schema = subset_client.get('/openapi.json').json()
+    assert schema['components']['schemas']['FetalHealthFeatures']['required'] == _fields(X.columns)
@@ -0,0 +1,40 @@
+"""
+ETag e If-None-Match de /dataset/info (backend.app.main)
+"""
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.app.main as main
+
+RAW_DIR = Path(__file__).resolve().parent.parent / "data" / "raw"
+
+
+@pytest.mark.parametrize('header, matches', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('"xyz" ,  "abc" ', True),
+    ('*', True),
+    ('"abcd"', False),
+    ('"ab"', False),
+    ('abc', False),
+    ('', False),
+])
+def test_etag_matches(header, matches):
+    assert main._etag_matches('"abc"', header) is matches
+
+
+def test_dataset_info_not_modified(monkeypatch):
+    monkeypatch.setattr(main, 'DATASETS_DIR', RAW_DIR)
+    monkeypatch.setattr(main, 'MODEL_WATCH_INTERVAL', 0)
+
+    with TestClient(main.app) as client:
+        response = client.get('/dataset/info')
+        assert response.status_code == 200
+        etag = response.headers['etag']
+
+        assert client.get('/dataset/info', headers={'If-None-Match': f'"other", W/{etag}'}).status_code == 304
+        # Una etiqueta que contiene la actual como subcadena no es la misma
+        assert client.get('/dataset/info', headers={'If-None-Match': f'"{etag}"'}).status_code == 200
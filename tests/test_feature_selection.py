@@ -0,0 +1,72 @@
+"""
+Selección de variables previa al escalado (src.feature_selection)
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_selection import prune_correlated, select_features, validate_options, DEFAULT_OPTIONS
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    df = pd.read_csv(RAW_CSV)
+    return df.drop('fetal_health', axis=1), df['fetal_health']
+
+
+def test_prune_correlated_keeps_the_most_relevant_of_each_pair():
+    rng = np.random.default_rng(0)
+    y = pd.Series(rng.integers(0, 2, 400))
+    signal = y + rng.normal(0, 0.3, 400)
+    X = pd.DataFrame({
+        'signal': signal,
+        'noisy_copy': signal + rng.normal(0, 0.05, 400),
+        'independent': rng.normal(size=400),
+    })
+
+    dropped = prune_correlated(X, y, 0.9)
+
+    assert list(dropped) == ['noisy_copy']
+    assert 'signal' in dropped['noisy_copy']
+
+
+def test_prune_correlated_drops_histogram_near_duplicates(dataset):
+    X, y = dataset
+    dropped = prune_correlated(X, y, 0.85)
+
+    # De histogram_mean / median / mode sobrevive al menos uno
+    histogram_centre = {'histogram_mean', 'histogram_median', 'histogram_mode'}
+    assert histogram_centre & set(dropped)
+    assert histogram_centre - set(dropped)
+
+
+def test_select_features_preserves_column_order(dataset):
+    X, y = dataset
+    result = select_features(X, y, {'enabled': True, 'low_signal': 'rfe', 'n_features': 8}, n_jobs=1)
+
+    assert len(result['selected']) == 8
+    assert result['selected'] == [column for column in X.columns if column in result['selected']]
+    assert set(result['selected']).isdisjoint(result['dropped'])
+    assert set(result['selected']) | set(result['dropped']) == set(X.columns)
+
+
+def test_select_features_without_pruning_keeps_everything(dataset):
+    X, y = dataset
+    result = select_features(X, y, {'enabled': True, 'correlation_threshold': None})
+
+    assert result['selected'] == list(X.columns)
+    assert result['dropped'] == {}
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'low_signal': 'lasso'}, 'desconocido'),
+    ({'low_signal': 'rfe'}, 'n_features'),
+    ({'correlation_threshold': 1.5}, 'correlation_threshold'),
+])
+def test_invalid_options_rejected(options, message):
+    with pytest.raises(ValueError, match=message):
+        validate_options({**DEFAULT_OPTIONS, **options})
@@ -0,0 +1,60 @@
+"""
+Caché Arrow del dataset (src.load_data)
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import src.load_data as load_data_module
+from src.fit_cache import hash_file
+from src.load_data import cache_path_for, load_data, load_data_and_hash
+
+pytest.importorskip('pyarrow')
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "raw" / "fetal_health.csv"
+    path.parent.mkdir()
+    path.write_bytes(RAW_CSV.read_bytes())
+    return path
+
+
+def test_cache_is_written_to_the_cache_dir(csv_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    data, source_hash = load_data_and_hash(csv_path, cache_dir=cache_dir)
+
+    assert source_hash == hash_file(csv_path)
+    assert list(cache_dir.iterdir()) == [cache_path_for(csv_path, cache_dir)]
+    assert sorted(path.name for path in csv_path.parent.iterdir()) == ['fetal_health.csv']
+    pd.testing.assert_frame_equal(data, load_data(csv_path, use_cache=False))
+
+
+def test_valid_cache_skips_hashing_the_csv(csv_path, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    _, source_hash = load_data_and_hash(csv_path, cache_dir=cache_dir)
+
+    def fail(path):
+        raise AssertionError('el CSV no debería volver a leerse')
+    monkeypatch.setattr(load_data_module, 'hash_file', fail)
+    monkeypatch.setattr(load_data_module, 'read_csv_typed', fail)
+
+    assert load_data_and_hash(csv_path, cache_dir=cache_dir)[1] == source_hash
+
+
+def test_changed_csv_regenerates_the_cache(csv_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_data(csv_path, cache_dir=cache_dir)
+
+    df = pd.read_csv(csv_path)
+    df.iloc[:10].to_csv(csv_path, index=False)
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    data, source_hash = load_data_and_hash(csv_path, cache_dir=cache_dir)
+    assert len(data) == 10
+    assert source_hash == hash_file(csv_path)
@@ -0,0 +1,94 @@
+"""
+Cambio de modelo en caliente con workers de inferencia en procesos (backend.app.main)
+"""
+import os
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import backend.app.main as main
+from backend.app.services.executor import InferenceExecutor
+from backend.app.services.model_service import artifact_version
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+COLUMN_TO_FIELD = {column: field for field, column in main.FIELD_TO_COLUMN.items()}
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    df = pd.read_csv(RAW_CSV)
+    return df.drop('fetal_health', axis=1), df['fetal_health']
+
+
+def _write_artifact(path, X, y, feature_names, mtime):
+    X = X[feature_names]
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=42).fit(scaler.transform(X), y)
+    joblib.dump({'model': model, 'scaler': scaler, 'feature_names': feature_names,
+                 'model_name': 'Random Forest'}, path)
+    os.utime(path, (mtime, mtime))
+    return artifact_version(path)
+
+
+@pytest.fixture
+def process_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.model_registry, 'model_path', tmp_path / "fetal_health_model.pkl")
+    monkeypatch.setattr(main.model_registry, '_bundle', None)
+    monkeypatch.setattr(main, 'MODEL_WATCH_INTERVAL', 0)
+    monkeypatch.setattr(main, 'inference_executor', InferenceExecutor(kind="process", max_workers=2))
+    main.prediction_cache.clear()
+    return TestClient(main.app)
+
+
+def test_workers_start_with_the_first_model_and_follow_reloads(process_client, dataset):
+    X, y = dataset
+    path = main.model_registry.model_path
+    row = X.rename(columns=COLUMN_TO_FIELD).iloc[0].to_dict()
+
+    with process_client as client:
+        # Sin artefacto no se arranca ningún pool
+        assert not main.inference_executor.started
+        assert client.post('/predict', json=row).status_code == 503
+
+        first = _write_artifact(path, X, y, list(X.columns), mtime=1_000_000)
+        assert client.post('/admin/reload-model').json()['version'] == first
+        assert client.get('/metrics').json()['executor']['model_versions'] == [first]
+        assert client.post('/predict', json=row).status_code == 200
+
+        second = _write_artifact(path, X, y, ['baseline value', 'accelerations'], mtime=2_000_000)
+        assert client.post('/admin/reload-model').json()['version'] == second
+        assert client.get('/metrics').json()['executor']['model_versions'] == [second]
+        assert client.get('/model/info').json()['features'] == 2
+        assert client.post('/predict', json=row).status_code == 200
+
+
+def test_workers_reject_an_artifact_of_another_version(tmp_path, dataset):
+    X, y = dataset
+    path = tmp_path / "fetal_health_model.pkl"
+    _write_artifact(path, X, y, list(X.columns), mtime=1_000_000)
+    executor = InferenceExecutor(kind="process", max_workers=1)
+
+    with pytest.raises(RuntimeError, match='failed to load model version'):
+        executor.start(path, 'not-this-one')
+    assert not executor.started
+
+
+def test_thread_pool_waits_for_a_model(tmp_path, monkeypatch, dataset):
+    X, y = dataset
+    path = tmp_path / "fetal_health_model.pkl"
+    monkeypatch.setattr(main.model_registry, 'model_path', path)
+    monkeypatch.setattr(main.model_registry, '_bundle', None)
+    monkeypatch.setattr(main, 'MODEL_WATCH_INTERVAL', 0)
+    monkeypatch.setattr(main, 'inference_executor', InferenceExecutor(kind="thread", max_workers=2))
+
+    with TestClient(main.app) as client:
+        assert not main.inference_executor.started
+
+        _write_artifact(path, X, y, list(X.columns), mtime=1_000_000)
+        assert client.post('/admin/reload-model').status_code == 200
+        assert main.inference_executor.started
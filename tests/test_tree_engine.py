@@ -0,0 +1,114 @@
+"""
+Paridad del motor compilado (src.tree_engine) con predict_proba de sklearn
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q tests
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import (
+    AdaBoostClassifier,
+    BaggingClassifier,
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier
+)
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from src.tree_engine import check_parity, compile_tree_ensemble
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "data" / "raw" / "fetal_health.csv"
+
+MODELS = {
+    'random_forest': lambda: RandomForestClassifier(n_estimators=30, random_state=42, class_weight='balanced'),
+    'extra_trees': lambda: ExtraTreesClassifier(n_estimators=30, random_state=42),
+    'gradient_boosting': lambda: GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=42),
+    'adaboost': lambda: AdaBoostClassifier(
+        estimator=DecisionTreeClassifier(max_depth=3), n_estimators=30, random_state=42
+    ),
+    'bagging': lambda: BaggingClassifier(
+        estimator=DecisionTreeClassifier(), n_estimators=15, max_features=0.8, random_state=42
+    ),
+    'decision_tree': lambda: DecisionTreeClassifier(max_depth=6, random_state=42),
+}
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    """Split escalado del CSV original, como en el entrenamiento"""
+    df = pd.read_csv(RAW_CSV)
+    X = df.drop('fetal_health', axis=1)
+    y = df['fetal_health']
+    X_train, X_test, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    return scaler.transform(X_train), scaler.transform(X_test), y_train.to_numpy()
+
+
+def _fit(name, X_train, y_train):
+    return MODELS[name]().fit(X_train, y_train)
+
+
+@pytest.mark.parametrize('name', list(MODELS))
+@pytest.mark.parametrize('binary', [False, True], ids=['multiclass', 'binary'])
+def test_predict_proba_matches_sklearn(dataset, name, binary):
+    X_train, X_test, y_train = dataset
+    if binary:
+        # Normal frente al resto: GradientBoosting usa un único árbol por etapa
+        y_train = np.where(y_train == 1, 1, 2)
+    model = _fit(name, X_train, y_train)
+    compiled = compile_tree_ensemble(model)
+
+    assert compiled is not None
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    assert check_parity(compiled, model, X_test) <= 1e-9
+
+
+@pytest.mark.parametrize('name', ['random_forest', 'extra_trees', 'bagging', 'decision_tree'])
+def test_nan_matches_sklearn_when_supported(dataset, name):
+    X_train, X_test, y_train = dataset
+    model = _fit(name, X_train, y_train)
+    X = X_test[:50].copy()
+    X[::3, 0] = np.nan
+    X[1::4, 7] = np.nan
+
+    np.testing.assert_allclose(compile_tree_ensemble(model).predict_proba(X), model.predict_proba(X),
+                               rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('name', ['gradient_boosting', 'adaboost'])
+def test_nan_rejected_like_sklearn(dataset, name):
+    X_train, X_test, y_train = dataset
+    model = _fit(name, X_train, y_train)
+    X = X_test[:5].copy()
+    X[0, 0] = np.nan
+
+    with pytest.raises(ValueError):
+        model.predict_proba(X)
+    with pytest.raises(ValueError, match='NaN'):
+        compile_tree_ensemble(model).predict_proba(X)
+
+
+@pytest.mark.parametrize('value', [np.inf, -np.inf, 1e300])
+@pytest.mark.parametrize('name', list(MODELS))
+def test_non_finite_rejected(dataset, name, value):
+    X_train, X_test, y_train = dataset
+    compiled = compile_tree_ensemble(_fit(name, X_train, y_train))
+    X = X_test[:5].copy()
+    X[2, 3] = value
+
+    with pytest.raises(ValueError, match='infinitos'):
+        compiled.predict_proba(X)
+
+
+def test_wrong_number_of_features_rejected(dataset):
+    X_train, X_test, y_train = dataset
+    compiled = compile_tree_ensemble(_fit('random_forest', X_train, y_train))
+
+    with pytest.raises(ValueError, match='features'):
+        compiled.predict_proba(X_test[:, :-1])